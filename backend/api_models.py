@@ -8,6 +8,7 @@ class ExportFormat(str, Enum):
     MARKDOWN = "md"
     TEXT = "txt"
     SRT = "srt"
+    VTT = "vtt"
     JSON = "json"
 
 
@@ -16,6 +17,7 @@ class ExtractRequest(BaseModel):
     channel_name: Optional[str] = None
     video_date: Optional[str] = None
     export_format: ExportFormat = ExportFormat.MARKDOWN
+    profile: bool = False  # Save a sampling profile of the job (needs PROFILING_ENABLED)
 
     @validator('youtube_url')
     def validate_youtube_url(cls, v):
@@ -27,7 +29,9 @@ class ExtractRequest(BaseModel):
 
 class ChannelFetchRequest(BaseModel):
     channel_name: str
-    max_videos: int = Field(default=10, ge=1, le=50)
+    max_videos: int = Field(default=10, ge=1, le=5000)
+    incremental: bool = False  # Only fetch uploads newer than the ones already archived
+    profile: bool = False  # Save a sampling profile of the job (needs PROFILING_ENABLED)
 
 
 class TranscriptResponse(BaseModel):
@@ -66,4 +70,41 @@ class TranscriptListResponse(BaseModel):
     transcripts: List[TranscriptResponse]
     total: int
     page: int
+    per_page: int
+
+
+class TranscriptSummary(BaseModel):
+    video_id: str
+    video_url: str
+    video_title: Optional[str] = None
+    channel_name: str
+    video_date: str
+    size_bytes: int
+    segment_count: int
+    created_at: datetime
+
+
+class TranscriptSummaryListResponse(BaseModel):
+    transcripts: List[TranscriptSummary]
+    total: int
+    page: int
+    per_page: int
+
+
+class SearchHit(BaseModel):
+    video_id: str
+    video_url: str
+    video_title: Optional[str] = None
+    channel_name: str
+    video_date: str
+    start: float
+    text: str
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    hits: List[SearchHit]
+    total: int
+    page: int
     per_page: int
\ No newline at end of file
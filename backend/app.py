@@ -2,25 +2,45 @@ import os
 import sys
 import re
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Optional, Union
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import asyncio
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 import uvicorn
+from starlette.concurrency import run_in_threadpool
 
 # Add parent directory to path to import existing modules
 sys.path.append(str(Path(__file__).parent.parent))
 
 from config import config
+from youtube_client import client_pool
+from key_scheduler import key_scheduler
+from transcript_fetcher import fetch_transcript
+from channel_cache import channel_cache
 from extract_transcript import extract_transcript
-from fetch_and_extract import get_channel_id_from_name, get_video_urls_and_dates_from_channel
+from metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, count_outcomes, registry as metrics_registry, stage, videos_processed
+)
+from transcript_formats import (
+    MEDIA_TYPES, download_headers, format_transcript, iter_chunks, iter_format, iter_markdown_file
+)
+from fetch_and_extract import get_channel_id_from_name
+from backend.workers import run_blocking, shutdown_executor
+from backend.job_store import job_store
+from backend.job_events import job_events
+from backend.profiling import add_profiling, job_profiling
+from backend.repositories.transcript_repository import TranscriptRepository
+from backend.repositories.youtube_repository import YouTubeRepository
+from backend.repositories.segment_file import iter_closing
 from backend.api_models import (
     ExtractRequest, ChannelFetchRequest, TranscriptResponse, 
     JobResponse, JobStatus, ErrorResponse, TranscriptListResponse,
+    TranscriptSummary, TranscriptSummaryListResponse, SearchHit, SearchResponse,
     ExportFormat
 )
 
@@ -39,68 +59,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory job storage (replace with Redis in production)
-jobs: Dict[str, JobResponse] = {}
-
-
-def format_transcript(transcript_data: list, format_type: ExportFormat) -> str:
-    """Convert transcript data to requested format"""
-    if format_type == ExportFormat.MARKDOWN:
-        return "\n".join([f"{entry['start']:.2f}s: {entry['text']}" for entry in transcript_data])
-    elif format_type == ExportFormat.TEXT:
-        return " ".join([entry['text'] for entry in transcript_data])
-    elif format_type == ExportFormat.SRT:
-        srt_content = []
-        for i, entry in enumerate(transcript_data, 1):
-            start_time = entry['start']
-            end_time = entry.get('duration', 0) + start_time
-            srt_content.append(f"{i}")
-            srt_content.append(f"{format_srt_time(start_time)} --> {format_srt_time(end_time)}")
-            srt_content.append(entry['text'])
-            srt_content.append("")
-        return "\n".join(srt_content)
-    elif format_type == ExportFormat.JSON:
-        import json
-        return json.dumps(transcript_data, indent=2)
-    return ""
-
-
-def format_srt_time(seconds: float) -> str:
-    """Format seconds to SRT timestamp"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = seconds % 60
-    return f"{hours:02d}:{minutes:02d}:{secs:06.3f}".replace('.', ',')
+# X-Profile request profiling and the /api/admin/profiles endpoints, if enabled
+add_profiling(app)
 
+# Transcript files in the output directory, served through the metadata index
+transcript_repo = TranscriptRepository(config.output_dir, config.cache_dir)
 
-async def process_single_video(job_id: str, request: ExtractRequest):
-    """Background task to process a single video"""
-    try:
-        jobs[job_id].status = JobStatus.PROCESSING
-        
-        # Extract video ID from URL
-        url_str = str(request.youtube_url)
-        video_id = url_str.split('v=')[-1].split('&')[0]
-        
-        # Import here to access the functions
-        from youtube_transcript_api import YouTubeTranscriptApi
-        import googleapiclient.discovery
-        
-        # Get video metadata
-        video_title = None
-        channel_name = request.channel_name
-        video_date = request.video_date
-        
+# Channel uploads and video titles
+youtube_repo = YouTubeRepository(key_scheduler=key_scheduler)
+
+
+@count_outcomes(videos_processed)
+def extract_single_video(request: ExtractRequest) -> TranscriptResponse:
+    """Fetch metadata and transcript for a single video (blocking)"""
+    # Extract video ID from URL
+    url_str = str(request.youtube_url)
+    video_id = url_str.split('v=')[-1].split('&')[0]
+    
+    # Get video metadata
+    video_title = None
+    channel_name = request.channel_name
+    video_date = request.video_date
+    
+    with stage("metadata"):
         try:
-            youtube = googleapiclient.discovery.build(
-                "youtube", "v3", developerKey=config.get_current_api_key()
-            )
-            
-            video_request = youtube.videos().list(
+            video_response = key_scheduler.execute("videos", lambda youtube: youtube.videos().list(
                 part="snippet",
                 id=video_id
-            )
-            video_response = video_request.execute()
+            ))
             
             if video_response.get("items"):
                 snippet = video_response["items"][0]["snippet"]
@@ -109,35 +95,68 @@ async def process_single_video(job_id: str, request: ExtractRequest):
                 video_date = video_date or snippet["publishedAt"][:10]
         except Exception as e:
             print(f"Could not fetch video metadata: {e}")
-        
-        # Get transcript
-        transcript_data = YouTubeTranscriptApi.get_transcript(video_id)
-        
-        # Format transcript
+    
+    # Get transcript
+    with stage("transcript"):
+        transcript_data = fetch_transcript(video_id)
+    
+    # Format transcript
+    with stage("format"):
         formatted_transcript = format_transcript(transcript_data, request.export_format)
+    
+    # Calculate duration
+    duration = sum(entry.get('duration', 0) for entry in transcript_data)
+    
+    # Create response
+    return TranscriptResponse(
+        video_id=video_id,
+        video_url=url_str,
+        video_title=video_title,
+        channel_name=channel_name or config.default_channel_name,
+        video_date=video_date or datetime.now().strftime("%Y-%m-%d"),
+        transcript_text=formatted_transcript,
+        duration_seconds=duration,
+        format=request.export_format
+    )
+
+
+async def process_single_video(job_id: str, request: ExtractRequest):
+    """Background task to process a single video"""
+    try:
+        # The job store blocks on SQLite or Redis, so its calls run off the event loop too
+        await run_in_threadpool(job_store.update, job_id, status=JobStatus.PROCESSING)
         
-        # Calculate duration
-        duration = sum(entry.get('duration', 0) for entry in transcript_data)
+        # Network calls run on the job executor so the event loop stays responsive
+        async with job_profiling(job_id, request.profile):
+            result = await run_blocking(extract_single_video, request)
         
-        # Create response
-        result = TranscriptResponse(
-            video_id=video_id,
-            video_url=url_str,
-            video_title=video_title,
-            channel_name=channel_name or config.default_channel_name,
-            video_date=video_date or datetime.now().strftime("%Y-%m-%d"),
-            transcript_text=formatted_transcript,
-            duration_seconds=duration,
-            format=request.export_format
+        await run_in_threadpool(
+            job_store.update,
+            job_id,
+            status=JobStatus.COMPLETED,
+            progress=100,
+            result=result
         )
         
-        jobs[job_id].status = JobStatus.COMPLETED
-        jobs[job_id].result = result
-        jobs[job_id].progress = 100
-        
     except Exception as e:
-        jobs[job_id].status = JobStatus.FAILED
-        jobs[job_id].message = str(e)
+        await run_in_threadpool(
+            job_store.update,
+            job_id,
+            status=JobStatus.FAILED,
+            message=str(e)
+        )
+
+
+@app.on_event("startup")
+async def warm_up_youtube_clients():
+    """Pre-build YouTube API clients so the first request isn't slow"""
+    client_pool.warm_up(config.youtube_api_keys)
+
+
+@app.on_event("shutdown")
+async def stop_job_executor():
+    """Release the background job executor"""
+    shutdown_executor()
 
 
 @app.get("/")
@@ -147,7 +166,7 @@ async def root():
 
 
 @app.post("/api/extract", response_model=JobResponse)
-async def extract_transcript_endpoint(
+def extract_transcript_endpoint(
     request: ExtractRequest,
     background_tasks: BackgroundTasks
 ):
@@ -155,78 +174,154 @@ async def extract_transcript_endpoint(
     job_id = str(uuid.uuid4())
     
     # Create job entry
-    jobs[job_id] = JobResponse(
+    job = job_store.create(JobResponse(
         job_id=job_id,
         status=JobStatus.PENDING,
         progress=0
-    )
+    ))
     
     # Start background processing
     background_tasks.add_task(process_single_video, job_id, request)
     
-    return jobs[job_id]
+    return job
 
 
-async def process_channel_videos(job_id: str, channel_name: str, max_videos: int):
-    """Background task to process multiple videos from a channel"""
+def run_channel_videos(job_id: str, channel_name: str, max_videos: int, incremental: bool = False):
+    """Process multiple videos from a channel, updating the job as it goes (blocking)
+
+    With ``incremental``, videos already in the archive are skipped and paging
+    stops once the archive is reached.
+    """
     try:
-        jobs[job_id].status = JobStatus.PROCESSING
+        job_store.update(job_id, status=JobStatus.PROCESSING)
         
         # Get channel ID
-        channel_id = get_channel_id_from_name(channel_name)
+        with stage("channel lookup"):
+            channel_id = get_channel_id_from_name(channel_name)
         if not channel_id:
-            jobs[job_id].status = JobStatus.FAILED
-            jobs[job_id].message = f"Channel '{channel_name}' not found"
+            job_store.update(
+                job_id,
+                status=JobStatus.FAILED,
+                message=f"Channel '{channel_name}' not found"
+            )
             return
         
-        # Get videos
-        videos = get_video_urls_and_dates_from_channel(channel_id, max_videos)
-        total_videos = len(videos)
+        # Page through the channel's uploads, starting work on each page as it arrives.
+        # Errors are collected by position to keep channel order.
+        videos = []
+        futures = {}
+        errors = {}
+        expected_total = 0
+        
+        def collect(future):
+            index = futures.pop(future)
+            try:
+                future.result()
+                errors[index] = None
+            except Exception as e:
+                errors[index] = e
+            
+            # Update progress
+            completed = len(errors)
+            total_videos = max(expected_total, len(videos))
+            job_store.update(
+                job_id,
+                message=f"Processed {completed} of {total_videos} videos",
+                progress=int((completed / total_videos) * 100)
+            )
+        
+        pages = youtube_repo.iter_channel_video_pages(channel_id, max_videos)
+        if incremental:
+            pages = transcript_repo.iter_unarchived_pages(pages, channel_name)
         
-        if total_videos == 0:
-            jobs[job_id].status = JobStatus.COMPLETED
-            jobs[job_id].message = "No videos found"
-            jobs[job_id].progress = 100
+        with ThreadPoolExecutor(max_workers=config.max_concurrent_videos) as executor:
+            page_iterator = iter(pages)
+            while True:
+                with stage("video listing"):
+                    next_page = next(page_iterator, None)
+                if next_page is None:
+                    break
+                page, expected_total = next_page
+                
+                # Look up the page's titles in one call instead of once per video
+                with stage("titles"):
+                    try:
+                        metadata = youtube_repo.get_videos_metadata([url.split('v=')[-1] for url, _ in page])
+                        titles = {video_id: video['title'] for video_id, video in metadata.items()}
+                    except Exception as e:
+                        print(f"Could not fetch video metadata: {e}")
+                        titles = {}
+                
+                for video_url, video_date in page:
+                    future = executor.submit(
+                        extract_transcript, video_url, config.output_dir, channel_name, video_date,
+                        video_title=titles.get(video_url.split('v=')[-1])
+                    )
+                    futures[future] = len(videos)
+                    videos.append((video_url, video_date))
+                
+                for future in [f for f in futures if f.done()]:
+                    collect(future)
+            
+            for future in as_completed(list(futures)):
+                collect(future)
+        
+        if not videos:
+            job_store.update(
+                job_id,
+                status=JobStatus.COMPLETED,
+                message="No new videos since the last sync" if incremental else "No videos found",
+                progress=100
+            )
             return
         
-        # Process each video
         successful = 0
         failed = 0
         failed_videos = []
-        
-        for i, (video_url, video_date) in enumerate(videos):
-            try:
-                # Update progress
-                progress = int((i / total_videos) * 100)
-                jobs[job_id].progress = progress
-                jobs[job_id].message = f"Processing video {i+1} of {total_videos}"
-                
-                # Extract transcript
-                video_id = video_url.split('v=')[-1]
-                extract_transcript(video_url, config.output_dir, channel_name, video_date)
+        for index, (video_url, _) in enumerate(videos):
+            error = errors[index]
+            if error is None:
                 successful += 1
-                
-            except Exception as e:
+            else:
                 failed += 1
-                failed_videos.append(f"{video_url} - {str(e)}")
-                print(f"Failed to extract transcript for {video_url}: {e}")
+                failed_videos.append(f"{video_url} - {str(error)}")
+                print(f"Failed to extract transcript for {video_url}: {error}")
         
         # Final status
-        jobs[job_id].status = JobStatus.COMPLETED
-        jobs[job_id].progress = 100
-        
         if failed > 0:
-            jobs[job_id].message = f"Completed: {successful} transcripts extracted, {failed} failed. Failed videos: {'; '.join(failed_videos[:3])}"
+            message = f"Completed: {successful} transcripts extracted, {failed} failed. Failed videos: {'; '.join(failed_videos[:3])}"
         else:
-            jobs[job_id].message = f"Success! All {successful} transcripts extracted"
+            message = f"Success! All {successful} transcripts extracted"
+        
+        job_store.update(
+            job_id,
+            status=JobStatus.COMPLETED,
+            message=message,
+            progress=100
+        )
         
     except Exception as e:
-        jobs[job_id].status = JobStatus.FAILED
-        jobs[job_id].message = str(e)
+        job_store.update(
+            job_id,
+            status=JobStatus.FAILED,
+            message=str(e)
+        )
+
+
+async def process_channel_videos(
+    job_id: str,
+    channel_name: str,
+    max_videos: int,
+    incremental: bool = False,
+    profile: bool = False
+):
+    """Background task to process multiple videos from a channel"""
+    async with job_profiling(job_id, profile):
+        await run_blocking(run_channel_videos, job_id, channel_name, max_videos, incremental)
 
 
 @app.post("/api/fetch-channel", response_model=JobResponse)
-async def fetch_channel_videos(
+def fetch_channel_videos(
     request: ChannelFetchRequest,
     background_tasks: BackgroundTasks
 ):
@@ -234,56 +329,103 @@ async def fetch_channel_videos(
     job_id = str(uuid.uuid4())
     
     # Create job entry
-    jobs[job_id] = JobResponse(
+    job = job_store.create(JobResponse(
         job_id=job_id,
         status=JobStatus.PENDING,
         message=f"Starting to fetch videos from '{request.channel_name}'",
         progress=0
-    )
+    ))
     
     # Start background processing
     background_tasks.add_task(
         process_channel_videos, 
         job_id, 
         request.channel_name, 
-        request.max_videos
+        request.max_videos,
+        request.incremental,
+        request.profile
     )
     
-    return jobs[job_id]
+    return job
 
 
 @app.get("/api/status/{job_id}", response_model=JobResponse)
-async def get_job_status(job_id: str):
+def get_job_status(job_id: str):
     """Get the status of a transcript extraction job"""
-    if job_id not in jobs:
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
+
+@app.get("/api/jobs/{job_id}/events")
+def stream_job_events(job_id: str):
+    """Stream a job's progress as Server-Sent Events until it completes or fails"""
+    if job_store.get(job_id, include_result=False) is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return jobs[job_id]
+    return StreamingResponse(
+        job_events.stream(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
-@app.get("/api/transcripts", response_model=TranscriptListResponse)
-async def list_transcripts(
+@app.get("/api/quota")
+def get_quota():
+    """Estimated YouTube API quota used and remaining per key today"""
+    return key_scheduler.report()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Stage latencies, video outcomes, failures, quota use and job queue depth in the Prometheus text format"""
+    return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/api/cache/stats")
+def get_cache_stats():
+    """Get hit/miss counters for the channel lookup cache"""
+    return {"channel_cache": channel_cache.stats()}
+
+
+# File-reading endpoints are plain functions so FastAPI runs them in its
+# threadpool instead of on the event loop.
+@app.get(
+    "/api/transcripts", 
+    response_model=Union[TranscriptListResponse, TranscriptSummaryListResponse]
+)
+def list_transcripts(
     page: int = Query(1, ge=1),
-    per_page: int = Query(10, ge=1, le=100)
+    per_page: int = Query(10, ge=1, le=100),
+    summary: bool = Query(False, description="Return metadata and sizes instead of full transcript text")
 ):
     """List all saved transcripts"""
-    # Get all markdown files from output directory
-    output_path = Path(config.output_dir)
-    if not output_path.exists():
-        return TranscriptListResponse(transcripts=[], total=0, page=page, per_page=per_page)
-    
-    # Get files sorted by modification time (newest first)
-    transcript_files = sorted(
-        output_path.glob("*.md"), 
-        key=lambda x: x.stat().st_mtime, 
-        reverse=True
-    )
-    total = len(transcript_files)
+    if summary:
+        # Served entirely from the index, no transcript file is opened
+        rows, total = transcript_repo.list_transcript_summaries(page, per_page)
+        return TranscriptSummaryListResponse(
+            transcripts=[
+                TranscriptSummary(
+                    video_id=row['video_id'],
+                    video_url=f"https://youtube.com/watch?v={row['video_id']}",
+                    video_title=row['video_title'],
+                    channel_name=row['channel_name'],
+                    video_date=row['video_date'],
+                    size_bytes=row['size'],
+                    segment_count=row['segment_count'],
+                    created_at=datetime.fromtimestamp(row['mtime'])
+                )
+                for row in rows
+            ],
+            total=total,
+            page=page,
+            per_page=per_page
+        )
     
-    # Pagination
-    start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
-    page_files = transcript_files[start_idx:end_idx]
+    # Page through the transcript index (newest first)
+    page_files, total = transcript_repo.list_transcripts(page, per_page)
     
     transcripts = []
     for file_path in page_files:
@@ -359,17 +501,67 @@ async def list_transcripts(
     )
 
 
+@app.get("/api/search", response_model=SearchResponse)
+def search_transcripts(
+    q: str = Query(..., min_length=1, description="Words that must all appear in a segment"),
+    channel: Optional[str] = Query(None, description="Only search this channel"),
+    date_from: Optional[str] = Query(None, description="Earliest video date (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, description="Latest video date (YYYY-MM-DD)"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100)
+):
+    """Full-text search across saved transcripts with timestamped hits"""
+    rows, total = transcript_repo.search_segments(q, channel, date_from, date_to, page, per_page)
+    
+    hits = [
+        SearchHit(
+            video_id=row['video_id'],
+            video_url=f"https://www.youtube.com/watch?v={row['video_id']}&t={int(row['start'])}s",
+            video_title=row['video_title'],
+            channel_name=row['channel_name'],
+            video_date=row['video_date'],
+            start=row['start'],
+            text=row['text'],
+            score=row['score']
+        )
+        for row in rows
+    ]
+    
+    return SearchResponse(query=q, hits=hits, total=total, page=page, per_page=per_page)
+
+
 @app.get("/api/transcript/{video_id}")
-async def download_transcript(video_id: str, format: ExportFormat = ExportFormat.MARKDOWN):
-    """Download a specific transcript in the requested format"""
+def download_transcript(
+    video_id: str,
+    format: ExportFormat = ExportFormat.MARKDOWN,
+    start: Optional[float] = Query(None, ge=0, description="Only include segments running at or after this many seconds"),
+    end: Optional[float] = Query(None, ge=0, description="Only include segments starting before this many seconds")
+):
+    """Download a specific transcript, or a time range of it, in the requested format"""
+    if start is not None and end is not None and end <= start:
+        raise HTTPException(status_code=400, detail="end must be greater than start")
+    
     # Find the transcript file
-    output_path = Path(config.output_dir)
-    matching_files = list(output_path.glob(f"*-{video_id}.md"))
+    file_path = transcript_repo.get_transcript_by_video_id(video_id)
     
-    if not matching_files:
+    if not file_path:
         raise HTTPException(status_code=404, detail="Transcript not found")
     
-    file_path = matching_files[0]
+    # For a time range, binary-search the segment start times and render only that slice
+    if start is not None or end is not None:
+        segment_file = transcript_repo.open_transcript_segments(video_id, config.transcript_language)
+        if segment_file is None:
+            raise HTTPException(status_code=404, detail="Transcript not found")
+        try:
+            first, last = segment_file.find_range(start, end)
+        except Exception:
+            segment_file.close()
+            raise
+        return StreamingResponse(
+            iter_chunks(iter_format(iter_closing(segment_file, first, last), format.value)),
+            media_type=MEDIA_TYPES[format.value],
+            headers=download_headers(video_id, format.value)
+        )
     
     # For markdown, return as-is
     if format == ExportFormat.MARKDOWN:
@@ -379,18 +571,12 @@ async def download_transcript(video_id: str, format: ExportFormat = ExportFormat
             filename=f"{video_id}.md"
         )
     
-    # For other formats, convert on the fly
-    # This is a simplified version - in production, you'd re-fetch and convert
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    if format == ExportFormat.TEXT:
-        # Simple conversion - remove timestamps
-        text_content = '\n'.join([line.split(': ', 1)[1] if ': ' in line else line 
-                                 for line in content.split('\n') if line.strip()])
-        return JSONResponse(content={"text": text_content})
-    
-    return JSONResponse(content={"text": content})
+    # For other formats, convert on the fly while streaming the file
+    return StreamingResponse(
+        iter_markdown_file(file_path, format.value),
+        media_type=MEDIA_TYPES[format.value],
+        headers=download_headers(video_id, format.value)
+    )
 
 
 @app.exception_handler(HTTPException)
@@ -4,28 +4,38 @@ Refactored FastAPI application with proper architectural layers
 import os
 import sys
 from pathlib import Path
-from typing import Dict
+from typing import Optional, Union
 import uuid
 from datetime import datetime
 import asyncio
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 import uvicorn
+from starlette.concurrency import run_in_threadpool
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from config import config
+from youtube_client import client_pool
+from key_scheduler import key_scheduler
+from channel_cache import channel_cache
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry as metrics_registry
+from transcript_formats import MEDIA_TYPES, download_headers
 from backend.api_models import (
     ExtractRequest, ChannelFetchRequest, TranscriptResponse, 
     JobResponse, JobStatus, ErrorResponse, TranscriptListResponse,
-    ExportFormat
+    TranscriptSummaryListResponse, SearchResponse, ExportFormat
 )
 from backend.repositories.transcript_repository import TranscriptRepository
 from backend.repositories.youtube_repository import YouTubeRepository
 from backend.services.transcript_service import TranscriptService
+from backend.workers import run_blocking, shutdown_executor
+from backend.job_store import job_store
+from backend.job_events import job_events
+from backend.profiling import add_profiling, job_profiling
 
 # Initialize app
 app = FastAPI(
@@ -44,92 +54,124 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize repositories and services
-transcript_repo = TranscriptRepository(config.output_dir)
-youtube_repo = YouTubeRepository(config.get_current_api_key())
-transcript_service = TranscriptService(transcript_repo, youtube_repo)
+# X-Profile request profiling and the /api/admin/profiles endpoints, if enabled
+add_profiling(app)
 
-# In-memory job storage (should be replaced with Redis in production)
-jobs: Dict[str, JobResponse] = {}
+# Initialize repositories and services
+transcript_repo = TranscriptRepository(config.output_dir, config.cache_dir)
+youtube_repo = YouTubeRepository(key_scheduler=key_scheduler)
+transcript_service = TranscriptService(
+    transcript_repo, 
+    youtube_repo, 
+    max_workers=config.max_concurrent_videos,
+    language=config.transcript_language
+)
 
 
 async def process_single_video_job(job_id: str, request: ExtractRequest):
     """Background task to process a single video"""
     try:
-        jobs[job_id].status = JobStatus.PROCESSING
+        # The job store blocks on SQLite or Redis, so its calls run off the event loop too
+        await run_in_threadpool(job_store.update, job_id, status=JobStatus.PROCESSING)
         
-        # Use service layer
-        result = transcript_service.extract_single_transcript(
-            str(request.youtube_url),
-            request.channel_name,
-            request.video_date,
-            request.export_format
-        )
+        # Use service layer, off the event loop
+        async with job_profiling(job_id, request.profile):
+            result = await run_blocking(
+                transcript_service.extract_single_transcript,
+                str(request.youtube_url),
+                request.channel_name,
+                request.video_date,
+                request.export_format
+            )
         
-        jobs[job_id].status = JobStatus.COMPLETED
-        jobs[job_id].result = result
-        jobs[job_id].progress = 100
+        await run_in_threadpool(
+            job_store.update,
+            job_id,
+            status=JobStatus.COMPLETED,
+            progress=100,
+            result=result
+        )
         
     except Exception as e:
-        jobs[job_id].status = JobStatus.FAILED
-        jobs[job_id].message = str(e)
+        await run_in_threadpool(
+            job_store.update,
+            job_id,
+            status=JobStatus.FAILED,
+            message=str(e)
+        )
 
 
-async def process_channel_videos_job(job_id: str, channel_name: str, max_videos: int):
+async def process_channel_videos_job(
+    job_id: str,
+    channel_name: str,
+    max_videos: int,
+    incremental: bool = False,
+    profile: bool = False
+):
     """Background task to process multiple videos from a channel"""
     try:
-        jobs[job_id].status = JobStatus.PROCESSING
-        
-        # Process videos with progress updates
-        total_processed = 0
+        await run_in_threadpool(job_store.update, job_id, status=JobStatus.PROCESSING)
         
-        # Get channel videos first to know total count
-        channel_id = youtube_repo.get_channel_id(channel_name)
-        if not channel_id:
-            raise ValueError(f"Channel '{channel_name}' not found")
+        def report_progress(completed: int, total: int):
+            job_store.update(
+                job_id,
+                message=f"Processed {completed} of {total} videos",
+                progress=int((completed / total) * 100)
+            )
         
-        videos = youtube_repo.get_channel_videos(channel_id, max_videos)
-        total_videos = len(videos)
+        # Extract transcripts concurrently using service, off the event loop
+        async with job_profiling(job_id, profile):
+            results = await run_blocking(
+                transcript_service.extract_channel_transcripts,
+                channel_name, max_videos, progress_callback=report_progress, incremental=incremental
+            )
         
-        if total_videos == 0:
-            jobs[job_id].status = JobStatus.COMPLETED
-            jobs[job_id].message = "No videos found"
-            jobs[job_id].progress = 100
+        if results['total'] == 0:
+            await run_in_threadpool(
+                job_store.update,
+                job_id,
+                status=JobStatus.COMPLETED,
+                message="No new videos since the last sync" if incremental else "No videos found",
+                progress=100
+            )
             return
         
-        successful = 0
-        failed = 0
-        failed_videos = []
-        
-        for i, (video_url, video_date) in enumerate(videos):
-            try:
-                # Update progress
-                progress = int((i / total_videos) * 100)
-                jobs[job_id].progress = progress
-                jobs[job_id].message = f"Processing video {i+1} of {total_videos}"
-                
-                # Extract transcript using service
-                transcript_service.extract_single_transcript(
-                    video_url, channel_name, video_date
-                )
-                successful += 1
-                
-            except Exception as e:
-                failed += 1
-                failed_videos.append(f"{video_url} - {str(e)}")
+        successful = results['successful']
+        failed = results['failed']
         
         # Final status
-        jobs[job_id].status = JobStatus.COMPLETED
-        jobs[job_id].progress = 100
-        
         if failed > 0:
-            jobs[job_id].message = f"Completed: {successful} transcripts extracted, {failed} failed"
+            message = f"Completed: {successful} transcripts extracted, {failed} failed"
         else:
-            jobs[job_id].message = f"Success! All {successful} transcripts extracted"
+            message = f"Success! All {successful} transcripts extracted"
+        
+        await run_in_threadpool(
+            job_store.update,
+            job_id,
+            status=JobStatus.COMPLETED,
+            message=message,
+            progress=100
+        )
         
     except Exception as e:
-        jobs[job_id].status = JobStatus.FAILED
-        jobs[job_id].message = str(e)
+        await run_in_threadpool(
+            job_store.update,
+            job_id,
+            status=JobStatus.FAILED,
+            message=str(e)
+        )
+
+
+@app.on_event("startup")
+async def warm_up_youtube_clients():
+    """Pre-build YouTube API clients so the first request isn't slow"""
+    client_pool.warm_up(config.youtube_api_keys)
+
+
+@app.on_event("shutdown")
+async def stop_job_executor():
+    """Release the background job executor"""
+    shutdown_executor()
 
 
 @app.get("/")
@@ -143,7 +185,7 @@ async def root():
 
 
 @app.post("/api/extract", response_model=JobResponse)
-async def extract_transcript_endpoint(
+def extract_transcript_endpoint(
     request: ExtractRequest,
     background_tasks: BackgroundTasks
 ):
@@ -152,23 +194,23 @@ async def extract_transcript_endpoint(
         job_id = str(uuid.uuid4())
         
         # Create job entry
-        jobs[job_id] = JobResponse(
+        job = job_store.create(JobResponse(
             job_id=job_id,
             status=JobStatus.PENDING,
             progress=0
-        )
+        ))
         
         # Start background processing
         background_tasks.add_task(process_single_video_job, job_id, request)
         
-        return jobs[job_id]
+        return job
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/fetch-channel", response_model=JobResponse)
-async def fetch_channel_videos(
+def fetch_channel_videos(
     request: ChannelFetchRequest,
     background_tasks: BackgroundTasks
 ):
@@ -177,43 +219,87 @@ async def fetch_channel_videos(
         job_id = str(uuid.uuid4())
         
         # Create job entry
-        jobs[job_id] = JobResponse(
+        job = job_store.create(JobResponse(
             job_id=job_id,
             status=JobStatus.PENDING,
             message=f"Starting to fetch videos from '{request.channel_name}'",
             progress=0
-        )
+        ))
         
         # Start background processing
         background_tasks.add_task(
             process_channel_videos_job, 
             job_id, 
             request.channel_name, 
-            request.max_videos
+            request.max_videos,
+            request.incremental,
+            request.profile
         )
         
-        return jobs[job_id]
+        return job
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/status/{job_id}", response_model=JobResponse)
-async def get_job_status(job_id: str):
+def get_job_status(job_id: str):
     """Get the status of a transcript extraction job"""
-    if job_id not in jobs:
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
+
+@app.get("/api/jobs/{job_id}/events")
+def stream_job_events(job_id: str):
+    """Stream a job's progress as Server-Sent Events until it completes or fails"""
+    if job_store.get(job_id, include_result=False) is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return jobs[job_id]
+    return StreamingResponse(
+        job_events.stream(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/quota")
+def get_quota():
+    """Estimated YouTube API quota used and remaining per key today"""
+    return key_scheduler.report()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Stage latencies, video outcomes, failures, quota use and job queue depth in the Prometheus text format"""
+    return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/api/cache/stats")
+def get_cache_stats():
+    """Get hit/miss counters for the channel lookup cache"""
+    return {"channel_cache": channel_cache.stats()}
 
 
-@app.get("/api/transcripts", response_model=TranscriptListResponse)
-async def list_transcripts(
+# File-reading endpoints are plain functions so FastAPI runs them in its
+# threadpool instead of on the event loop.
+@app.get(
+    "/api/transcripts", 
+    response_model=Union[TranscriptListResponse, TranscriptSummaryListResponse]
+)
+def list_transcripts(
     page: int = Query(1, ge=1),
-    per_page: int = Query(10, ge=1, le=100)
+    per_page: int = Query(10, ge=1, le=100),
+    summary: bool = Query(False, description="Return metadata and sizes instead of full transcript text")
 ):
     """List all saved transcripts"""
     try:
+        if summary:
+            result = transcript_service.list_transcript_summaries(page, per_page)
+            return TranscriptSummaryListResponse(**result)
+        
         result = transcript_service.list_transcripts(page, per_page)
         return TranscriptListResponse(**result)
     
@@ -221,35 +307,59 @@ async def list_transcripts(
         raise HTTPException(status_code=500, detail=f"Error listing transcripts: {str(e)}")
 
 
+@app.get("/api/search", response_model=SearchResponse)
+def search_transcripts(
+    q: str = Query(..., min_length=1, description="Words that must all appear in a segment"),
+    channel: Optional[str] = Query(None, description="Only search this channel"),
+    date_from: Optional[str] = Query(None, description="Earliest video date (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, description="Latest video date (YYYY-MM-DD)"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100)
+):
+    """Full-text search across saved transcripts with timestamped hits"""
+    try:
+        result = transcript_service.search_transcripts(
+            q, channel, date_from, date_to, page, per_page
+        )
+        return SearchResponse(**result)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching transcripts: {str(e)}")
+
+
 @app.get("/api/transcript/{video_id}")
-async def download_transcript(
+def download_transcript(
     video_id: str, 
-    format: ExportFormat = ExportFormat.MARKDOWN
+    format: ExportFormat = ExportFormat.MARKDOWN,
+    start: Optional[float] = Query(None, ge=0, description="Only include segments running at or after this many seconds"),
+    end: Optional[float] = Query(None, ge=0, description="Only include segments starting before this many seconds")
 ):
-    """Download a specific transcript in the requested format"""
+    """Download a specific transcript, or a time range of it, in the requested format"""
+    if start is not None and end is not None and end <= start:
+        raise HTTPException(status_code=400, detail="end must be greater than start")
+    
+    ranged = start is not None or end is not None
     try:
-        content = transcript_service.get_transcript(video_id, format)
-        
-        if content is None:
-            raise HTTPException(status_code=404, detail="Transcript not found")
-        
-        # Return appropriate response based on format
-        if format == ExportFormat.MARKDOWN:
+        # Whole markdown transcripts are served straight from disk
+        if format == ExportFormat.MARKDOWN and not ranged:
+            file_path = transcript_service.get_transcript_file(video_id)
+            if not file_path:
+                raise HTTPException(status_code=404, detail="Transcript not found")
             return FileResponse(
-                content=content,
+                path=file_path,
                 media_type="text/markdown",
                 filename=f"{video_id}.md"
             )
-        elif format == ExportFormat.TEXT:
-            return JSONResponse(content={"text": content})
-        elif format == ExportFormat.SRT:
-            return FileResponse(
-                content=content,
-                media_type="text/plain",
-                filename=f"{video_id}.srt"
-            )
-        elif format == ExportFormat.JSON:
-            return JSONResponse(content={"transcript": content})
+        
+        chunks = transcript_service.iter_transcript(video_id, format, start, end)
+        if chunks is None:
+            raise HTTPException(status_code=404, detail="Transcript not found")
+        
+        return StreamingResponse(
+            chunks,
+            media_type=MEDIA_TYPES[format.value],
+            headers=download_headers(video_id, format.value)
+        )
         
     except HTTPException:
         raise
@@ -0,0 +1,101 @@
+"""Server-Sent Events streams of job progress"""
+import asyncio
+import threading
+from typing import AsyncIterator, Dict, List, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.api_models import JobStatus
+from backend.job_store import JobStore, job_store
+
+# Jobs running in another worker process don't notify this one, so open
+# streams also re-read the store this often
+RECHECK_SECONDS = 2.0
+
+# Comment lines keep idle connections from being closed by proxies
+HEARTBEAT_SECONDS = 15.0
+
+FINISHED = (JobStatus.COMPLETED, JobStatus.FAILED)
+
+
+class JobEventBroker:
+    """Wakes the open event streams of a job whenever the store reports a change
+
+    Job functions update the store from executor threads, so each wake-up
+    is handed to the subscriber's event loop with ``call_soon_threadsafe``.
+    Wake-ups coalesce: a stream re-reads the job once however many updates
+    happened since it last looked.
+    """
+
+    def __init__(self, store: JobStore):
+        self.store = store
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        store.add_listener(self.notify)
+
+    def subscribe(self, job_id: str) -> asyncio.Event:
+        """Register the running event loop for wake-ups about a job"""
+        event = asyncio.Event()
+        with self._lock:
+            self._subscribers.setdefault(job_id, set()).add((asyncio.get_running_loop(), event))
+        return event
+
+    def unsubscribe(self, job_id: str, event: asyncio.Event) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, set())
+            subscribers.difference_update({entry for entry in subscribers if entry[1] is event})
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def notify(self, job_id: str) -> None:
+        """Wake every stream watching a job; safe to call from any thread"""
+        with self._lock:
+            subscribers: List = list(self._subscribers.get(job_id, ()))
+        for loop, event in subscribers:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The subscriber's loop has already closed
+                pass
+
+    async def stream(self, job_id: str) -> AsyncIterator[str]:
+        """Yield SSE messages for a job until it completes or fails
+
+        Sends a ``progress`` event with the job each time it changes, then a
+        final ``done`` event including the result.
+        """
+        event = self.subscribe(job_id)
+        try:
+            last_sent = None
+            idle = 0.0
+            while True:
+                job = await run_in_threadpool(self.store.get, job_id, False)
+                if job is None:
+                    yield "event: error\ndata: {\"error\": \"Job not found\"}\n\n"
+                    return
+
+                if job.status in FINISHED:
+                    job = await run_in_threadpool(self.store.get, job_id, True) or job
+                    yield f"event: done\ndata: {job.model_dump_json()}\n\n"
+                    return
+
+                snapshot = job.model_dump_json()
+                if snapshot != last_sent:
+                    yield f"event: progress\ndata: {snapshot}\n\n"
+                    last_sent = snapshot
+                    idle = 0.0
+                elif idle >= HEARTBEAT_SECONDS:
+                    yield ": keepalive\n\n"
+                    idle = 0.0
+
+                try:
+                    await asyncio.wait_for(event.wait(), RECHECK_SECONDS)
+                except asyncio.TimeoutError:
+                    idle += RECHECK_SECONDS
+                event.clear()
+        finally:
+            self.unsubscribe(job_id, event)
+
+
+# Global broker, fed by the global job store
+job_events = JobEventBroker(job_store)
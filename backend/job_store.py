@@ -0,0 +1,311 @@
+"""Persistent job storage shared by every API worker"""
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+from config import config
+from backend.api_models import JobResponse, JobStatus, TranscriptResponse
+
+
+class JobStore(ABC):
+    """Where background job state lives between status requests
+
+    Jobs expire ``ttl_seconds`` after their last update. A job's result is
+    stored separately from its status row and only loaded when asked for,
+    so progress updates and polling never copy transcript text around.
+    Listeners are called with the job ID after every create and update.
+    """
+
+    def __init__(self, ttl_seconds: int = 24 * 3600):
+        self.ttl_seconds = ttl_seconds
+        self._listeners: List[Callable[[str], None]] = []
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """Call ``listener(job_id)`` whenever a job in this process changes"""
+        self._listeners.append(listener)
+
+    def _notify(self, job_id: str) -> None:
+        for listener in self._listeners:
+            listener(job_id)
+
+    @abstractmethod
+    def create(self, job: JobResponse) -> JobResponse:
+        """Store a new job"""
+
+    @abstractmethod
+    def get(self, job_id: str, include_result: bool = True) -> Optional[JobResponse]:
+        """Get a job, or None if it doesn't exist or has expired"""
+
+    @abstractmethod
+    def update(
+        self,
+        job_id: str,
+        status: Optional[JobStatus] = None,
+        message: Optional[str] = None,
+        progress: Optional[int] = None,
+        result: Optional[TranscriptResponse] = None
+    ) -> None:
+        """Change the given fields of a job and push back its expiry"""
+
+    @abstractmethod
+    def evict_expired(self) -> int:
+        """Remove expired jobs, returning how many were removed"""
+
+
+class SQLiteJobStore(JobStore):
+    """Job store in a SQLite file, shared by every process on the host
+
+    Runs in WAL mode with a busy timeout like the other caches, so any
+    uvicorn worker can read jobs started by another. Expired jobs are
+    evicted whenever a job is created, and the oldest jobs beyond
+    ``max_jobs`` are dropped.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = 24 * 3600, max_jobs: int = 10000):
+        super().__init__(ttl_seconds)
+        self.path = path
+        self.max_jobs = max_jobs
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the schema on first use"""
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    message TEXT,
+                    progress INTEGER,
+                    has_result INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_updated_at ON jobs (updated_at);
+                CREATE TABLE IF NOT EXISTS job_results (
+                    job_id TEXT PRIMARY KEY,
+                    result TEXT NOT NULL
+                );
+                """
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def create(self, job: JobResponse) -> JobResponse:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO jobs (job_id, status, message, progress, has_result, updated_at) "
+                    "VALUES (?, ?, ?, ?, 0, ?)",
+                    (job.job_id, job.status.value, job.message, job.progress, time.time())
+                )
+                self._evict(conn)
+        finally:
+            conn.close()
+        if job.result is not None:
+            self.update(job.job_id, result=job.result)
+        self._notify(job.job_id)
+        return job
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[JobResponse]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE job_id = ? AND updated_at >= ?",
+                (job_id, time.time() - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                return None
+
+            result = None
+            if include_result and row['has_result']:
+                result_row = conn.execute(
+                    "SELECT result FROM job_results WHERE job_id = ?", (job_id,)
+                ).fetchone()
+                if result_row:
+                    result = TranscriptResponse.model_validate_json(result_row['result'])
+        finally:
+            conn.close()
+
+        return JobResponse(
+            job_id=row['job_id'],
+            status=JobStatus(row['status']),
+            message=row['message'],
+            progress=row['progress'],
+            result=result
+        )
+
+    def update(
+        self,
+        job_id: str,
+        status: Optional[JobStatus] = None,
+        message: Optional[str] = None,
+        progress: Optional[int] = None,
+        result: Optional[TranscriptResponse] = None
+    ) -> None:
+        fields: Dict = {'updated_at': time.time()}
+        if status is not None:
+            fields['status'] = status.value
+        if message is not None:
+            fields['message'] = message
+        if progress is not None:
+            fields['progress'] = progress
+        if result is not None:
+            fields['has_result'] = 1
+
+        conn = self._connect()
+        try:
+            with conn:
+                if result is not None:
+                    # Only for known jobs; eviction never looks for results of jobs it didn't remove
+                    conn.execute(
+                        "INSERT OR REPLACE INTO job_results (job_id, result) "
+                        "SELECT ?, ? WHERE EXISTS (SELECT 1 FROM jobs WHERE job_id = ?)",
+                        (job_id, result.model_dump_json(), job_id)
+                    )
+                conn.execute(
+                    f"UPDATE jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE job_id = ?",
+                    (*fields.values(), job_id)
+                )
+        finally:
+            conn.close()
+        self._notify(job_id)
+
+    def evict_expired(self) -> int:
+        conn = self._connect()
+        try:
+            with conn:
+                return self._evict(conn)
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """Drop expired jobs and the oldest jobs beyond the limit, with their results"""
+        removed = conn.execute(
+            "DELETE FROM jobs WHERE updated_at < ?", (time.time() - self.ttl_seconds,)
+        ).rowcount
+        removed += conn.execute(
+            "DELETE FROM jobs WHERE rowid IN ("
+            " SELECT rowid FROM jobs ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_jobs,)
+        ).rowcount
+        if removed:
+            conn.execute("DELETE FROM job_results WHERE job_id NOT IN (SELECT job_id FROM jobs)")
+        return removed
+
+
+class RedisJobStore(JobStore):
+    """Job store in Redis (or any server speaking its protocol)
+
+    Each job is a hash with a native key expiry, and its result a separate
+    key with the same expiry, so every worker and host pointed at the same
+    server sees the same jobs. Needs the optional ``redis`` package.
+    """
+
+    KEY_PREFIX = "youtube-utilities:job:"
+
+    def __init__(self, url: str, ttl_seconds: int = 24 * 3600):
+        super().__init__(ttl_seconds)
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "JOB_STORE=redis requires the redis package. Install it with: pip install redis"
+            )
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}{job_id}"
+
+    def _result_key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}{job_id}:result"
+
+    def create(self, job: JobResponse) -> JobResponse:
+        fields = {'status': job.status.value, 'has_result': 0}
+        if job.message is not None:
+            fields['message'] = job.message
+        if job.progress is not None:
+            fields['progress'] = job.progress
+
+        pipe = self.client.pipeline()
+        pipe.delete(self._job_key(job.job_id), self._result_key(job.job_id))
+        pipe.hset(self._job_key(job.job_id), mapping=fields)
+        pipe.expire(self._job_key(job.job_id), self.ttl_seconds)
+        pipe.execute()
+        if job.result is not None:
+            self.update(job.job_id, result=job.result)
+        self._notify(job.job_id)
+        return job
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[JobResponse]:
+        fields = self.client.hgetall(self._job_key(job_id))
+        if not fields:
+            return None
+
+        result = None
+        if include_result and fields.get('has_result') == '1':
+            raw = self.client.get(self._result_key(job_id))
+            if raw:
+                result = TranscriptResponse.model_validate_json(raw)
+
+        return JobResponse(
+            job_id=job_id,
+            status=JobStatus(fields['status']),
+            message=fields.get('message'),
+            progress=int(fields['progress']) if 'progress' in fields else None,
+            result=result
+        )
+
+    def update(
+        self,
+        job_id: str,
+        status: Optional[JobStatus] = None,
+        message: Optional[str] = None,
+        progress: Optional[int] = None,
+        result: Optional[TranscriptResponse] = None
+    ) -> None:
+        fields: Dict = {}
+        if status is not None:
+            fields['status'] = status.value
+        if message is not None:
+            fields['message'] = message
+        if progress is not None:
+            fields['progress'] = progress
+        if result is not None:
+            fields['has_result'] = 1
+
+        pipe = self.client.pipeline()
+        if result is not None:
+            pipe.set(self._result_key(job_id), result.model_dump_json(), ex=self.ttl_seconds)
+        else:
+            pipe.expire(self._result_key(job_id), self.ttl_seconds)
+        if fields:
+            pipe.hset(self._job_key(job_id), mapping=fields)
+        pipe.expire(self._job_key(job_id), self.ttl_seconds)
+        pipe.execute()
+        self._notify(job_id)
+
+    def evict_expired(self) -> int:
+        # Redis expires keys on its own
+        return 0
+
+
+def create_job_store() -> JobStore:
+    """Build the job store selected by JOB_STORE"""
+    if config.job_store == 'redis':
+        return RedisJobStore(config.redis_url, ttl_seconds=config.job_ttl)
+    if config.job_store != 'sqlite':
+        raise ValueError(f"Unknown JOB_STORE '{config.job_store}', expected 'sqlite' or 'redis'")
+    return SQLiteJobStore(config.job_store_path, ttl_seconds=config.job_ttl, max_jobs=config.job_max_entries)
+
+
+# Global job store instance
+job_store = create_job_store()
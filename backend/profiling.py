@@ -0,0 +1,319 @@
+"""On-demand sampling profiles of API requests and background jobs
+
+Disabled unless both PROFILING_ENABLED and ADMIN_TOKEN are set, in which
+case a request sent with an ``X-Profile: 1`` header (and the admin token),
+or a job started with ``"profile": true``, runs while a sampler thread
+records the stacks of every thread that is inside this project's code.
+Profiles are saved under PROFILE_DIR as collapsed stacks (one
+``frame;frame;frame count`` line per stack, the input format of
+flamegraph.pl and speedscope) plus a JSON summary, and served by the
+/api/admin/profiles endpoints. Requests without the header only pay for
+one header lookup.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from config import config
+from backend.api_models import ErrorResponse
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent) + os.sep
+
+SAMPLER_THREAD_PREFIX = "profile-sampler"
+
+PROFILE_ID_PATTERN = re.compile(r'^[\w-]+$')
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+# Functions kept in a saved summary; the API returns the first ``limit``
+SAVED_TOP_FUNCTIONS = 500
+
+
+def _frame_label(code) -> str:
+    """``function (path:first line)``, with paths relative to the project or shortened"""
+    filename = code.co_filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = filename[len(PROJECT_ROOT):]
+    else:
+        filename = os.path.join(*Path(filename).parts[-2:]) if filename else "?"
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks of every thread at a fixed interval from a background thread
+
+    Only stacks with at least one frame in this project's code are kept, so
+    idle server and executor threads don't drown out the work. Each stack
+    is rooted at its thread's name. Other requests or jobs running at the
+    same time are sampled too.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = max(0.001, interval)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name=f"{SAMPLER_THREAD_PREFIX}-{uuid.uuid4().hex[:8]}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            name = names.get(ident, str(ident))
+            if name.startswith(SAMPLER_THREAD_PREFIX):
+                continue
+
+            labels = []
+            in_project = False
+            while frame is not None:
+                code = frame.f_code
+                in_project = in_project or code.co_filename.startswith(PROJECT_ROOT)
+                labels.append(_frame_label(code))
+                frame = frame.f_back
+            if not in_project:
+                continue
+
+            labels.append(name)
+            labels.reverse()
+            self.stacks[";".join(labels)] += 1
+        self.samples += 1
+
+
+def top_functions(stacks: Dict[str, int], limit: int = 30) -> List[Dict]:
+    """Functions by samples spent in them (``self``), then under them (``total``)
+
+    Ordering by ``self`` first keeps thread bootstrap frames, which are under
+    every sample, from crowding out where the time actually goes.
+    """
+    own = Counter()
+    total = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")[1:]
+        if not frames:
+            continue
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    ranked = sorted(total, key=lambda function: (own[function], total[function]), reverse=True)
+    return [
+        {'function': function, 'self': own[function], 'total': total[function]}
+        for function in ranked[:limit]
+    ]
+
+
+class ProfileStore:
+    """Saved profiles in a directory: ``{id}.folded`` stacks and ``{id}.json`` summaries
+
+    The directory may be shared by every API worker. Only the newest
+    ``max_profiles`` are kept.
+    """
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = Path(directory)
+        self.max_profiles = max(1, max_profiles)
+
+    def _path(self, profile_id: str, suffix: str) -> Path:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            raise ValueError(f"Invalid profile ID '{profile_id}'")
+        return self.directory / f"{profile_id}{suffix}"
+
+    def save(self, summary: Dict, stacks: Dict[str, int]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self._path(summary['id'], '.folded'), 'w', encoding='utf-8') as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+        # The summary goes last; listings only show profiles that have one
+        with open(self._path(summary['id'], '.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        self._evict()
+
+    def _evict(self) -> None:
+        summaries = sorted(self.directory.glob('*.json'), key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in summaries[self.max_profiles:]:
+            for stale in (path, path.with_suffix('.folded')):
+                try:
+                    stale.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[Dict]:
+        """Saved profile summaries without their function tables, newest first"""
+        if not self.directory.exists():
+            return []
+
+        profiles = []
+        for path in self.directory.glob('*.json'):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    summary = json.load(f)
+            except (OSError, ValueError):
+                continue
+            summary.pop('top_functions', None)
+            profiles.append(summary)
+        profiles.sort(key=lambda summary: summary['started_at'], reverse=True)
+        return profiles
+
+    def get(self, profile_id: str) -> Optional[Dict]:
+        try:
+            with open(self._path(profile_id, '.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def stacks_path(self, profile_id: str) -> Optional[Path]:
+        try:
+            path = self._path(profile_id, '.folded')
+        except ValueError:
+            return None
+        return path if path.exists() else None
+
+
+def _save_profile(profiler: SamplingProfiler, summary: Dict) -> None:
+    """Stop the sampler, rank its functions and save the profile"""
+    profiler.stop()
+    summary['samples'] = profiler.samples
+    summary['top_functions'] = top_functions(profiler.stacks, SAVED_TOP_FUNCTIONS)
+    try:
+        profile_store.save(summary, profiler.stacks)
+    except Exception as e:
+        print(f"Could not save profile {summary['id']}: {e}")
+
+
+@asynccontextmanager
+async def profiling(kind: str, target: str, profile_id: Optional[str] = None) -> AsyncIterator[str]:
+    """Sample the process while the block runs and save the profile
+
+    Yields the profile ID. Stopping the sampler, ranking and saving run on
+    the threadpool, off the event loop. Failing to save a profile is
+    reported and never fails the request or job that was profiled.
+    """
+    profile_id = profile_id or f"{kind}-{uuid.uuid4().hex[:12]}"
+    profiler = SamplingProfiler(config.profile_interval)
+    started_at = datetime.now()
+    started = time.perf_counter()
+    profiler.start()
+    try:
+        yield profile_id
+    finally:
+        summary = {
+            'id': profile_id,
+            'kind': kind,
+            'target': target,
+            'started_at': started_at.isoformat(),
+            'duration_seconds': time.perf_counter() - started,
+            'interval_seconds': profiler.interval
+        }
+        await run_in_threadpool(_save_profile, profiler, summary)
+
+
+def profiling_available() -> bool:
+    """Whether profiling is enabled and protected by an ADMIN_TOKEN"""
+    return config.profiling_enabled and config.admin_token is not None
+
+
+def job_profiling(job_id: str, requested: bool):
+    """Profile a background job as ``job-{job_id}`` if asked to and profiling is available"""
+    if requested and profiling_available():
+        return profiling("job", job_id, profile_id=f"job-{job_id}")
+    return nullcontext()
+
+
+def _has_admin_token(token: Optional[str]) -> bool:
+    return config.admin_token is not None and token == config.admin_token
+
+
+async def profile_requests(request: Request, call_next):
+    """Middleware profiling requests sent with a truthy ``X-Profile`` header
+
+    The profile covers the handler up to the start of the response, so the
+    body of a streamed response is not included. Its ID is returned in the
+    ``X-Profile-Id`` response header.
+    """
+    if request.headers.get('x-profile', '').lower() not in TRUE_VALUES:
+        return await call_next(request)
+    if not _has_admin_token(request.headers.get('x-admin-token')):
+        return JSONResponse(status_code=403, content=ErrorResponse(error="Invalid admin token").dict())
+
+    async with profiling("request", f"{request.method} {request.url.path}") as profile_id:
+        response = await call_next(request)
+    response.headers['X-Profile-Id'] = profile_id
+    return response
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject admin requests without the configured ADMIN_TOKEN"""
+    if not _has_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/api/admin/profiles", dependencies=[Depends(require_admin)])
+
+
+@router.get("")
+def list_profiles():
+    """Saved request and job profiles, newest first"""
+    return {"profiles": profile_store.list()}
+
+
+@router.get("/{profile_id}")
+def get_profile(profile_id: str, limit: int = Query(30, ge=1, le=500)):
+    """A profile's summary with its busiest functions"""
+    summary = profile_store.get(profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    summary['top_functions'] = summary['top_functions'][:limit]
+    return summary
+
+
+@router.get("/{profile_id}/stacks")
+def download_profile_stacks(profile_id: str):
+    """A profile's collapsed stacks, for flamegraph.pl or speedscope"""
+    path = profile_store.stacks_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path=path, media_type="text/plain", filename=f"{profile_id}.folded")
+
+
+def add_profiling(app: FastAPI) -> None:
+    """Install the profiling middleware and admin endpoints if profiling is enabled
+
+    Profiles expose source paths and timings, so nothing is installed
+    without an ADMIN_TOKEN to guard them.
+    """
+    if not config.profiling_enabled:
+        return
+    if config.admin_token is None:
+        print("WARNING: PROFILING_ENABLED is set but ADMIN_TOKEN is not; profiling stays disabled")
+        return
+    app.middleware("http")(profile_requests)
+    app.include_router(router)
+
+
+# Global profile store, shared with other workers through the profile directory
+profile_store = ProfileStore(config.profile_dir, config.profile_max_files)
@@ -0,0 +1,192 @@
+"""Compact binary storage for transcript segments"""
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+# File layout, all arrays in the writer's native byte order:
+#   header   magic, byte order flag, segment count
+#   starts   float64[count]
+#   durations float64[count]
+#   offsets  uint32[count + 1] into the text blob
+#   text     UTF-8 blob of every segment's text back to back
+MAGIC = b'YTSEG\x00\x01\x00'
+HEADER = struct.Struct('<8sB3xI')
+BYTE_ORDER = 0 if sys.byteorder == 'little' else 1
+
+FLOAT_CODE = 'd'
+OFFSET_CODE = 'I'
+if array(OFFSET_CODE).itemsize != 4:
+    OFFSET_CODE = 'L'
+
+
+def write_segment_file(path: Path, segments: Iterable[Dict]) -> int:
+    """Write segments to ``path`` in the binary format, returning the segment count
+
+    The file is written under a private temporary name and renamed into
+    place so readers never map a partial file.
+    """
+    starts = array(FLOAT_CODE)
+    durations = array(FLOAT_CODE)
+    offsets = array(OFFSET_CODE, [0])
+    text = bytearray()
+
+    for entry in segments:
+        starts.append(float(entry['start']))
+        durations.append(float(entry.get('duration', 0)))
+        text += entry['text'].encode('utf-8')
+        offsets.append(len(text))
+
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, BYTE_ORDER, len(starts)))
+        f.write(starts)
+        f.write(durations)
+        f.write(offsets)
+        f.write(text)
+    os.replace(tmp_path, path)
+
+    return len(starts)
+
+
+class SegmentFile:
+    """Read-only, memory-mapped view of a binary segment file
+
+    ``starts`` and ``durations`` are typed memoryviews straight over the
+    mapping, and segment text is only decoded when a segment is accessed,
+    so opening a transcript costs the same regardless of its length.
+    Raises ValueError if the file is not a segment file this machine can
+    read.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._mmap: Optional[mmap.mmap] = None
+        self._views = []
+        self._max_duration: Optional[float] = None
+
+        with open(self.path, 'rb') as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"Empty segment file: {self.path}")
+
+        try:
+            self._map_arrays()
+        except Exception:
+            self.close()
+            raise
+
+    def _map_arrays(self) -> None:
+        """Validate the header and cast the array sections of the mapping"""
+        try:
+            magic, byte_order, count = HEADER.unpack_from(self._mmap, 0)
+        except struct.error:
+            raise ValueError(f"Truncated segment file: {self.path}")
+        if magic != MAGIC:
+            raise ValueError(f"Not a segment file: {self.path}")
+        if byte_order != BYTE_ORDER:
+            raise ValueError(f"Segment file written with a different byte order: {self.path}")
+
+        float_size = array(FLOAT_CODE).itemsize
+        offset_size = array(OFFSET_CODE).itemsize
+        text_start = HEADER.size + 2 * count * float_size + (count + 1) * offset_size
+        if len(self._mmap) < text_start:
+            raise ValueError(f"Truncated segment file: {self.path}")
+
+        view = memoryview(self._mmap)
+        self._views.append(view)
+        position = HEADER.size
+        self.starts = self._cast(view[position:position + count * float_size], FLOAT_CODE)
+        position += count * float_size
+        self.durations = self._cast(view[position:position + count * float_size], FLOAT_CODE)
+        position += count * float_size
+        self._offsets = self._cast(view[position:text_start], OFFSET_CODE)
+        self._text = view[text_start:]
+        self._views.append(self._text)
+
+        if self._offsets[-1] > len(self._text):
+            raise ValueError(f"Truncated segment file: {self.path}")
+
+    def _cast(self, view: memoryview, code: str) -> memoryview:
+        """Cast a byte slice to a typed view, keeping it for release on close"""
+        self._views.append(view)
+        typed = view.cast(code)
+        self._views.append(typed)
+        return typed
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def max_duration(self) -> float:
+        """Longest segment duration, computed on first use"""
+        if self._max_duration is None:
+            self._max_duration = max(self.durations, default=0.0)
+        return self._max_duration
+
+    def text(self, index: int) -> str:
+        """Decode the text of one segment"""
+        return str(self._text[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+    def __getitem__(self, index: int) -> Dict:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return {'text': self.text(index), 'start': self.starts[index], 'duration': self.durations[index]}
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.iter_range(0, len(self))
+
+    def iter_range(self, first: int, last: int) -> Iterator[Dict]:
+        """Yield segments ``first`` up to (not including) ``last`` as dicts"""
+        for index in range(max(first, 0), min(last, len(self))):
+            yield {'text': self.text(index), 'start': self.starts[index], 'duration': self.durations[index]}
+
+    def find_range(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[int, int]:
+        """Index range of the segments overlapping ``[start, end)`` seconds
+
+        Binary-searches the sorted start times; a segment that starts before
+        ``start`` is included while it is still running at ``start``, along
+        with every segment after it. Only segments starting within the
+        longest duration before ``start`` can still be running, so only those
+        are checked.
+        """
+        first = 0
+        if start is not None:
+            first = bisect_left(self.starts, start)
+            window = bisect_left(self.starts, start - self.max_duration, 0, first)
+            for index in range(window, first):
+                if self.starts[index] + self.durations[index] > start:
+                    first = index
+                    break
+        last = len(self) if end is None else bisect_left(self.starts, end)
+        return first, max(first, last)
+
+    def close(self) -> None:
+        """Release every view and unmap the file"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> 'SegmentFile':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def iter_closing(segment_file: SegmentFile, first: int = 0, last: Optional[int] = None) -> Iterator[Dict]:
+    """Yield a range of segments, closing the file once iteration ends"""
+    with segment_file:
+        yield from segment_file.iter_range(first, len(segment_file) if last is None else last)
@@ -0,0 +1,266 @@
+"""Embedded SQLite index of transcript files"""
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Bump when the schema or the parsing of transcript files changes in a way
+# that needs existing files re-indexed (3: files without a --- separator)
+SCHEMA_VERSION = 3
+
+COLUMNS = (
+    'video_id', 'channel_name', 'video_date', 'video_title',
+    'path', 'size', 'mtime', 'segment_count'
+)
+
+
+class TranscriptIndex:
+    """Metadata index of the transcripts in the output directory
+
+    Keeps one row per transcript file so listing, lookup by video ID and
+    pagination are served from B-tree indexes instead of globbing and
+    stat-ing the whole directory, plus an FTS5 index over every transcript
+    segment for full-text search. The database runs in WAL mode so API
+    workers and CLI runs can share it.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the schema on first use"""
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS transcripts (
+                    video_id TEXT NOT NULL,
+                    channel_name TEXT NOT NULL,
+                    video_date TEXT NOT NULL,
+                    video_title TEXT,
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    segment_count INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS transcripts_video_id ON transcripts (video_id);
+                CREATE INDEX IF NOT EXISTS transcripts_mtime ON transcripts (mtime DESC);
+                CREATE INDEX IF NOT EXISTS transcripts_channel_date
+                    ON transcripts (channel_name, video_date DESC);
+                CREATE TABLE IF NOT EXISTS index_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS segments (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    start REAL NOT NULL,
+                    text TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS segments_path ON segments (path);
+                CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+                    text, content='segments', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+                    INSERT INTO segments_fts (rowid, text) VALUES (new.id, new.text);
+                END;
+                CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+                    INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+                END;
+                """
+            )
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Indexes built by an older version get re-synced from scratch
+                conn.execute("DELETE FROM transcripts")
+                conn.execute("DELETE FROM segments")
+                conn.execute("DELETE FROM index_state")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def upsert(self, record: Dict) -> None:
+        """Insert or update the row for a transcript file"""
+        self.upsert_many([record])
+
+    def upsert_many(self, records: Iterable[Dict]) -> None:
+        """Insert or update rows for many transcript files in one transaction
+
+        Each record's ``segments`` (a list of ``(start, text)``) replaces the
+        searchable segments stored for that file. Records are consumed one at
+        a time, so a generator keeps memory bounded to a single file.
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                for record in records:
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO transcripts ({', '.join(COLUMNS)}) "
+                        f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                        tuple(record[column] for column in COLUMNS)
+                    )
+                    conn.execute("DELETE FROM segments WHERE path = ?", (record['path'],))
+                    conn.executemany(
+                        "INSERT INTO segments (path, start, text) VALUES (?, ?, ?)",
+                        [(record['path'], start, text) for start, text in record.get('segments', ())]
+                    )
+        finally:
+            conn.close()
+
+    def remove_paths(self, paths: Iterable[str]) -> None:
+        """Drop rows for files that no longer exist"""
+        conn = self._connect()
+        try:
+            with conn:
+                for path in paths:
+                    conn.execute("DELETE FROM transcripts WHERE path = ?", (path,))
+                    conn.execute("DELETE FROM segments WHERE path = ?", (path,))
+        finally:
+            conn.close()
+
+    def clear(self) -> None:
+        """Remove every row and the recorded directory state"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM transcripts")
+                conn.execute("DELETE FROM segments")
+                conn.execute("DELETE FROM index_state")
+        finally:
+            conn.close()
+
+    def get_by_video_id(self, video_id: str) -> Optional[Dict]:
+        """Get the most recently written row for a video ID"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT * FROM transcripts WHERE video_id = ? ORDER BY mtime DESC LIMIT 1",
+                (video_id,)
+            ).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+
+    def existing_video_ids(self, video_ids: Iterable[str]) -> Set[str]:
+        """The subset of the given video IDs that have a transcript"""
+        video_ids = list(video_ids)
+        if not video_ids:
+            return set()
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT DISTINCT video_id FROM transcripts WHERE video_id IN ({', '.join('?' for _ in video_ids)})",
+                video_ids
+            ).fetchall()
+            return {row[0] for row in rows}
+        finally:
+            conn.close()
+
+    def newest_video_date(self, channel_name: str) -> Optional[str]:
+        """Upload date of the newest transcript saved under a channel name"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT MAX(video_date) FROM transcripts WHERE channel_name = ?", (channel_name,)
+            ).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def page(self, offset: int, limit: int) -> List[Dict]:
+        """Get a page of rows, newest first"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT * FROM transcripts ORDER BY mtime DESC LIMIT ? OFFSET ?",
+                (limit, offset)
+            ).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def search(
+        self,
+        match_query: str,
+        channel_name: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Dict], int]:
+        """Full-text search over transcript segments, best matches first
+
+        ``match_query`` is an FTS5 MATCH expression. Returns the page of hits
+        (with the segment's start time) and the total number of hits.
+        """
+        filters = "segments_fts MATCH ?"
+        params: List = [match_query]
+        if channel_name:
+            filters += " AND t.channel_name = ?"
+            params.append(channel_name)
+        if date_from:
+            filters += " AND t.video_date >= ?"
+            params.append(date_from)
+        if date_to:
+            filters += " AND t.video_date <= ?"
+            params.append(date_to)
+
+        joins = (
+            "FROM segments_fts "
+            "JOIN segments s ON s.id = segments_fts.rowid "
+            "JOIN transcripts t ON t.path = s.path "
+        )
+
+        conn = self._connect()
+        try:
+            total = conn.execute(f"SELECT COUNT(*) {joins} WHERE {filters}", params).fetchone()[0]
+            rows = conn.execute(
+                "SELECT t.video_id, t.channel_name, t.video_date, t.video_title, "
+                "s.start, s.text, bm25(segments_fts) AS score "
+                f"{joins} WHERE {filters} ORDER BY score LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+            return [dict(row) for row in rows], total
+        finally:
+            conn.close()
+
+    def count(self) -> int:
+        """Number of indexed transcripts"""
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+        finally:
+            conn.close()
+
+    def file_stats(self) -> Dict[str, Tuple[int, float]]:
+        """Size and mtime recorded for every indexed file, by path"""
+        conn = self._connect()
+        try:
+            return {row[0]: (row[1], row[2]) for row in conn.execute("SELECT path, size, mtime FROM transcripts")}
+        finally:
+            conn.close()
+
+    def get_state(self, key: str) -> Optional[str]:
+        """Read a bookkeeping value such as the last synced directory mtime"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM index_state WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def set_state(self, key: str, value: str) -> None:
+        """Store a bookkeeping value"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO index_state (key, value) VALUES (?, ?)",
+                    (key, value)
+                )
+        finally:
+            conn.close()
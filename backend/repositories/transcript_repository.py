@@ -1,60 +1,374 @@
 """Repository layer for transcript data access"""
 import os
 import re
+import json
+import threading
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 
+from metrics import repository_seconds, timed
+from transcript_formats import SEGMENT_LINE_PATTERN, iter_markdown_segments
+from backend.repositories.transcript_index import TranscriptIndex
+from backend.repositories.segment_file import SegmentFile, write_segment_file
+
+# Part of the name of segment files derived from markdown; bump to rebuild them
+# when markdown parsing changes (2: files without a --- separator)
+MARKDOWN_SEGMENTS_VERSION = 2
+
+# Filenames look like {channel_name}-{YYYY-MM-DD}-{video_id}; video IDs may contain dashes
+FILENAME_PATTERN = re.compile(r'^(?P<channel>.*)-(?P<date>\d{4}-\d{2}-\d{2})-(?P<video_id>[^.]+)$')
+
 
 class TranscriptRepository:
     """Handles all transcript file operations"""
     
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, cache_dir: Optional[str] = None):
         self.output_dir = Path(output_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.output_dir / '.cache'
+        self.segments_dir = self.cache_dir / 'segments'
+        self.index = TranscriptIndex(self.cache_dir / 'index.db')
         
     def ensure_output_dir(self):
         """Ensure the output directory exists"""
         if not self.output_dir.exists():
             self.output_dir.mkdir(parents=True, exist_ok=True)
     
+    @timed(repository_seconds, repository="transcript", method="save_transcript")
     def save_transcript(self, content: str, channel_name: str, video_date: str, video_id: str) -> str:
         """Save transcript content to file"""
         self.ensure_output_dir()
         filename = f"{channel_name}-{video_date}-{video_id}.md"
         filepath = self.output_dir / filename
+        dir_mtime = self._output_dir_mtime()
         
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(content)
         
+        # Keep the index current; if nothing else touched the directory since the
+        # last sync, this write doesn't need a rescan either
+        self.index.upsert(self._build_index_record(filepath, content.split('\n')))
+        if dir_mtime is not None and self.index.get_state('dir_mtime') == dir_mtime:
+            self.index.set_state('dir_mtime', self._output_dir_mtime())
+        
+        return str(filepath)
+    
+    @timed(repository_seconds, repository="transcript", method="save_segments")
+    def save_segments(
+        self, 
+        video_id: str, 
+        language: str, 
+        segments: List[Dict], 
+        metadata: Optional[Dict] = None
+    ) -> str:
+        """Persist the raw transcript segments fetched for a video
+        
+        Segments are stored per video ID and language in the binary segment
+        format, with a small JSON sidecar holding the fetch time and video
+        metadata, so any export format can later be rendered without going
+        back to YouTube.
+        """
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        count = write_segment_file(self._segment_file_path(video_id, language), segments)
+        
+        # The sidecar is written last, so its presence means the segments are complete
+        filepath = self._segments_path(video_id, language)
+        record = {
+            'video_id': video_id,
+            'language': language,
+            'fetched_at': datetime.now().isoformat(),
+            'metadata': metadata or {},
+            'segment_count': count
+        }
+        
+        # Write to a private temp file and rename so readers never see a partial file
+        tmp_path = filepath.with_name(f"{filepath.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, filepath)
+        
         return str(filepath)
     
+    @timed(repository_seconds, repository="transcript", method="load_segments")
+    def load_segments(self, video_id: str, language: str) -> Optional[Dict]:
+        """Load cached raw segments and metadata for a video, or None if not cached"""
+        record = self._load_segments_record(video_id, language)
+        if record is None or 'segments' in record:
+            return record
+        
+        segment_file = self.open_segments(video_id, language)
+        if segment_file is None:
+            return None
+        with segment_file:
+            record['segments'] = list(segment_file)
+        return record
+    
+    @timed(repository_seconds, repository="transcript", method="open_segments")
+    def open_segments(self, video_id: str, language: str) -> Optional[SegmentFile]:
+        """Memory-map the cached segments for a video, or None if not cached
+        
+        Caches written before the binary format existed are converted on
+        first access. The caller must close the returned file.
+        """
+        path = self._segment_file_path(video_id, language)
+        if not path.exists():
+            record = self._load_segments_record(video_id, language)
+            if not record or 'segments' not in record:
+                return None
+            write_segment_file(path, record['segments'])
+        
+        try:
+            return SegmentFile(path)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable segment file {path}: {e}")
+            return None
+    
+    @timed(repository_seconds, repository="transcript", method="open_transcript_segments")
+    def open_transcript_segments(self, video_id: str, language: str) -> Optional[SegmentFile]:
+        """Memory-map the segments of a saved transcript, or None if there is no transcript
+        
+        Uses the fetch cache when present; otherwise a segment file is derived
+        from the stored markdown (with durations inferred from the next
+        segment's start) and rebuilt whenever the markdown is newer.
+        """
+        filepath = self.get_transcript_by_video_id(video_id)
+        if not filepath:
+            return None
+        
+        segment_file = self.open_segments(video_id, language)
+        if segment_file is not None:
+            return segment_file
+        
+        path = self.segments_dir / f"{filepath.stem}.md.v{MARKDOWN_SEGMENTS_VERSION}.seg"
+        try:
+            if not path.exists() or path.stat().st_mtime_ns < filepath.stat().st_mtime_ns:
+                self.segments_dir.mkdir(parents=True, exist_ok=True)
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    write_segment_file(path, iter_markdown_segments(f))
+            return SegmentFile(path)
+        except (OSError, ValueError) as e:
+            print(f"Could not build segment file for {filepath}: {e}")
+            return None
+    
+    def has_segments(self, video_id: str, language: str) -> bool:
+        """Check whether raw segments are cached for a video"""
+        return self._segments_path(video_id, language).exists()
+    
+    def _load_segments_record(self, video_id: str, language: str) -> Optional[Dict]:
+        """Read the JSON sidecar for a video's cached segments"""
+        filepath = self._segments_path(video_id, language)
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable segment cache {filepath}: {e}")
+            return None
+    
+    def _segments_path(self, video_id: str, language: str) -> Path:
+        return self.segments_dir / f"{video_id}.{language}.json"
+    
+    def _segment_file_path(self, video_id: str, language: str) -> Path:
+        return self.segments_dir / f"{video_id}.{language}.seg"
+    
+    @timed(repository_seconds, repository="transcript", method="list_transcripts")
     def list_transcripts(self, page: int = 1, per_page: int = 10) -> Tuple[List[Path], int]:
-        """List transcript files with pagination"""
+        """List transcript files with pagination, newest first, from the index"""
         if not self.output_dir.exists():
             return [], 0
         
-        # Get files sorted by modification time (newest first)
-        transcript_files = sorted(
-            self.output_dir.glob("*.md"), 
-            key=lambda x: x.stat().st_mtime, 
-            reverse=True
-        )
-        total = len(transcript_files)
+        self.sync_index()
+        rows = self.index.page((page - 1) * per_page, per_page)
+        return [self.output_dir / row['path'] for row in rows], self.index.count()
+    
+    @timed(repository_seconds, repository="transcript", method="list_transcript_summaries")
+    def list_transcript_summaries(self, page: int = 1, per_page: int = 10) -> Tuple[List[Dict], int]:
+        """List index rows (metadata, size, segment count) with pagination, without reading any file"""
+        if not self.output_dir.exists():
+            return [], 0
         
-        # Pagination
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        page_files = transcript_files[start_idx:end_idx]
+        self.sync_index()
+        return self.index.page((page - 1) * per_page, per_page), self.index.count()
+    
+    @timed(repository_seconds, repository="transcript", method="search_segments")
+    def search_segments(
+        self, 
+        query: str, 
+        channel_name: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        page: int = 1, 
+        per_page: int = 20
+    ) -> Tuple[List[Dict], int]:
+        """Search transcript segments for all words in the query, best matches first"""
+        terms = query.split()
+        if not terms or not self.output_dir.exists():
+            return [], 0
+        
+        self.sync_index()
         
-        return page_files, total
+        # Quote every word so user input can't be parsed as FTS5 query syntax
+        match_query = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        return self.index.search(
+            match_query, channel_name, date_from, date_to, (page - 1) * per_page, per_page
+        )
     
+    @timed(repository_seconds, repository="transcript", method="get_transcript_by_video_id")
     def get_transcript_by_video_id(self, video_id: str) -> Optional[Path]:
         """Find transcript file by video ID"""
         if not self.output_dir.exists():
             return None
         
-        matching_files = list(self.output_dir.glob(f"*-{video_id}.md"))
-        return matching_files[0] if matching_files else None
+        self.sync_index()
+        row = self.index.get_by_video_id(video_id)
+        return self.output_dir / row['path'] if row else None
+    
+    def iter_unarchived_pages(
+        self, 
+        pages: Iterable[Tuple[List[Tuple[str, str]], int]], 
+        channel_name: str
+    ) -> Iterator[Tuple[List[Tuple[str, str]], int]]:
+        """Filter a channel's newest-first upload pages down to videos not archived yet
+        
+        Takes and yields ``(videos, total)`` pages of ``(video_url, video_date)``.
+        Videos that already have a transcript are dropped before any further
+        network call. Once a page reaches archived videos, or videos older
+        than the newest one archived for the channel, no further pages are
+        consumed, so a lazy page iterator stops requesting them.
+        """
+        if not self.output_dir.exists():
+            yield from pages
+            return
+        
+        self.sync_index()
+        newest_date = self.index.newest_video_date(channel_name)
+        skipped = 0
+        found = 0
+        for page, total in pages:
+            video_ids = [video_url.split('v=')[-1] for video_url, _ in page]
+            archived = self.index.existing_video_ids(video_ids)
+            new_videos = [video for video, video_id in zip(page, video_ids) if video_id not in archived]
+            reached_archive = bool(archived) or (
+                newest_date is not None and any(video_date < newest_date for _, video_date in page)
+            )
+            
+            skipped += len(page) - len(new_videos)
+            found += len(new_videos)
+            if new_videos:
+                yield new_videos, found if reached_archive else max(total - skipped, found)
+            if reached_archive:
+                return
+    
+    @timed(repository_seconds, repository="transcript", method="sync_index")
+    def sync_index(self) -> None:
+        """Pick up transcript files added, changed or removed outside this repository
+        
+        Only rescans when the output directory's mtime changed since the last
+        sync, and only parses files the index hasn't seen or whose size or
+        mtime differ from the indexed row. Rewriting a file in place doesn't
+        change the directory's mtime, so writers go through
+        ``save_transcript``, which updates the index itself.
+        """
+        dir_mtime = self._output_dir_mtime()
+        if dir_mtime is None or self.index.get_state('dir_mtime') == dir_mtime:
+            return
+        
+        on_disk = {
+            entry.name: entry.stat() for entry in os.scandir(self.output_dir)
+            if entry.name.endswith('.md') and entry.is_file()
+        }
+        indexed = self.index.file_stats()
+        
+        changed = [
+            name for name, stat in on_disk.items()
+            if indexed.get(name) != (stat.st_size, stat.st_mtime)
+        ]
+        self.index.upsert_many(self._build_index_record(self.output_dir / name) for name in changed)
+        self.index.remove_paths(set(indexed) - set(on_disk))
+        self.index.set_state('dir_mtime', dir_mtime)
+    
+    def rebuild_index(self) -> int:
+        """Re-index every transcript file in the output directory"""
+        self.index.clear()
+        if not self.output_dir.exists():
+            return 0
+        
+        dir_mtime = self._output_dir_mtime()
+        self.index.upsert_many(
+            self._build_index_record(filepath) for filepath in self.output_dir.glob("*.md")
+        )
+        self.index.set_state('dir_mtime', dir_mtime)
+        return self.index.count()
+    
+    def _output_dir_mtime(self) -> Optional[str]:
+        try:
+            return str(self.output_dir.stat().st_mtime_ns)
+        except FileNotFoundError:
+            return None
+    
+    def _build_index_record(self, filepath: Path, lines: Optional[Iterable[str]] = None) -> Dict:
+        """Build the index row for a transcript file, reading it if lines aren't given"""
+        video_id, channel_name, video_date = self._parse_filename(filepath.stem)
+        
+        if lines is None:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                video_title, segments = self._scan_transcript_lines(f)
+        else:
+            video_title, segments = self._scan_transcript_lines(lines)
+        
+        stat = filepath.stat()
+        return {
+            'video_id': video_id,
+            'channel_name': channel_name,
+            'video_date': video_date,
+            'video_title': video_title,
+            'path': filepath.name,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'segment_count': len(segments),
+            'segments': segments
+        }
+    
+    @staticmethod
+    def _scan_transcript_lines(lines: Iterable[str]) -> Tuple[Optional[str], List[Tuple[float, str]]]:
+        """Find the title in the header and parse the segment lines
+        
+        Segment lines follow the ``---`` separator; in older files without a
+        header block or separator, every segment line counts.
+        """
+        video_title = None
+        segments = []
+        in_transcript = False
+        
+        for i, line in enumerate(lines):
+            match = SEGMENT_LINE_PATTERN.match(line)
+            if match:
+                segments.append((float(match.group('start')), match.group('text').strip()))
+            elif not in_transcript and line.strip() == '---':
+                # Anything segment-like above the separator was header text
+                in_transcript = True
+                segments = []
+            elif not in_transcript and video_title is None and i < 10:
+                if line.startswith('# '):
+                    video_title = line[2:].strip()
+                elif line.startswith('Title: '):
+                    video_title = line[7:].strip()
+        
+        return video_title, segments
+    
+    @staticmethod
+    def _parse_filename(filename: str) -> Tuple[str, str, str]:
+        """Split a transcript filename into video ID, channel name and date"""
+        match = FILENAME_PATTERN.match(filename)
+        if match:
+            return match.group('video_id'), match.group('channel'), match.group('date')
+        
+        # Fallback for unexpected format
+        parts = filename.rsplit('-', 1)
+        if len(parts) == 2:
+            return parts[1], parts[0], datetime.now().strftime("%Y-%m-%d")
+        return filename, "unknown_channel", datetime.now().strftime("%Y-%m-%d")
     
     def read_transcript(self, filepath: Path) -> str:
         """Read transcript content from file"""
@@ -63,31 +377,7 @@ class TranscriptRepository:
     
     def parse_transcript_metadata(self, filepath: Path) -> dict:
         """Parse metadata from transcript filename and content"""
-        filename = filepath.stem
-        
-        # Parse filename
-        parts = filename.rsplit('-', 1)
-        if len(parts) == 2:
-            video_id = parts[1]
-            remaining = parts[0]
-            
-            # Extract date
-            date_pattern = r'(\d{4}-\d{2}-\d{2})'
-            date_match = re.search(date_pattern, remaining)
-            
-            if date_match:
-                video_date = date_match.group(1)
-                date_start = remaining.find(video_date)
-                channel_name = remaining[:date_start].rstrip('-')
-            else:
-                # Fallback parsing
-                channel_name = remaining
-                video_date = datetime.now().strftime("%Y-%m-%d")
-        else:
-            # Fallback for unexpected format
-            channel_name = "unknown_channel"
-            video_date = datetime.now().strftime("%Y-%m-%d")
-            video_id = filename
+        video_id, channel_name, video_date = self._parse_filename(filepath.stem)
         
         # Read content to extract title
         content = self.read_transcript(filepath)
@@ -1,97 +1,227 @@
 """Repository layer for YouTube API access"""
-from typing import List, Tuple, Optional, Dict
-import googleapiclient.discovery
-from youtube_transcript_api import YouTubeTranscriptApi
+from typing import Iterator, List, Tuple, Optional, Dict
+
+from config import config
+from metrics import repository_seconds, timed
+from key_scheduler import KeyScheduler, key_scheduler as shared_key_scheduler
+from transcript_fetcher import fetch_transcript
+from channel_cache import ChannelCache, channel_cache as shared_channel_cache
+
+# videos.list accepts at most 50 comma-separated IDs per request
+MAX_IDS_PER_VIDEOS_REQUEST = 50
+
+# playlistItems.list returns at most 50 items per page
+MAX_PLAYLIST_ITEMS_PER_PAGE = 50
 
 
 class YouTubeRepository:
     """Handles all YouTube API operations"""
     
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self._youtube = None
+    def __init__(
+        self, 
+        api_key: Optional[str] = None, 
+        key_scheduler: Optional[KeyScheduler] = None,
+        channel_cache: Optional[ChannelCache] = None
+    ):
+        # Calls are spread over every configured key unless a single key is given
+        if key_scheduler is None and api_key:
+            key_scheduler = KeyScheduler([api_key])
+        self.key_scheduler = key_scheduler or shared_key_scheduler
+        self.channel_cache = channel_cache or shared_channel_cache
     
-    @property
-    def youtube(self):
-        """Lazy initialization of YouTube API client"""
-        if self._youtube is None:
-            self._youtube = googleapiclient.discovery.build(
-                "youtube", "v3", developerKey=self.api_key
-            )
-        return self._youtube
+    def _execute(self, resource: str, build_request):
+        """Execute a request on the API key with the most quota left"""
+        return self.key_scheduler.execute(resource, build_request)
     
+    @timed(repository_seconds, repository="youtube", method="get_channel_id")
     def get_channel_id(self, channel_name: str) -> Optional[str]:
-        """Get channel ID from channel name"""
+        """Get channel ID from channel name, using the channel cache when possible"""
+        channel_id = self.channel_cache.get_channel_id(channel_name)
+        if channel_id:
+            return channel_id
+        
         try:
-            request = self.youtube.search().list(
+            response = self._execute("search", lambda youtube: youtube.search().list(
                 part="snippet",
                 q=channel_name,
                 type="channel",
                 maxResults=1
-            )
-            response = request.execute()
+            ))
             
             for item in response.get("items", []):
                 if item["id"].get("channelId"):
-                    return item["id"]["channelId"]
+                    channel_id = item["id"]["channelId"]
+                    self.channel_cache.set_channel_id(channel_name, channel_id)
+                    return channel_id
             return None
         except Exception as e:
             raise Exception(f"Failed to get channel ID: {str(e)}")
     
-    def get_channel_videos(self, channel_id: str, max_videos: int) -> List[Tuple[str, str]]:
-        """Get recent videos from a channel"""
+    @timed(repository_seconds, repository="youtube", method="get_channel_metadata")
+    def get_channel_metadata(self, channel_id: str) -> Optional[Dict[str, Optional[str]]]:
+        """Get channel title and uploads playlist ID, using the channel cache when possible"""
+        metadata = self.channel_cache.get_channel_metadata(channel_id)
+        if metadata:
+            return metadata
+        
         try:
-            request = self.youtube.search().list(
-                part="snippet",
-                channelId=channel_id,
-                maxResults=max_videos,
-                order="date",
-                type="video"
-            )
-            response = request.execute()
+            response = self._execute("channels", lambda youtube: youtube.channels().list(
+                part="snippet,contentDetails",
+                id=channel_id
+            ))
             
-            video_data = []
             for item in response.get("items", []):
-                if item["id"].get("videoId"):
-                    video_id = item["id"]["videoId"]
+                metadata = {
+                    'title': item["snippet"].get("title"),
+                    'uploads_playlist_id': item["contentDetails"]["relatedPlaylists"]["uploads"]
+                }
+                self.channel_cache.set_channel_metadata(channel_id, metadata)
+                return metadata
+            return None
+        except Exception as e:
+            raise Exception(f"Failed to get channel metadata: {str(e)}")
+    
+    def get_uploads_playlist_id(self, channel_id: str) -> Optional[str]:
+        """Get the ID of the playlist holding every upload of a channel"""
+        metadata = self.get_channel_metadata(channel_id)
+        return metadata['uploads_playlist_id'] if metadata else None
+    
+    def iter_channel_video_pages(
+        self, 
+        channel_id: str, 
+        max_videos: Optional[int] = None
+    ) -> Iterator[Tuple[List[Tuple[str, str]], int]]:
+        """Lazily page through a channel's uploads, newest first
+        
+        Uses the uploads playlist (1 quota unit per page of 50) rather than
+        search. Yields ``(videos, total)`` per page, where ``videos`` is a list
+        of ``(video_url, video_date)`` and ``total`` is the number of videos
+        expected overall. Pages are only requested as the caller iterates, so
+        work on one page can start before the next is fetched.
+        """
+        playlist_id = self.get_uploads_playlist_id(channel_id)
+        if not playlist_id:
+            return
+        
+        remaining = max_videos
+        page_token = None
+        while remaining is None or remaining > 0:
+            page_size = min(config.max_results_per_page, MAX_PLAYLIST_ITEMS_PER_PAGE)
+            if remaining is not None:
+                page_size = min(page_size, remaining)
+            
+            try:
+                response = self._execute("playlistItems", lambda youtube: youtube.playlistItems().list(
+                    part="snippet,contentDetails",
+                    playlistId=playlist_id,
+                    maxResults=page_size,
+                    pageToken=page_token
+                ))
+            except Exception as e:
+                raise Exception(f"Failed to get channel videos: {str(e)}")
+            
+            video_data = []
+            for item in response.get("items", [])[:page_size]:
+                details = item.get("contentDetails", {})
+                video_id = details.get("videoId")
+                if video_id:
                     video_url = f"https://www.youtube.com/watch?v={video_id}"
-                    video_date = item["snippet"]["publishedAt"][:10]
-                    video_data.append((video_url, video_date))
+                    published_at = details.get("videoPublishedAt") or item["snippet"]["publishedAt"]
+                    video_data.append((video_url, published_at[:10]))
             
-            return video_data
-        except Exception as e:
-            raise Exception(f"Failed to get channel videos: {str(e)}")
+            total = response.get("pageInfo", {}).get("totalResults", 0)
+            if max_videos is not None:
+                total = min(total, max_videos)
+            
+            if video_data:
+                yield video_data, total
+            
+            if remaining is not None:
+                remaining -= len(video_data)
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+    
+    def iter_channel_videos(
+        self, 
+        channel_id: str, 
+        max_videos: Optional[int] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """Lazily yield ``(video_url, video_date)`` for a channel's uploads, newest first"""
+        for video_data, _ in self.iter_channel_video_pages(channel_id, max_videos):
+            yield from video_data
     
+    def get_channel_videos(self, channel_id: str, max_videos: int) -> List[Tuple[str, str]]:
+        """Get recent videos from a channel"""
+        return list(self.iter_channel_videos(channel_id, max_videos))
+    
+    @timed(repository_seconds, repository="youtube", method="get_video_metadata")
     def get_video_metadata(self, video_id: str) -> Dict[str, Optional[str]]:
         """Get video metadata from YouTube"""
         try:
-            request = self.youtube.videos().list(
+            response = self._execute("videos", lambda youtube: youtube.videos().list(
                 part="snippet",
                 id=video_id
-            )
-            response = request.execute()
+            ))
             
             if response.get("items"):
-                snippet = response["items"][0]["snippet"]
-                return {
-                    'title': snippet.get("title"),
-                    'channel_name': snippet.get("channelTitle"),
-                    'published_date': snippet.get("publishedAt", "")[:10],
-                    'description': snippet.get("description")
-                }
+                return self._snippet_to_metadata(response["items"][0]["snippet"])
             
-            return {
-                'title': None,
-                'channel_name': None,
-                'published_date': None,
-                'description': None
-            }
+            return self._empty_metadata()
         except Exception as e:
             raise Exception(f"Failed to get video metadata: {str(e)}")
     
-    def get_transcript(self, video_id: str) -> List[Dict]:
-        """Get transcript for a video"""
+    @timed(repository_seconds, repository="youtube", method="get_videos_metadata")
+    def get_videos_metadata(self, video_ids: List[str]) -> Dict[str, Dict[str, Optional[str]]]:
+        """Get metadata for many videos, up to 50 IDs per videos.list call
+        
+        Returns a mapping of video ID to metadata. IDs YouTube doesn't return
+        (deleted or private videos) map to empty metadata.
+        """
+        try:
+            metadata = {}
+            unique_ids = list(dict.fromkeys(video_ids))
+            for start in range(0, len(unique_ids), MAX_IDS_PER_VIDEOS_REQUEST):
+                chunk = unique_ids[start:start + MAX_IDS_PER_VIDEOS_REQUEST]
+                response = self._execute("videos", lambda youtube: youtube.videos().list(
+                    part="snippet",
+                    id=",".join(chunk),
+                    maxResults=len(chunk)
+                ))
+                
+                for item in response.get("items", []):
+                    metadata[item["id"]] = self._snippet_to_metadata(item["snippet"])
+            
+            for video_id in unique_ids:
+                metadata.setdefault(video_id, self._empty_metadata())
+            return metadata
+        except Exception as e:
+            raise Exception(f"Failed to get video metadata: {str(e)}")
+    
+    @staticmethod
+    def _snippet_to_metadata(snippet: Dict) -> Dict[str, Optional[str]]:
+        """Convert a videos.list snippet to our metadata shape"""
+        return {
+            'title': snippet.get("title"),
+            'channel_name': snippet.get("channelTitle"),
+            'published_date': snippet.get("publishedAt", "")[:10],
+            'description': snippet.get("description")
+        }
+    
+    @staticmethod
+    def _empty_metadata() -> Dict[str, Optional[str]]:
+        """Metadata for a video YouTube returned nothing for"""
+        return {
+            'title': None,
+            'channel_name': None,
+            'published_date': None,
+            'description': None
+        }
+    
+    @timed(repository_seconds, repository="youtube", method="get_transcript")
+    def get_transcript(self, video_id: str, languages: Optional[List[str]] = None) -> List[Dict]:
+        """Get transcript for a video, paced and retried by the shared transcript rate limiter"""
         try:
-            return YouTubeTranscriptApi.get_transcript(video_id)
+            return fetch_transcript(video_id, languages or ['en'])
         except Exception as e:
             raise Exception(f"Failed to get transcript: {str(e)}")
\ No newline at end of file
@@ -1,53 +1,83 @@
 """Service layer for transcript business logic"""
-from typing import List, Optional, Dict
+from typing import Callable, Iterator, List, Optional, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-import json
+from pathlib import Path
 
+from metrics import count_outcomes, stage, videos_processed
+from transcript_formats import format_transcript, iter_chunks, iter_format, iter_markdown_file, markdown_header
 from backend.repositories.transcript_repository import TranscriptRepository
+from backend.repositories.segment_file import iter_closing
 from backend.repositories.youtube_repository import YouTubeRepository
-from backend.api_models import ExportFormat, TranscriptResponse
+from backend.api_models import ExportFormat, TranscriptResponse, TranscriptSummary, SearchHit
 
 
 class TranscriptService:
     """Handles transcript business logic"""
     
-    def __init__(self, transcript_repo: TranscriptRepository, youtube_repo: YouTubeRepository):
+    def __init__(
+        self, 
+        transcript_repo: TranscriptRepository, 
+        youtube_repo: YouTubeRepository,
+        max_workers: int = 4,
+        language: str = "en"
+    ):
         self.transcript_repo = transcript_repo
         self.youtube_repo = youtube_repo
+        self.max_workers = max_workers
+        self.language = language
     
+    @count_outcomes(videos_processed)
     def extract_single_transcript(
         self, 
         youtube_url: str, 
         channel_name: Optional[str] = None,
         video_date: Optional[str] = None,
-        export_format: ExportFormat = ExportFormat.MARKDOWN
+        export_format: ExportFormat = ExportFormat.MARKDOWN,
+        metadata: Optional[Dict[str, Optional[str]]] = None
     ) -> TranscriptResponse:
-        """Extract transcript from a single video"""
-        # Extract video ID
-        video_id = youtube_url.split('v=')[-1].split('&')[0]
+        """Extract transcript from a single video
+        
+        Pass ``metadata`` when it was already fetched (e.g. in a batch) to skip
+        the per-video metadata lookup. Videos whose raw segments are already
+        cached are served without any network call. Each stage is timed and
+        its failures counted in the process metrics.
+        """
+        video_id = self._extract_video_id(youtube_url)
+        with stage("cache"):
+            cached = self.transcript_repo.load_segments(video_id, self.language)
         
         # Get video metadata
-        metadata = self.youtube_repo.get_video_metadata(video_id)
-        video_title = metadata['title']
-        channel_name = channel_name or metadata['channel_name'] or "unknown_channel"
-        video_date = video_date or metadata['published_date'] or datetime.now().strftime("%Y-%m-%d")
+        if metadata is None:
+            with stage("metadata"):
+                metadata = cached['metadata'] if cached else self.youtube_repo.get_video_metadata(video_id)
+        video_title = metadata.get('title')
+        channel_name = channel_name or metadata.get('channel_name') or "unknown_channel"
+        video_date = video_date or metadata.get('published_date') or datetime.now().strftime("%Y-%m-%d")
         
-        # Get transcript
-        transcript_data = self.youtube_repo.get_transcript(video_id)
+        # Get transcript, keeping the raw segments for later format conversions
+        if cached:
+            transcript_data = cached['segments']
+        else:
+            with stage("transcript"):
+                transcript_data = self.youtube_repo.get_transcript(video_id, [self.language])
+            with stage("segment cache"):
+                self.transcript_repo.save_segments(video_id, self.language, transcript_data, metadata)
         
         # Format transcript
-        formatted_transcript = self._format_transcript(transcript_data, export_format)
-        
-        # Create markdown content with metadata
-        if export_format == ExportFormat.MARKDOWN:
-            content = self._create_markdown_content(
-                video_title, youtube_url, channel_name, video_date, formatted_transcript
-            )
-        else:
-            content = formatted_transcript
+        with stage("format"):
+            formatted_transcript = format_transcript(transcript_data, export_format)
+            
+            # The archive always stores markdown, whichever format was requested
+            if export_format != ExportFormat.MARKDOWN:
+                markdown = format_transcript(transcript_data, ExportFormat.MARKDOWN)
+            else:
+                markdown = formatted_transcript
+            content = f"{markdown_header(youtube_url, video_title, channel_name, video_date)}{markdown}\n"
         
         # Save to file
-        self.transcript_repo.save_transcript(content, channel_name, video_date, video_id)
+        with stage("write"):
+            self.transcript_repo.save_transcript(content, channel_name, video_date, video_id)
         
         # Calculate duration
         duration = sum(entry.get('duration', 0) for entry in transcript_data)
@@ -66,40 +96,113 @@ class TranscriptService:
     def extract_channel_transcripts(
         self, 
         channel_name: str, 
-        max_videos: int
+        max_videos: int,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        incremental: bool = False
     ) -> Dict[str, any]:
-        """Extract transcripts from multiple videos in a channel"""
+        """Extract transcripts from multiple videos in a channel
+        
+        The channel's uploads are paged lazily and each page is handed to up to
+        ``max_workers`` threads as soon as it arrives, so extraction overlaps
+        with fetching later pages. ``progress_callback(completed, total)`` is
+        called from the calling thread as videos finish. With ``incremental``,
+        videos already in the archive are skipped and paging stops once the
+        archive is reached.
+        """
         # Get channel ID
-        channel_id = self.youtube_repo.get_channel_id(channel_name)
+        with stage("channel lookup"):
+            channel_id = self.youtube_repo.get_channel_id(channel_name)
         if not channel_id:
             raise ValueError(f"Channel '{channel_name}' not found")
         
-        # Get videos
-        videos = self.youtube_repo.get_channel_videos(channel_id, max_videos)
-        
         results = {
+            'total': 0,
             'successful': 0,
             'failed': 0,
             'failed_videos': [],
             'transcripts': []
         }
         
-        for video_url, video_date in videos:
+        # Outcomes are keyed by position so aggregation keeps the channel order
+        videos = []
+        futures = {}
+        outcomes = {}
+        expected_total = 0
+        
+        def collect(future):
+            index = futures.pop(future)
             try:
-                transcript = self.extract_single_transcript(
-                    video_url, channel_name, video_date
-                )
+                outcomes[index] = (future.result(), None)
+            except Exception as e:
+                outcomes[index] = (None, e)
+            if progress_callback:
+                progress_callback(len(outcomes), max(expected_total, len(videos)))
+        
+        pages = self.youtube_repo.iter_channel_video_pages(channel_id, max_videos)
+        if incremental:
+            pages = self.transcript_repo.iter_unarchived_pages(pages, channel_name)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            page_iterator = iter(pages)
+            while True:
+                with stage("video listing"):
+                    next_page = next(page_iterator, None)
+                if next_page is None:
+                    break
+                page, expected_total = next_page
+                with stage("page metadata"):
+                    metadata = self._get_page_metadata(page)
+                
+                for video_url, video_date in page:
+                    future = executor.submit(
+                        self.extract_single_transcript,
+                        video_url, channel_name, video_date,
+                        metadata=metadata.get(self._extract_video_id(video_url))
+                    )
+                    futures[future] = len(videos)
+                    videos.append((video_url, video_date))
+                
+                # Report videos that finished while this page was being fetched
+                for future in [f for f in futures if f.done()]:
+                    collect(future)
+            
+            for future in as_completed(list(futures)):
+                collect(future)
+        
+        results['total'] = len(videos)
+        for index, (video_url, _) in enumerate(videos):
+            transcript, error = outcomes[index]
+            if error is None:
                 results['successful'] += 1
                 results['transcripts'].append(transcript)
-            except Exception as e:
+            else:
                 results['failed'] += 1
                 results['failed_videos'].append({
                     'url': video_url,
-                    'error': str(e)
+                    'error': str(error)
                 })
         
         return results
     
+    def _get_page_metadata(self, videos: List[Tuple[str, str]]) -> Dict[str, Dict]:
+        """Fetch metadata for a page of videos in one call
+        
+        Videos with cached segments are skipped since their metadata is cached
+        too. If the batch fails each video falls back to its own lookup.
+        """
+        video_ids = [
+            video_id for video_id in (self._extract_video_id(video_url) for video_url, _ in videos)
+            if not self.transcript_repo.has_segments(video_id, self.language)
+        ]
+        if not video_ids:
+            return {}
+        
+        try:
+            return self.youtube_repo.get_videos_metadata(video_ids)
+        except Exception as e:
+            print(f"Batch metadata lookup failed, falling back to per-video lookups: {e}")
+            return {}
+    
     def list_transcripts(self, page: int = 1, per_page: int = 10) -> Dict:
         """List saved transcripts with pagination"""
         files, total = self.transcript_repo.list_transcripts(page, per_page)
@@ -129,91 +232,123 @@ class TranscriptService:
             'per_page': per_page
         }
     
-    def get_transcript(self, video_id: str, export_format: ExportFormat) -> Optional[str]:
-        """Get a specific transcript in the requested format"""
-        file_path = self.transcript_repo.get_transcript_by_video_id(video_id)
-        if not file_path:
-            return None
+    def list_transcript_summaries(self, page: int = 1, per_page: int = 10) -> Dict:
+        """List saved transcripts with pagination, returning metadata and sizes instead of text"""
+        rows, total = self.transcript_repo.list_transcript_summaries(page, per_page)
         
-        content = self.transcript_repo.read_transcript(file_path)
+        transcripts = [
+            TranscriptSummary(
+                video_id=row['video_id'],
+                video_url=f"https://youtube.com/watch?v={row['video_id']}",
+                video_title=row['video_title'],
+                channel_name=row['channel_name'],
+                video_date=row['video_date'],
+                size_bytes=row['size'],
+                segment_count=row['segment_count'],
+                created_at=datetime.fromtimestamp(row['mtime'])
+            )
+            for row in rows
+        ]
         
-        if export_format == ExportFormat.MARKDOWN:
-            return content
+        return {
+            'transcripts': transcripts,
+            'total': total,
+            'page': page,
+            'per_page': per_page
+        }
+    
+    def search_transcripts(
+        self, 
+        query: str, 
+        channel_name: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        page: int = 1, 
+        per_page: int = 20
+    ) -> Dict:
+        """Search the transcript archive, returning ranked hits with timestamped video links"""
+        rows, total = self.transcript_repo.search_segments(
+            query, channel_name, date_from, date_to, page, per_page
+        )
         
-        # Convert from markdown to other formats
-        # Extract just the transcript lines
-        lines = content.split('\n')
-        transcript_lines = []
-        in_transcript = False
+        hits = [
+            SearchHit(
+                video_id=row['video_id'],
+                video_url=f"https://www.youtube.com/watch?v={row['video_id']}&t={int(row['start'])}s",
+                video_title=row['video_title'],
+                channel_name=row['channel_name'],
+                video_date=row['video_date'],
+                start=row['start'],
+                text=row['text'],
+                score=row['score']
+            )
+            for row in rows
+        ]
         
-        for line in lines:
-            if line.strip() == '---':
-                in_transcript = True
-                continue
-            if in_transcript and line.strip():
-                transcript_lines.append(line)
-        
-        if export_format == ExportFormat.TEXT:
-            # Remove timestamps
-            text_lines = []
-            for line in transcript_lines:
-                if ': ' in line:
-                    text_lines.append(line.split(': ', 1)[1])
-            return ' '.join(text_lines)
-        
-        return content
-    
-    def _format_transcript(self, transcript_data: List[Dict], format_type: ExportFormat) -> str:
-        """Format transcript data based on export format"""
-        if format_type == ExportFormat.MARKDOWN:
-            return "\n".join([f"{entry['start']:.2f}s: {entry['text']}" for entry in transcript_data])
-        elif format_type == ExportFormat.TEXT:
-            return " ".join([entry['text'] for entry in transcript_data])
-        elif format_type == ExportFormat.SRT:
-            return self._format_srt(transcript_data)
-        elif format_type == ExportFormat.JSON:
-            return json.dumps(transcript_data, indent=2)
-        return ""
+        return {
+            'query': query,
+            'hits': hits,
+            'total': total,
+            'page': page,
+            'per_page': per_page
+        }
     
-    def _format_srt(self, transcript_data: List[Dict]) -> str:
-        """Format transcript as SRT"""
-        srt_content = []
-        for i, entry in enumerate(transcript_data, 1):
-            start_time = entry['start']
-            end_time = entry.get('duration', 0) + start_time
-            srt_content.append(f"{i}")
-            srt_content.append(f"{self._format_srt_time(start_time)} --> {self._format_srt_time(end_time)}")
-            srt_content.append(entry['text'])
-            srt_content.append("")
-        return "\n".join(srt_content)
+    def get_transcript_file(self, video_id: str) -> Optional[Path]:
+        """Get the path of the stored markdown transcript for a video"""
+        return self.transcript_repo.get_transcript_by_video_id(video_id)
     
-    def _format_srt_time(self, seconds: float) -> str:
-        """Format seconds to SRT timestamp"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = seconds % 60
-        return f"{hours:02d}:{minutes:02d}:{secs:06.3f}".replace('.', ',')
+    def iter_transcript(
+        self, 
+        video_id: str, 
+        export_format: ExportFormat,
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> Optional[Iterator[bytes]]:
+        """Stream a transcript in the requested format as UTF-8 chunks
+        
+        Returns None if there is no transcript for the video. With ``start``
+        and/or ``end`` (seconds) only the segments overlapping that range are
+        rendered, found by binary search over the segment start times.
+        Cached raw segments are read from their memory-mapped segment file
+        when available since they carry real durations; otherwise the stored
+        markdown is converted line by line.
+        """
+        if start is not None or end is not None:
+            segment_file = self.transcript_repo.open_transcript_segments(video_id, self.language)
+            if segment_file is None:
+                return None
+            try:
+                first, last = segment_file.find_range(start, end)
+            except Exception:
+                segment_file.close()
+                raise
+            return iter_chunks(iter_format(iter_closing(segment_file, first, last), export_format.value))
+        
+        file_path = self.transcript_repo.get_transcript_by_video_id(video_id)
+        if not file_path:
+            return None
+        
+        if export_format != ExportFormat.MARKDOWN:
+            segment_file = self.transcript_repo.open_segments(video_id, self.language)
+            if segment_file is not None:
+                return iter_chunks(iter_format(iter_closing(segment_file), export_format.value))
+        
+        return iter_markdown_file(file_path, export_format.value)
     
-    def _create_markdown_content(
+    def get_transcript(
         self, 
-        title: Optional[str], 
-        url: str, 
-        channel_name: str, 
-        video_date: str, 
-        transcript: str
-    ) -> str:
-        """Create markdown content with metadata"""
-        content = []
-        
-        if title:
-            content.append(f"# {title}\n")
-        
-        content.append(f"URL: {url}")
-        if title:
-            content.append(f"Title: {title}")
-        content.append(f"Channel: {channel_name}")
-        content.append(f"Date: {video_date}")
-        content.append("\n---\n")
-        content.append(transcript)
-        
-        return "\n".join(content)
\ No newline at end of file
+        video_id: str, 
+        export_format: ExportFormat,
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> Optional[str]:
+        """Get a specific transcript, or the part of it between start and end seconds, in the requested format"""
+        chunks = self.iter_transcript(video_id, export_format, start, end)
+        if chunks is None:
+            return None
+        return b''.join(chunks).decode('utf-8')
+    
+    @staticmethod
+    def _extract_video_id(youtube_url: str) -> str:
+        """Extract the video ID from a watch URL"""
+        return youtube_url.split('v=')[-1].split('&')[0]
\ No newline at end of file
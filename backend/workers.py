@@ -0,0 +1,37 @@
+"""Dedicated executor for blocking work started from async handlers"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from config import config
+from metrics import jobs_queued, jobs_running
+
+# Sized separately from the server's request threadpool so long-running
+# extraction jobs can never starve status, list or download requests.
+job_executor = ThreadPoolExecutor(
+    max_workers=config.job_workers,
+    thread_name_prefix="job-worker"
+)
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking callable on the job executor without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    jobs_queued.inc()
+    return await loop.run_in_executor(job_executor, functools.partial(_run_job, func, *args, **kwargs))
+
+
+def _run_job(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a job on a worker thread, keeping the queue depth metrics current"""
+    jobs_queued.dec()
+    jobs_running.inc()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        jobs_running.dec()
+
+
+def shutdown_executor() -> None:
+    """Stop accepting work and let running jobs finish in the background"""
+    job_executor.shutdown(wait=False)
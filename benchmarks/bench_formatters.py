@@ -0,0 +1,162 @@
+"""Throughput of the transcript formatters on the largest transcripts in the output directory
+
+Compares the shared single-pass formatters in ``transcript_formats`` with
+the formatting code they replaced, rendering to a string and writing
+straight to a file.
+
+Usage: python benchmarks/bench_formatters.py [--dir output] [--files 3] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from transcript_formats import (
+    format_srt_time, format_transcript, iter_markdown_document, iter_markdown_segments, write_transcript
+)
+
+FORMATS = ("md", "txt", "srt", "json")
+
+
+# The formatters as they were before transcript_formats, kept here as the baseline
+
+def legacy_format_transcript(transcript_data, format_type):
+    if format_type == "md":
+        return "\n".join([f"{entry['start']:.2f}s: {entry['text']}" for entry in transcript_data])
+    elif format_type == "txt":
+        return " ".join([entry['text'] for entry in transcript_data])
+    elif format_type == "srt":
+        srt_content = []
+        for i, entry in enumerate(transcript_data, 1):
+            start_time = entry['start']
+            end_time = entry.get('duration', 0) + start_time
+            srt_content.append(f"{i}")
+            srt_content.append(f"{format_srt_time(start_time)} --> {format_srt_time(end_time)}")
+            srt_content.append(entry['text'])
+            srt_content.append("")
+        return "\n".join(srt_content)
+    elif format_type == "json":
+        return json.dumps(transcript_data, indent=2)
+    return ""
+
+
+def legacy_markdown_document(transcript, url, title, channel_name, video_date):
+    md_content = f"# {title or 'Transcript'}\n\n" if title else ""
+    md_content += f"URL: {url}\n"
+    if title:
+        md_content += f"Title: {title}\n"
+    if channel_name:
+        md_content += f"Channel: {channel_name}\n"
+    if video_date:
+        md_content += f"Date: {video_date}\n"
+    md_content += "\n---\n\n"
+    for entry in transcript:
+        md_content += f"{entry['start']:.2f}s: {entry['text']}\n"
+    return md_content
+
+
+def largest_transcripts(directory, count):
+    """Paths of the ``count`` largest markdown transcripts in a directory"""
+    paths = [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith('.md') and os.path.isfile(os.path.join(directory, name))
+    ]
+    return sorted(paths, key=os.path.getsize, reverse=True)[:count]
+
+
+def best_time(func, repeat):
+    """Fastest of ``repeat`` runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_file(path, repeat, scratch):
+    with open(path, 'r', encoding='utf-8') as f:
+        segments = list(iter_markdown_segments(f))
+    metadata = ("https://www.youtube.com/watch?v=benchmark", "Benchmark", "Channel", "2025-01-01")
+
+    def write_legacy():
+        with open(scratch, 'w', encoding='utf-8') as f:
+            f.write(legacy_markdown_document(segments, *metadata))
+
+    def write_streamed():
+        with open(scratch, 'w', encoding='utf-8') as f:
+            f.writelines(iter_markdown_document(segments, *metadata))
+
+    cases = [("markdown file", write_legacy, write_streamed,
+              len(legacy_markdown_document(segments, *metadata).encode('utf-8')))]
+    for format_type in FORMATS:
+        output = format_transcript(segments, format_type)
+        if output != legacy_format_transcript(segments, format_type):
+            raise AssertionError(f"{format_type} output differs from the legacy formatter for {path}")
+        cases.append((f"{format_type} string",
+                      lambda ft=format_type: legacy_format_transcript(segments, ft),
+                      lambda ft=format_type: format_transcript(segments, ft),
+                      len(output.encode('utf-8'))))
+
+    def write_file_legacy(format_type):
+        with open(scratch, 'w', encoding='utf-8') as f:
+            f.write(legacy_format_transcript(segments, format_type))
+
+    def write_file(format_type):
+        with open(scratch, 'w', encoding='utf-8') as f:
+            write_transcript(f, segments, format_type)
+
+    for format_type in FORMATS:
+        cases.append((f"{format_type} file",
+                      lambda ft=format_type: write_file_legacy(ft),
+                      lambda ft=format_type: write_file(ft),
+                      len(format_transcript(segments, format_type).encode('utf-8'))))
+
+    results = []
+    for name, legacy, current, size in cases:
+        legacy_seconds = best_time(legacy, repeat)
+        current_seconds = best_time(current, repeat)
+        results.append({
+            'case': name,
+            'bytes': size,
+            'legacy_mb_per_s': size / legacy_seconds / 1e6,
+            'current_mb_per_s': size / current_seconds / 1e6,
+            'segments_per_s': len(segments) / current_seconds,
+            'speedup': legacy_seconds / current_seconds
+        })
+    return len(segments), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the transcript formatters")
+    parser.add_argument("--dir", default=config.output_dir, help="Directory of markdown transcripts")
+    parser.add_argument("--files", type=int, default=3, help="How many of the largest files to use")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case; the fastest is reported")
+    args = parser.parse_args()
+
+    paths = largest_transcripts(args.dir, args.files)
+    if not paths:
+        print(f"No markdown transcripts found in {args.dir}")
+        return 1
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        scratch = os.path.join(scratch_dir, "transcript")
+        for path in paths:
+            segment_count, results = bench_file(path, max(1, args.repeat), scratch)
+            print(f"\n{os.path.basename(path)} ({os.path.getsize(path) / 1e6:.2f} MB, {segment_count} segments)")
+            print(f"  {'case':<16}{'output MB':>10}{'legacy MB/s':>13}{'shared MB/s':>13}{'segments/s':>13}{'speedup':>9}")
+            for row in results:
+                print(
+                    f"  {row['case']:<16}{row['bytes'] / 1e6:>10.2f}{row['legacy_mb_per_s']:>13.1f}"
+                    f"{row['current_mb_per_s']:>13.1f}{row['segments_per_s']:>13,.0f}{row['speedup']:>8.2f}x"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Throughput of SRT/WebVTT timestamp rendering, per entry versus all at once
+
+Compares the per-entry float formatting SRT export used to do with
+``format_timestamps``, with and without NumPy, on synthetic transcripts.
+
+Usage: python benchmarks/bench_timestamps.py [--cues 1000 10000 100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transcript_formats
+from transcript_formats import format_timestamps, format_transcript
+
+
+# SRT timestamps as they were formatted before, kept here as the baseline
+def legacy_format_srt_time(seconds):
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{secs:06.3f}".replace('.', ',')
+
+
+def legacy_format_srt(transcript_data):
+    srt_content = []
+    for i, entry in enumerate(transcript_data, 1):
+        start_time = entry['start']
+        end_time = entry.get('duration', 0) + start_time
+        srt_content.append(f"{i}")
+        srt_content.append(f"{legacy_format_srt_time(start_time)} --> {legacy_format_srt_time(end_time)}")
+        srt_content.append(entry['text'])
+        srt_content.append("")
+    return "\n".join(srt_content)
+
+
+def synthetic_segments(count):
+    """Segments shaped like YouTube captions: millisecond starts, a few seconds each"""
+    rng = random.Random(count)
+    segments = []
+    start = 0.0
+    for i in range(count):
+        duration = round(rng.uniform(0.5, 6.0), 3)
+        segments.append({'text': f"caption line {i} with a few words", 'start': round(start, 3), 'duration': duration})
+        start += duration
+    return segments
+
+
+def best_time(func, repeat):
+    """Fastest of ``repeat`` runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def without_numpy(func):
+    """Run a function with the NumPy path disabled"""
+    def run():
+        numpy = transcript_formats.np
+        transcript_formats.np = None
+        try:
+            return func()
+        finally:
+            transcript_formats.np = numpy
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SRT/WebVTT timestamp rendering")
+    parser.add_argument("--cues", type=int, nargs="+", default=[1000, 10000, 100000], help="Transcript sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case; the fastest is reported")
+    args = parser.parse_args()
+    repeat = max(1, args.repeat)
+
+    if transcript_formats.np is None:
+        print("NumPy is not installed; only the pure Python paths are measured")
+
+    print(f"{'cues':>8}  {'case':<28}{'seconds':>10}{'cues/s':>14}{'speedup':>9}")
+    for cue_count in args.cues:
+        segments = synthetic_segments(cue_count)
+        times = [entry['start'] for entry in segments] + [entry['start'] + entry['duration'] for entry in segments]
+        if format_transcript(segments, "srt") != legacy_format_srt(segments):
+            raise AssertionError(f"SRT output differs from the legacy formatter for {cue_count} cues")
+
+        # (name, what the speedup is measured against, function); the first case of a group is its baseline
+        cases = [
+            ("timestamps, per entry", "timestamps", lambda: [legacy_format_srt_time(t) for t in times]),
+            ("timestamps, pure Python", "timestamps", without_numpy(lambda: format_timestamps(times))),
+        ]
+        if transcript_formats.np is not None:
+            cases.append(("timestamps, NumPy", "timestamps", lambda: format_timestamps(times)))
+        cases += [
+            ("SRT export, per entry", "export", lambda: legacy_format_srt(segments)),
+            ("SRT export, pure Python", "export", without_numpy(lambda: format_transcript(segments, "srt"))),
+            ("VTT export, pure Python", "export", without_numpy(lambda: format_transcript(segments, "vtt"))),
+        ]
+        if transcript_formats.np is not None:
+            cases.append(("SRT export, NumPy", "export", lambda: format_transcript(segments, "srt")))
+            cases.append(("VTT export, NumPy", "export", lambda: format_transcript(segments, "vtt")))
+
+        baselines = {}
+        for name, group, func in cases:
+            seconds = best_time(func, repeat)
+            baseline = baselines.setdefault(group, seconds)
+            print(f"{cue_count:>8}  {name:<28}{seconds:>10.4f}{cue_count / seconds:>14,.0f}{baseline / seconds:>8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
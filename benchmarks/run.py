@@ -0,0 +1,348 @@
+"""Benchmark suite for the transcript hot paths
+
+Runs each benchmark for a number of rounds and writes the timings as JSON,
+so two runs (e.g. before and after a change) can be compared:
+
+    python benchmarks/run.py --output before.json
+    python benchmarks/run.py --output after.json --compare before.json
+
+Groups:
+    format      format_transcript for every export format
+    repository  TranscriptRepository index build, list_transcripts and
+                get_transcript_by_video_id on synthetic output directories
+    conversion  markdown-to-format streaming on the real transcripts in output/
+    channel     end-to-end channel jobs through TranscriptService against a
+                stubbed YouTube backend
+
+Synthetic output directories are generated once into --workdir and reused.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+import transcript_formats
+from transcript_formats import format_transcript, iter_markdown_file
+from backend.api_models import ExportFormat
+from backend.repositories.transcript_repository import TranscriptRepository
+from backend.services.transcript_service import TranscriptService
+from channel_cache import ChannelCache
+from key_scheduler import KeyScheduler
+from stub_youtube import StubClientPool, StubYouTubeClient, StubYouTubeRepository, synthetic_segments
+
+GROUPS = ("format", "repository", "conversion", "channel")
+
+# Results format version; bump when the JSON layout changes
+RESULTS_VERSION = 1
+
+
+def measure(func, rounds, setup=None, warmup=1):
+    """Time ``func`` over ``rounds`` runs, calling ``setup`` untimed before each"""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+
+    timings = []
+    for _ in range(rounds):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def summarize(name, group, params, timings, items=None, unit="items"):
+    """One result record; ``items`` per run turns the median into a throughput"""
+    median = statistics.median(timings)
+    result = {
+        'name': name,
+        'group': group,
+        'params': params,
+        'rounds': len(timings),
+        'min': min(timings),
+        'max': max(timings),
+        'mean': statistics.mean(timings),
+        'median': median,
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+    if items:
+        result['throughput'] = items / median if median else None
+        result['throughput_unit'] = f"{unit}/s"
+    return result
+
+
+def print_result(result):
+    throughput = ""
+    if result.get('throughput'):
+        throughput = f"{result['throughput']:>14,.0f} {result['throughput_unit']}"
+    print(f"  {result['name']:<48}{result['median'] * 1000:>11.3f} ms{throughput}")
+
+
+# Format group
+
+def bench_format(args):
+    segments = synthetic_segments(args.segments, "format")
+    for export_format in ExportFormat:
+        timings = measure(lambda: format_transcript(segments, export_format), args.rounds)
+        yield summarize(
+            f"format.{export_format.value}", "format",
+            {'segments': args.segments, 'numpy': transcript_formats.np is not None},
+            timings, items=args.segments, unit="segments"
+        )
+
+
+# Repository group
+
+def synthetic_output_dir(workdir, size):
+    """An output directory of ``size`` small transcripts, generated on first use"""
+    directory = os.path.join(workdir, f"output-{size}")
+    marker = os.path.join(directory, ".cache", "generated")
+    if os.path.exists(marker):
+        return directory
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(os.path.dirname(marker))
+    print(f"  generating {size} synthetic transcripts in {directory}")
+    body = "\n".join(f"{i * 2.5:.2f}s: line {i} of a synthetic transcript" for i in range(40))
+    for i in range(size):
+        video_id = f"syn{i:08d}"
+        video_date = f"20{10 + i % 15:02d}-{1 + i % 12:02d}-{1 + i % 28:02d}"
+        channel_name = f"channel{i % 50}"
+        with open(os.path.join(directory, f"{channel_name}-{video_date}-{video_id}.md"), 'w', encoding='utf-8') as f:
+            f.write(
+                f"# Synthetic video {i}\n\nURL: https://www.youtube.com/watch?v={video_id}\n"
+                f"Title: Synthetic video {i}\nChannel: {channel_name}\nDate: {video_date}\n\n---\n\n{body}\n"
+            )
+    with open(marker, 'w') as f:
+        f.write(str(size))
+    return directory
+
+
+def bench_repository(args):
+    rng = random.Random(0)
+    for size in args.sizes:
+        directory = synthetic_output_dir(args.workdir, size)
+        params = {'files': size}
+
+        # Cold: a fresh index has to scan and parse every file
+        def fresh_index():
+            shutil.rmtree(os.path.join(directory, ".cache", "bench"), ignore_errors=True)
+
+        def build_index():
+            TranscriptRepository(directory, os.path.join(directory, ".cache", "bench")).list_transcripts(1, 20)
+
+        timings = measure(build_index, args.index_rounds, setup=fresh_index, warmup=0)
+        yield summarize("repository.index_build", "repository", params, timings, items=size, unit="files")
+
+        repository = TranscriptRepository(directory, os.path.join(directory, ".cache", "bench"))
+        pages = max(1, size // 20)
+
+        def list_pages():
+            for page in (1, pages // 2 or 1, pages):
+                repository.list_transcripts(page, 20)
+
+        timings = measure(list_pages, args.rounds)
+        yield summarize("repository.list_transcripts", "repository", params, timings, items=3, unit="pages")
+
+        video_ids = [f"syn{rng.randrange(size):08d}" for _ in range(100)] + ["missing0000"]
+
+        def lookups():
+            for video_id in video_ids:
+                repository.get_transcript_by_video_id(video_id)
+
+        timings = measure(lookups, args.rounds)
+        yield summarize(
+            "repository.get_transcript_by_video_id", "repository", params, timings,
+            items=len(video_ids), unit="lookups"
+        )
+
+
+# Conversion group
+
+def bench_conversion(args):
+    source = args.samples
+    paths = sorted(
+        os.path.join(source, name) for name in os.listdir(source)
+        if name.endswith('.md') and os.path.isfile(os.path.join(source, name))
+    ) if os.path.isdir(source) else []
+    if not paths:
+        print(f"  no markdown transcripts in {source}, skipping")
+        return
+
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+    for export_format in ExportFormat:
+        def convert():
+            for path in paths:
+                for _ in iter_markdown_file(path, export_format.value):
+                    pass
+
+        timings = measure(convert, args.rounds)
+        yield summarize(
+            f"conversion.{export_format.value}", "conversion",
+            {'files': len(paths), 'bytes': total_bytes, 'numpy': transcript_formats.np is not None},
+            timings, items=total_bytes / 1e6, unit="MB"
+        )
+
+
+# Channel group
+
+def bench_channel(args):
+    state_dir = tempfile.mkdtemp(prefix="channel-", dir=args.workdir)
+    output_dir = os.path.join(state_dir, "output")
+    params = {
+        'videos': args.videos,
+        'workers': args.workers,
+        'api_latency_ms': args.api_latency * 1000,
+        'transcript_latency_ms': args.transcript_latency * 1000,
+    }
+
+    def service():
+        client = StubYouTubeClient(args.videos, latency=args.api_latency)
+        youtube_repo = StubYouTubeRepository(
+            key_scheduler=KeyScheduler(
+                ["benchmark-key"], path=os.path.join(state_dir, "quota.db"), client_pool=StubClientPool(client)
+            ),
+            channel_cache=ChannelCache(os.path.join(state_dir, "channels.db")),
+            transcript_latency=args.transcript_latency
+        )
+        transcript_repo = TranscriptRepository(output_dir, os.path.join(output_dir, ".cache"))
+        return TranscriptService(transcript_repo, youtube_repo, max_workers=args.workers)
+
+    def empty_archive():
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    def full_job():
+        results = service().extract_channel_transcripts("Benchmark Channel", args.videos)
+        if results['successful'] != args.videos:
+            raise RuntimeError(f"Channel job extracted {results['successful']} of {args.videos} videos")
+
+    try:
+        timings = measure(full_job, args.channel_rounds, setup=empty_archive, warmup=0)
+        yield summarize("channel.full", "channel", params, timings, items=args.videos, unit="videos")
+
+        # Archive is now complete: an incremental sync should stop after the first page
+        timings = measure(
+            lambda: service().extract_channel_transcripts("Benchmark Channel", args.videos, incremental=True),
+            args.rounds
+        )
+        yield summarize("channel.incremental_up_to_date", "channel", params, timings)
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+
+BENCHMARKS = {
+    "format": bench_format,
+    "repository": bench_repository,
+    "conversion": bench_conversion,
+    "channel": bench_channel,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def result_key(result):
+    return result['name'], json.dumps({k: v for k, v in result['params'].items() if k != 'numpy'}, sort_keys=True)
+
+
+def compare(results, baseline_path, threshold):
+    """Print median changes against a baseline run; returns the regressions beyond ``threshold``"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {result_key(result): result for result in json.load(f)['results']}
+
+    print(f"\nCompared with {baseline_path} (regression threshold {threshold:.0%}):")
+    regressions = []
+    for result in results:
+        before = baseline.get(result_key(result))
+        if before is None:
+            print(f"  {result['name']:<48}{'new':>14}")
+            continue
+        change = result['median'] / before['median'] - 1 if before['median'] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(result)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"  {result['name']:<48}{change:>+13.1%} {json.dumps(result['params'])}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the transcript hot paths")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS), help="Groups to run")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Median slowdown counted as a regression (default: %(default)s)")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per benchmark")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "youtube-utilities-bench"),
+                        help="Where synthetic data is generated and kept between runs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Synthetic output directory sizes for the repository group")
+    parser.add_argument("--index-rounds", type=int, default=1, help="Rounds of the cold index build")
+    parser.add_argument("--segments", type=int, default=10000, help="Segments formatted in the format group")
+    parser.add_argument("--samples", default=config.output_dir, help="Real transcripts for the conversion group")
+    parser.add_argument("--videos", type=int, default=200, help="Videos per channel job")
+    parser.add_argument("--workers", type=int, default=config.max_concurrent_videos, help="Channel job workers")
+    parser.add_argument("--api-latency", type=float, default=0.02, help="Stubbed API call latency in seconds")
+    parser.add_argument("--transcript-latency", type=float, default=0.05,
+                        help="Stubbed transcript fetch latency in seconds")
+    parser.add_argument("--channel-rounds", type=int, default=3, help="Rounds of the full channel job")
+    args = parser.parse_args()
+    args.rounds = max(1, args.rounds)
+    os.makedirs(args.workdir, exist_ok=True)
+
+    results = []
+    started = time.perf_counter()
+    for group in args.groups:
+        print(f"{group}:")
+        for result in BENCHMARKS[group](args):
+            print_result(result)
+            results.append(result)
+
+    report = {
+        'version': RESULTS_VERSION,
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': getattr(transcript_formats.np, '__version__', None),
+            'wall_time': time.perf_counter() - started,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
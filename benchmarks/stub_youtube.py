@@ -0,0 +1,130 @@
+"""In-process stand-in for the YouTube Data API and transcript fetching
+
+Answers the handful of API calls the repositories make with generated
+channels, uploads and captions after a fixed delay, so channel jobs can be
+benchmarked end to end without network access or quota.
+"""
+import time
+from typing import Dict, List, Optional
+
+from backend.repositories.youtube_repository import YouTubeRepository
+
+
+class _Request:
+    def __init__(self, respond, latency: float):
+        self._respond = respond
+        self._latency = latency
+
+    def execute(self):
+        if self._latency:
+            time.sleep(self._latency)
+        return self._respond()
+
+
+class _Resource:
+    def __init__(self, list_method):
+        self.list = list_method
+
+
+class StubYouTubeClient:
+    """Answers search, channels, playlistItems and videos list calls for one generated channel"""
+
+    def __init__(self, video_count: int, latency: float = 0.0):
+        self.video_count = video_count
+        self.latency = latency
+
+    @staticmethod
+    def video_id(index: int) -> str:
+        return f"bench{index:06d}"
+
+    @staticmethod
+    def video_date(index: int) -> str:
+        # Newest first, one upload a day going back from the end of 2025
+        day = 365 * 10 - index
+        return time.strftime("%Y-%m-%d", time.gmtime(1451606400 + day * 86400))
+
+    def search(self):
+        return _Resource(lambda **kwargs: _Request(
+            lambda: {'items': [{'id': {'channelId': 'UCbenchmark'}}]}, self.latency
+        ))
+
+    def channels(self):
+        return _Resource(lambda **kwargs: _Request(lambda: {'items': [{
+            'id': kwargs['id'],
+            'snippet': {'title': 'Benchmark Channel'},
+            'contentDetails': {'relatedPlaylists': {'uploads': 'UUbenchmark'}}
+        }]}, self.latency))
+
+    def playlistItems(self):
+        def list_items(playlistId, maxResults, pageToken=None, **kwargs):
+            start = int(pageToken or 0)
+            end = min(start + maxResults, self.video_count)
+
+            def respond():
+                response = {
+                    'items': [{
+                        'snippet': {'publishedAt': f"{self.video_date(i)}T12:00:00Z"},
+                        'contentDetails': {
+                            'videoId': self.video_id(i),
+                            'videoPublishedAt': f"{self.video_date(i)}T12:00:00Z"
+                        }
+                    } for i in range(start, end)],
+                    'pageInfo': {'totalResults': self.video_count}
+                }
+                if end < self.video_count:
+                    response['nextPageToken'] = str(end)
+                return response
+            return _Request(respond, self.latency)
+        return _Resource(list_items)
+
+    def videos(self):
+        def list_videos(id, **kwargs):
+            return _Request(lambda: {'items': [{
+                'id': video_id,
+                'snippet': {
+                    'title': f"Benchmark video {video_id}",
+                    'channelTitle': 'Benchmark Channel',
+                    'publishedAt': '2025-01-01T12:00:00Z',
+                    'description': ''
+                }
+            } for video_id in id.split(',')]}, self.latency)
+        return _Resource(list_videos)
+
+
+class StubClientPool:
+    """Client pool handing out the same stub client for every key"""
+
+    def __init__(self, client: StubYouTubeClient):
+        self.client = client
+
+    def get(self, api_key: str) -> StubYouTubeClient:
+        return self.client
+
+    def warm_up(self, api_keys) -> None:
+        pass
+
+
+def synthetic_segments(count: int, label: str = "") -> List[Dict]:
+    """Caption-like segments: a short line every couple of seconds"""
+    return [
+        {'text': f"line {i} of caption {label} with a few words", 'start': round(i * 2.5, 3), 'duration': 2.5}
+        for i in range(count)
+    ]
+
+
+class StubYouTubeRepository(YouTubeRepository):
+    """YouTube repository whose transcripts are generated after a fixed delay
+
+    API calls still go through the real repository code, key scheduler and
+    channel cache, against a ``StubYouTubeClient``.
+    """
+
+    def __init__(self, *args, transcript_latency: float = 0.0, segments_per_video: int = 300, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.transcript_latency = transcript_latency
+        self.segments_per_video = segments_per_video
+
+    def get_transcript(self, video_id: str, languages: Optional[List[str]] = None) -> List[Dict]:
+        if self.transcript_latency:
+            time.sleep(self.transcript_latency)
+        return synthetic_segments(self.segments_per_video, video_id)
@@ -0,0 +1,133 @@
+"""Persistent cache for channel lookups"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from config import config
+
+
+class ChannelCache:
+    """On-disk cache of channel-name -> channel-ID resolutions and channel metadata.
+
+    Backed by SQLite in WAL mode with a busy timeout, so several processes
+    (API workers, CLI runs) can share one cache file. Entries expire after
+    ``ttl_seconds`` and the oldest entries are evicted once ``max_entries``
+    is exceeded. Hit and miss counters are kept per process.
+    """
+
+    CHANNEL_IDS = "channel_id"
+    METADATA = "metadata"
+
+    def __init__(self, path: str, ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 10000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._hits = 0
+        self._misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the schema on first use"""
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " kind TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " PRIMARY KEY (kind, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at)")
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _get(self, kind: str, key: str):
+        """Look up an entry, counting the hit or miss"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE kind = ? AND key = ? AND stored_at >= ?",
+                (kind, key, time.time() - self.ttl_seconds)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        with self._lock:
+            if row is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return json.loads(row[0]) if row else None
+
+    def _set(self, kind: str, key: str, value) -> None:
+        """Store an entry and evict expired or excess entries"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (kind, key, value, stored_at) VALUES (?, ?, ?, ?)",
+                    (kind, key, json.dumps(value), now)
+                )
+                conn.execute("DELETE FROM entries WHERE stored_at < ?", (now - self.ttl_seconds,))
+                conn.execute(
+                    "DELETE FROM entries WHERE rowid IN ("
+                    " SELECT rowid FROM entries ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _normalize_name(channel_name: str) -> str:
+        return channel_name.strip().casefold()
+
+    def get_channel_id(self, channel_name: str) -> Optional[str]:
+        """Get a cached channel ID for a channel name"""
+        return self._get(self.CHANNEL_IDS, self._normalize_name(channel_name))
+
+    def set_channel_id(self, channel_name: str, channel_id: str) -> None:
+        """Cache the channel ID a channel name resolved to"""
+        self._set(self.CHANNEL_IDS, self._normalize_name(channel_name), channel_id)
+
+    def get_channel_metadata(self, channel_id: str) -> Optional[Dict]:
+        """Get cached metadata (title, uploads playlist) for a channel ID"""
+        return self._get(self.METADATA, channel_id)
+
+    def set_channel_metadata(self, channel_id: str, metadata: Dict) -> None:
+        """Cache metadata for a channel ID"""
+        self._set(self.METADATA, channel_id, metadata)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process and the number of stored entries"""
+        conn = self._connect()
+        try:
+            entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        finally:
+            conn.close()
+
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+
+# Global channel cache instance
+channel_cache = ChannelCache(
+    config.channel_cache_path,
+    ttl_seconds=config.channel_cache_ttl,
+    max_entries=config.channel_cache_max_entries
+)
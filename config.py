@@ -13,15 +13,62 @@ class Config:
         # YouTube API Configuration
         self.youtube_api_key = self._get_api_key()
         self.youtube_api_keys = self._get_api_keys()
+        self.youtube_discovery_doc = os.getenv('YOUTUBE_DISCOVERY_DOC')
+        
+        # Base URL of a local stand-in (fake_youtube.py) that replaces the Data API
+        # and transcript endpoints, for offline load testing
+        self.youtube_standin_url = os.getenv('YOUTUBE_STANDIN_URL', '').rstrip('/') or None
+        
+        # Daily quota units per API key (YouTube's default is 10,000)
+        self.youtube_daily_quota = int(os.getenv('YOUTUBE_DAILY_QUOTA', '10000'))
         
         # Output Configuration
         self.output_dir = os.getenv('OUTPUT_DIR', 'output')
         self.default_channel_name = os.getenv('DEFAULT_CHANNEL_NAME', 'unknown_channel')
         
+        # Preferred transcript language
+        self.transcript_language = os.getenv('TRANSCRIPT_LANGUAGE', 'en')
+        
+        # Cache Configuration
+        self.cache_dir = os.getenv('CACHE_DIR', os.path.join(self.output_dir, '.cache'))
+        self.channel_cache_path = os.path.join(self.cache_dir, 'channels.db')
+        self.channel_cache_ttl = int(os.getenv('CHANNEL_CACHE_TTL', str(7 * 24 * 3600)))
+        self.channel_cache_max_entries = int(os.getenv('CHANNEL_CACHE_MAX_ENTRIES', '10000'))
+        self.quota_state_path = os.path.join(self.cache_dir, 'quota.db')
+        
         # API Settings
         self.max_results_per_page = int(os.getenv('MAX_RESULTS_PER_PAGE', '50'))
         self.api_timeout = int(os.getenv('API_TIMEOUT', '30'))
         
+        # Channel extraction concurrency
+        self.max_concurrent_videos = max(1, int(os.getenv('MAX_CONCURRENT_VIDEOS', '4')))
+        
+        # Transcript fetch pacing: requests per second, burst size, the most
+        # fetches in flight (adjusted automatically below this) and attempts per video
+        self.transcript_rate = float(os.getenv('TRANSCRIPT_RATE', '2'))
+        self.transcript_burst = float(os.getenv('TRANSCRIPT_BURST', '5'))
+        self.transcript_max_concurrency = max(1, int(os.getenv('TRANSCRIPT_MAX_CONCURRENCY', '8')))
+        self.transcript_max_attempts = max(1, int(os.getenv('TRANSCRIPT_MAX_ATTEMPTS', '4')))
+        
+        # Background job executor size (jobs running at the same time)
+        self.job_workers = max(1, int(os.getenv('JOB_WORKERS', '4')))
+        
+        # Job storage, shared by every API worker
+        self.job_store = os.getenv('JOB_STORE', 'sqlite').lower()
+        self.job_store_path = os.getenv('JOB_STORE_PATH', os.path.join(self.cache_dir, 'jobs.db'))
+        self.job_ttl = int(os.getenv('JOB_TTL', str(24 * 3600)))
+        self.job_max_entries = int(os.getenv('JOB_MAX_ENTRIES', '10000'))
+        self.redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+        
+        # On-demand profiling of requests (X-Profile header) and jobs ("profile"
+        # flag), kept under PROFILE_DIR; disabled unless PROFILING_ENABLED is set.
+        # Profiling and the admin endpoints require ADMIN_TOKEN, and stay off without it
+        self.profiling_enabled = os.getenv('PROFILING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+        self.profile_dir = os.getenv('PROFILE_DIR', os.path.join(self.cache_dir, 'profiles'))
+        self.profile_interval = float(os.getenv('PROFILE_INTERVAL', '0.005'))
+        self.profile_max_files = int(os.getenv('PROFILE_MAX_FILES', '50'))
+        self.admin_token = os.getenv('ADMIN_TOKEN') or None
+        
         # API key rotation
         self._current_key_index = 0
     
@@ -1,31 +1,55 @@
 import sys
 import os
-from youtube_transcript_api import YouTubeTranscriptApi
 from datetime import datetime
 from config import config
+from key_scheduler import key_scheduler
+from metrics import count_outcomes, stage, videos_processed
+from transcript_fetcher import fetch_transcript
+from transcript_formats import iter_markdown_document, write_transcript
+from backend.repositories.transcript_repository import TranscriptRepository
 
+EXPORT_FORMATS = ("md", "txt", "srt", "vtt", "json")
 
-def extract_transcript(youtube_url, output_dir=None, channel_name=None, video_date=None, include_metadata=True):
-    try:
-        video_id = youtube_url.split('v=')[-1]
-        transcript = YouTubeTranscriptApi.get_transcript(video_id)
-        
-        # Get video title if requested
-        video_title = None
-        if include_metadata:
+
+# One repository per output directory, so markdown transcripts are saved through the
+# transcript index; the configured output directory uses the configured cache directory
+_repositories = {}
+
+
+def transcript_repository(output_dir):
+    repository = _repositories.get(output_dir)
+    if repository is None:
+        cache_dir = config.cache_dir if os.path.abspath(output_dir) == os.path.abspath(config.output_dir) else None
+        repository = _repositories.setdefault(output_dir, TranscriptRepository(output_dir, cache_dir))
+    return repository
+
+
+# File name a transcript is saved under
+def transcript_filename(channel_name, video_date, video_id, export_format="md"):
+    return f"{channel_name}-{video_date}-{video_id}.{export_format}"
+
+
+# Fetch a video's transcript and write it to output_dir, returning the file path. Errors are
+# raised to the caller. If a timings dict is passed, seconds spent per stage are added to it.
+@count_outcomes(videos_processed)
+def extract_transcript(youtube_url, output_dir=None, channel_name=None, video_date=None, include_metadata=True,
+                       video_title=None, export_format="md", timings=None):
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported format '{export_format}', expected one of {', '.join(EXPORT_FORMATS)}")
+
+    video_id = youtube_url.split('v=')[-1]
+    with stage("transcript", timings):
+        transcript = fetch_transcript(video_id)
+
+    # Get video title if requested and not already known
+    if include_metadata and not video_title:
+        with stage("metadata", timings):
             try:
-                # Import here to avoid circular dependency
-                import googleapiclient.discovery
-                youtube = googleapiclient.discovery.build(
-                    "youtube", "v3", developerKey=config.get_current_api_key()
-                )
-                
-                request = youtube.videos().list(
+                response = key_scheduler.execute("videos", lambda youtube: youtube.videos().list(
                     part="snippet",
                     id=video_id
-                )
-                response = request.execute()
-                
+                ))
+
                 if response.get("items"):
                     video_title = response["items"][0]["snippet"]["title"]
                     channel_name = channel_name or response["items"][0]["snippet"]["channelTitle"]
@@ -33,44 +57,45 @@ def extract_transcript(youtube_url, output_dir=None, channel_name=None, video_da
             except Exception as e:
                 print(f"Could not fetch video metadata: {e}")
 
-        # Convert transcript to markdown format
-        md_content = f"# {video_title or 'Transcript'}\n\n" if video_title else ""
-        md_content += f"URL: {youtube_url}\n"
-        if video_title:
-            md_content += f"Title: {video_title}\n"
-        if channel_name:
-            md_content += f"Channel: {channel_name}\n"
-        if video_date:
-            md_content += f"Date: {video_date}\n"
-        md_content += "\n---\n\n"
-        
-        for entry in transcript:
-            md_content += f"{entry['start']:.2f}s: {entry['text']}\n"
-
-        # Create filename based on available information
-        # Use defaults from config if parameters are not provided
-        channel_name = channel_name or config.default_channel_name
-        video_date = video_date or datetime.now().strftime("%Y-%m-%d")
-        output_dir = output_dir or config.output_dir
-        
-        # Write to markdown file with channel name, video date, and video ID
-        output_path = os.path.join(output_dir, f"{channel_name}-{video_date}-{video_id}.md")
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(md_content)
-
-        print(f"Transcript saved to {output_path}")
-    except Exception as e:
-        print(f"An error occurred: {e}")
+    # Create filename based on available information
+    # Use defaults from config if parameters are not provided
+    file_channel_name = channel_name or config.default_channel_name
+    file_video_date = video_date or datetime.now().strftime("%Y-%m-%d")
+    output_dir = output_dir or config.output_dir
+
+    # Write to a file named with channel name, video date, and video ID
+    output_path = os.path.join(
+        output_dir, transcript_filename(file_channel_name, file_video_date, video_id, export_format)
+    )
+
+    with stage("write", timings):
+        if export_format == "md":
+            # Markdown is the archive format: saving it through the repository keeps the
+            # index current, including when an existing transcript is overwritten in place
+            content = "".join(iter_markdown_document(transcript, youtube_url, video_title, channel_name, video_date))
+            transcript_repository(output_dir).save_transcript(content, file_channel_name, file_video_date, video_id)
+        else:
+            # Render straight into the file instead of building the whole document in memory
+            with open(output_path, 'w', encoding='utf-8') as f:
+                write_transcript(f, transcript, export_format)
+
+    return output_path
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python extract_transcript.py <youtube_url> [channel_name] [video_date]")
-        print("Note: channel_name and video_date are optional")
+        print("Usage: python extract_transcript.py <youtube_url> [channel_name] [video_date] [video_title]")
+        print("Note: channel_name, video_date and video_title are optional")
     else:
         youtube_url = sys.argv[1]
         channel_name = sys.argv[2] if len(sys.argv) > 2 else None
         video_date = sys.argv[3] if len(sys.argv) > 3 else None
+        video_title = sys.argv[4] if len(sys.argv) > 4 else None
         config.ensure_output_dir()
-        extract_transcript(youtube_url, config.output_dir, channel_name, video_date)
\ No newline at end of file
+        try:
+            output_path = extract_transcript(youtube_url, config.output_dir, channel_name, video_date,
+                                             video_title=video_title)
+            print(f"Transcript saved to {output_path}")
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,497 @@
+"""Local stand-in for the YouTube Data API and timedtext transcripts, for offline load testing
+
+Serves search.list, channels.list, playlistItems.list and videos.list under
+/youtube/v3/ and caption tracks under /api/timedtext from fixtures, with
+optional latency, error, 429 and quota-exhaustion injection. Point the CLI
+tools and the API at it with YOUTUBE_STANDIN_URL:
+
+    python fake_youtube.py --port 8765 --latency 0.05 --throttle-rate 0.1
+    YOUTUBE_STANDIN_URL=http://127.0.0.1:8765 python fetch_and_extract.py "Area52Investigations" 10
+
+Fixtures are JSON ({"channels": [...], "videos": [...]}) recorded from an
+existing transcript archive (--from-archive), generated (--synthetic-videos)
+or loaded from a file (--fixtures, default fixtures/youtube_sample.json).
+GET /_stats reports request counts, statuses and peak concurrency; POST
+/_settings changes the injection settings of a running server and POST
+/_reset clears the stats.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape, quoteattr
+
+from transcript_formats import iter_markdown_segments
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "youtube_sample.json")
+
+DATA_API_PREFIX = "/youtube/v3/"
+TIMEDTEXT_PATH = "/api/timedtext"
+
+# Stored transcript filenames: {channel}-{YYYY-MM-DD}-{video_id}.md
+ARCHIVE_FILENAME_PATTERN = re.compile(r'^(?P<channel>.+)-(?P<date>\d{4}-\d{2}-\d{2})-(?P<video_id>[\w-]+)$')
+
+
+def load_fixtures(path: str) -> Dict:
+    """Read a fixtures file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_fixtures(fixtures: Dict, path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(fixtures, f, indent=2, ensure_ascii=False)
+
+
+def channel_id_for(name: str) -> str:
+    """A stable fake channel ID for a channel name"""
+    return "UC" + re.sub(r'[^\w-]', '_', name.lstrip('@'))[:22].ljust(22, '_')
+
+
+def fixtures_from_archive(
+    output_dir: str,
+    max_videos: Optional[int] = None,
+    max_segments: Optional[int] = None
+) -> Dict:
+    """Record fixtures from the markdown transcripts in an output directory
+
+    Channel, date, video ID, title and segments come from each file, so the
+    stand-in serves the same videos and captions the archive was made from.
+    """
+    channels = {}
+    videos = []
+    names = sorted(name for name in os.listdir(output_dir) if name.endswith('.md'))
+    for name in names[:max_videos]:
+        match = ARCHIVE_FILENAME_PATTERN.match(name[:-3])
+        if not match:
+            continue
+
+        title = None
+        with open(os.path.join(output_dir, name), 'r', encoding='utf-8') as f:
+            lines = list(f)
+        for line in lines:
+            if line.strip() == '---':
+                break
+            if line.startswith('Title: '):
+                title = line[len('Title: '):].strip()
+        segments = list(iter_markdown_segments(lines))[:max_segments]
+
+        channel_name = match.group('channel')
+        channel_id = channel_id_for(channel_name)
+        channels.setdefault(channel_id, {
+            'id': channel_id,
+            'title': channel_name.lstrip('@'),
+            'handle': channel_name if channel_name.startswith('@') else f"@{channel_name}",
+        })
+        videos.append({
+            'id': match.group('video_id'),
+            'channel_id': channel_id,
+            'title': title or match.group('video_id'),
+            'published_at': f"{match.group('date')}T12:00:00Z",
+            'description': '',
+            'transcripts': {'en': segments},
+        })
+    return {'channels': list(channels.values()), 'videos': videos}
+
+
+def synthetic_fixtures(video_count: int, segments_per_video: int = 300, channel_name: str = "Load Test") -> Dict:
+    """Generate one channel with ``video_count`` daily uploads and captions"""
+    channel_id = channel_id_for(channel_name)
+    newest = datetime(2025, 12, 31)
+    videos = []
+    for i in range(video_count):
+        video_id = f"load{i:07d}"
+        videos.append({
+            'id': video_id,
+            'channel_id': channel_id,
+            'title': f"{channel_name} video {i}",
+            'published_at': (newest - timedelta(days=i)).strftime("%Y-%m-%dT12:00:00Z"),
+            'description': '',
+            'transcripts': {'en': [
+                {'text': f"caption {j} of {video_id}", 'start': round(j * 2.5, 3), 'duration': 2.5}
+                for j in range(segments_per_video)
+            ]},
+        })
+    return {
+        'channels': [{'id': channel_id, 'title': channel_name, 'handle': f"@{channel_name.replace(' ', '')}"}],
+        'videos': videos,
+    }
+
+
+class InjectionSettings:
+    """How the stand-in misbehaves: delays, failure rates and exhausted keys
+
+    ``throttle_first`` answers the first N attempts of every distinct
+    request with 429, which exercises retries deterministically; the rates
+    are applied with a seeded random generator. ``endpoints`` limits the
+    injected 429s and 503s to some endpoints (e.g. ``["timedtext"]``); empty
+    means all of them.
+    """
+
+    FIELDS = (
+        'latency', 'jitter', 'error_rate', 'throttle_rate', 'throttle_first', 'exhausted_keys', 'endpoints', 'seed'
+    )
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        throttle_first: int = 0,
+        exhausted_keys: Optional[List[str]] = None,
+        endpoints: Optional[List[str]] = None,
+        seed: int = 0
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.throttle_first = throttle_first
+        self.exhausted_keys = list(exhausted_keys or [])
+        self.endpoints = list(endpoints or [])
+        self.seed = seed
+
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def update(self, values: Dict) -> None:
+        unknown = set(values) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+        for field, value in values.items():
+            setattr(self, field, value)
+
+
+class FakeYouTube:
+    """Answers stand-in requests from fixtures; shared by every handler thread"""
+
+    def __init__(self, fixtures: Dict, settings: Optional[InjectionSettings] = None):
+        self.settings = settings or InjectionSettings()
+        self.channels = {channel['id']: channel for channel in fixtures.get('channels', [])}
+        self.videos = {video['id']: video for video in fixtures.get('videos', [])}
+
+        # Uploads playlists list a channel's videos newest first
+        self.uploads = {}
+        for channel_id in self.channels:
+            uploads = [video for video in self.videos.values() if video['channel_id'] == channel_id]
+            uploads.sort(key=lambda video: video['published_at'], reverse=True)
+            self.uploads[self.uploads_playlist_id(channel_id)] = uploads
+
+        self._lock = threading.Lock()
+        self._random = random.Random(self.settings.seed)
+        self._attempts: Counter = Counter()
+        self.reset_stats()
+
+    @staticmethod
+    def uploads_playlist_id(channel_id: str) -> str:
+        return "UU" + channel_id[2:]
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {'requests': Counter(), 'statuses': Counter(), 'in_flight': 0, 'max_in_flight': 0}
+            self._attempts.clear()
+            self._random.seed(self.settings.seed)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'requests': dict(self._stats['requests']),
+                'statuses': {str(status): count for status, count in self._stats['statuses'].items()},
+                'in_flight': self._stats['in_flight'],
+                'max_in_flight': self._stats['max_in_flight'],
+                'settings': self.settings.to_dict(),
+            }
+
+    def handle(self, method: str, url: str, body: bytes = b"") -> Tuple[int, str, bytes]:
+        """Answer one request with ``(status, content type, body)``"""
+        parsed = urlparse(url)
+        query = {name: values[-1] for name, values in parse_qs(parsed.query).items()}
+        path = parsed.path
+
+        if path.startswith('/_'):
+            return self._handle_control(method, path, body)
+
+        endpoint = path[len(DATA_API_PREFIX):] if path.startswith(DATA_API_PREFIX) else path.rsplit('/', 1)[-1]
+        with self._lock:
+            self._stats['requests'][endpoint] += 1
+            self._stats['in_flight'] += 1
+            self._stats['max_in_flight'] = max(self._stats['max_in_flight'], self._stats['in_flight'])
+        try:
+            status, content_type, payload = self._handle_api(endpoint, path, query)
+        finally:
+            with self._lock:
+                self._stats['in_flight'] -= 1
+        with self._lock:
+            self._stats['statuses'][status] += 1
+        return status, content_type, payload
+
+    def _handle_control(self, method: str, path: str, body: bytes) -> Tuple[int, str, bytes]:
+        if path == '/_stats':
+            return self._json(200, self.stats())
+        if path == '/_reset' and method == 'POST':
+            self.reset_stats()
+            return self._json(200, self.stats())
+        if path == '/_settings' and method == 'POST':
+            try:
+                self.settings.update(json.loads(body or b"{}"))
+            except ValueError as e:
+                return self._json(400, {'error': str(e)})
+            self.reset_stats()
+            return self._json(200, self.settings.to_dict())
+        return self._json(404, {'error': f"Unknown path {path}"})
+
+    def _handle_api(self, endpoint: str, path: str, query: Dict[str, str]) -> Tuple[int, str, bytes]:
+        settings = self.settings
+        delay = settings.latency + (self._uniform(0, settings.jitter) if settings.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        is_data_api = path.startswith(DATA_API_PREFIX)
+        if is_data_api and query.get('key') in settings.exhausted_keys:
+            return self._api_error(403, 'quotaExceeded', "The request cannot be completed because you have exceeded your quota.")
+
+        if not settings.endpoints or endpoint in settings.endpoints:
+            signature = (path, tuple(sorted((name, value) for name, value in query.items() if name != 'key')))
+            with self._lock:
+                self._attempts[signature] += 1
+                attempt = self._attempts[signature]
+            if attempt <= settings.throttle_first or self._chance(settings.throttle_rate):
+                if is_data_api:
+                    return self._api_error(429, 'rateLimitExceeded', "Too many requests")
+                return 429, 'text/plain', b"Too Many Requests"
+            if self._chance(settings.error_rate):
+                if is_data_api:
+                    return self._api_error(503, 'backendError', "Backend Error")
+                return 503, 'text/plain', b"Service Unavailable"
+
+        if endpoint == 'search':
+            return self._json(200, self._search(query))
+        if endpoint == 'channels':
+            return self._json(200, self._channels(query))
+        if endpoint == 'playlistItems':
+            return self._playlist_items(query)
+        if endpoint == 'videos':
+            return self._json(200, self._videos(query))
+        if path == TIMEDTEXT_PATH:
+            return self._timedtext(query)
+        return self._api_error(404, 'notFound', f"Unknown endpoint {path}")
+
+    def _uniform(self, low: float, high: float) -> float:
+        with self._lock:
+            return self._random.uniform(low, high)
+
+    def _chance(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def _search(self, query: Dict[str, str]) -> Dict:
+        term = query.get('q', '').strip().lower().lstrip('@')
+        exact = [c for c in self.channels.values() if term in (c['title'].lower(), c['handle'].lower().lstrip('@'))]
+        partial = [c for c in self.channels.values() if term and term in c['title'].lower() and c not in exact]
+        matches = (exact + partial)[:int(query.get('maxResults', 5))]
+        return {
+            'kind': 'youtube#searchListResponse',
+            'items': [{
+                'kind': 'youtube#searchResult',
+                'id': {'kind': 'youtube#channel', 'channelId': channel['id']},
+                'snippet': {'channelId': channel['id'], 'title': channel['title']},
+            } for channel in matches],
+        }
+
+    def _channels(self, query: Dict[str, str]) -> Dict:
+        items = []
+        for channel_id in query.get('id', '').split(','):
+            channel = self.channels.get(channel_id)
+            if channel:
+                items.append({
+                    'kind': 'youtube#channel',
+                    'id': channel_id,
+                    'snippet': {'title': channel['title'], 'customUrl': channel['handle']},
+                    'contentDetails': {'relatedPlaylists': {'uploads': self.uploads_playlist_id(channel_id)}},
+                })
+        return {'kind': 'youtube#channelListResponse', 'items': items}
+
+    def _playlist_items(self, query: Dict[str, str]) -> Tuple[int, str, bytes]:
+        uploads = self.uploads.get(query.get('playlistId', ''))
+        if uploads is None:
+            return self._api_error(404, 'playlistNotFound', "The playlist identified with the request's playlistId parameter cannot be found.")
+
+        start = int(query.get('pageToken') or 0)
+        end = min(start + min(int(query.get('maxResults', 5)), 50), len(uploads))
+        response = {
+            'kind': 'youtube#playlistItemListResponse',
+            'items': [{
+                'kind': 'youtube#playlistItem',
+                'snippet': {'title': video['title'], 'publishedAt': video['published_at']},
+                'contentDetails': {'videoId': video['id'], 'videoPublishedAt': video['published_at']},
+            } for video in uploads[start:end]],
+            'pageInfo': {'totalResults': len(uploads), 'resultsPerPage': end - start},
+        }
+        if end < len(uploads):
+            response['nextPageToken'] = str(end)
+        return self._json(200, response)
+
+    def _videos(self, query: Dict[str, str]) -> Dict:
+        items = []
+        for video_id in query.get('id', '').split(','):
+            video = self.videos.get(video_id)
+            if video:
+                channel = self.channels.get(video['channel_id'], {})
+                items.append({
+                    'kind': 'youtube#video',
+                    'id': video_id,
+                    'snippet': {
+                        'title': video['title'],
+                        'channelId': video['channel_id'],
+                        'channelTitle': channel.get('title'),
+                        'publishedAt': video['published_at'],
+                        'description': video.get('description', ''),
+                    },
+                })
+        return {'kind': 'youtube#videoListResponse', 'items': items}
+
+    def _timedtext(self, query: Dict[str, str]) -> Tuple[int, str, bytes]:
+        video = self.videos.get(query.get('v', ''))
+        segments = (video or {}).get('transcripts', {}).get(query.get('lang', 'en'))
+        if segments is None:
+            return 404, 'text/plain', b"No transcript"
+
+        lines = ['<?xml version="1.0" encoding="utf-8" ?><transcript>']
+        lines.extend(
+            f"<text start={quoteattr(str(entry['start']))} dur={quoteattr(str(entry['duration']))}>"
+            f"{escape(entry['text'])}</text>"
+            for entry in segments
+        )
+        lines.append('</transcript>')
+        return 200, 'text/xml; charset=utf-8', ''.join(lines).encode('utf-8')
+
+    @staticmethod
+    def _json(status: int, payload: Dict) -> Tuple[int, str, bytes]:
+        return status, 'application/json; charset=utf-8', json.dumps(payload).encode('utf-8')
+
+    def _api_error(self, status: int, reason: str, message: str) -> Tuple[int, str, bytes]:
+        """An error body shaped like the Data API's, so callers parse reasons as usual"""
+        return self._json(status, {'error': {
+            'code': status,
+            'message': message,
+            'errors': [{'message': message, 'domain': 'youtube.quota' if status == 403 else 'global', 'reason': reason}],
+        }})
+
+
+class FakeYouTubeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self, method: str) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b""
+        status, content_type, payload = self.server.app.handle(method, self.path, body)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._respond('GET')
+
+    def do_POST(self):
+        self._respond('POST')
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class FakeYouTubeServer(ThreadingHTTPServer):
+    """HTTP server handing every request to a ``FakeYouTube`` on its own thread"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, app: FakeYouTube, host: str = "127.0.0.1", port: int = 0, verbose: bool = False):
+        super().__init__((host, port), FakeYouTubeHandler)
+        self.app = app
+        self.verbose = verbose
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> threading.Thread:
+        """Serve from a background thread, e.g. inside a benchmark or load test"""
+        thread = threading.Thread(target=self.serve_forever, name="fake-youtube", daemon=True)
+        thread.start()
+        return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the YouTube Data API and transcripts")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="Fixtures JSON file (default: %(default)s)")
+    source.add_argument("--from-archive", metavar="OUTPUT_DIR", help="Record fixtures from a transcript archive")
+    source.add_argument("--synthetic-videos", type=int, metavar="N", help="Generate one channel with N videos")
+    parser.add_argument("--max-segments", type=int, help="Keep at most this many segments per recorded video")
+    parser.add_argument("--save-fixtures", metavar="PATH", help="Write the fixtures to a file and exit")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay of up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--throttle-first", type=int, default=0,
+                        help="Answer the first N attempts of every distinct request with 429")
+    parser.add_argument("--exhausted-keys", default="", help="Comma-separated API keys that get quotaExceeded")
+    parser.add_argument("--endpoints", default="",
+                        help="Comma-separated endpoints the 429s and 503s apply to, e.g. timedtext (default: all)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the injected failures and jitter")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    if args.from_archive:
+        fixtures = fixtures_from_archive(args.from_archive, max_segments=args.max_segments)
+    elif args.synthetic_videos:
+        fixtures = synthetic_fixtures(args.synthetic_videos)
+    else:
+        fixtures = load_fixtures(args.fixtures)
+
+    if args.save_fixtures:
+        save_fixtures(fixtures, args.save_fixtures)
+        print(f"Saved {len(fixtures['videos'])} videos from {len(fixtures['channels'])} channels to {args.save_fixtures}")
+        return
+
+    settings = InjectionSettings(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        throttle_first=args.throttle_first,
+        exhausted_keys=[key.strip() for key in args.exhausted_keys.split(',') if key.strip()],
+        endpoints=[name.strip() for name in args.endpoints.split(',') if name.strip()],
+        seed=args.seed
+    )
+    server = FakeYouTubeServer(FakeYouTube(fixtures, settings), args.host, args.port, verbose=args.verbose)
+    print(f"Serving {len(fixtures['videos'])} videos from {len(fixtures['channels'])} channels on {server.base_url}")
+    print(f"Use it with: YOUTUBE_STANDIN_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,71 +1,161 @@
+import argparse
 import os
-import subprocess
 import sys
-import googleapiclient.discovery
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from config import config
+from key_scheduler import key_scheduler
+from channel_cache import channel_cache
+from extract_transcript import EXPORT_FORMATS, extract_transcript, transcript_filename
+from metrics import stage
+from backend.repositories.transcript_repository import TranscriptRepository
+from backend.repositories.youtube_repository import YouTubeRepository
 
-# Initialize the YouTube API client
-api_service_name = "youtube"
-api_version = "v3"
+# Channel lookups, uploads and video metadata, on the shared API keys and channel cache
+youtube_repository = YouTubeRepository(key_scheduler=key_scheduler, channel_cache=channel_cache)
 
-youtube = googleapiclient.discovery.build(
-    api_service_name, api_version, developerKey=config.get_current_api_key())
-
-# Function to get channel ID from channel name
+# Function to get channel ID from channel name, using the channel cache when possible
 def get_channel_id_from_name(channel_name):
-    request = youtube.search().list(
-        part="snippet",
-        q=channel_name,
-        type="channel",
-        maxResults=1
-    )
-    response = request.execute()
-
-    for item in response.get("items", []):
-        if item["id"].get("channelId"):
-            return item["id"]["channelId"]
-    return None
+    return youtube_repository.get_channel_id(channel_name)
 
 # Function to get video URLs and dates from a channel
 def get_video_urls_and_dates_from_channel(channel_id, max_videos):
-    request = youtube.search().list(
-        part="snippet",
-        channelId=channel_id,
-        maxResults=min(max_videos, config.max_results_per_page),  # Respect API limits
-        order="date"  # Sort by newest first
-    )
-    response = request.execute()
+    return youtube_repository.get_channel_videos(channel_id, max_videos)
 
-    video_data = []
-    for item in response.get("items", []):
-        if item["id"].get("videoId"):
-            video_id = item["id"]["videoId"]
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
-            video_date = item["snippet"]["publishedAt"][:10]  # Extract date part
-            video_data.append((video_url, video_date))
+# Print the outcome of a batch run with per-stage timings
+def print_summary(summary):
+    print()
+    print(f"Summary for {summary['channel_name']}")
+    print(f"  Succeeded: {summary['succeeded']}")
+    print(f"  Failed:    {summary['failed']}")
+    print(f"  Skipped:   {summary['skipped']}")
+    print(f"  Wall time: {summary['wall_time']:.2f}s")
+    print("  Stage timings (seconds, summed across workers):")
+    for name, seconds in summary['timings'].items():
+        print(f"    {name:<16}{seconds:>9.2f}")
+    for video_url, error in summary['failed_videos']:
+        print(f"  Failed: {video_url} - {error}")
 
-    return video_data
+# Main function to process videos. Transcripts are fetched in this process by up to
+# concurrency threads sharing the API clients, starting on each page of uploads as it
+# arrives. Videos whose output file already exists are skipped unless overwrite is set;
+# incremental skips videos already in the archive without listing them at all.
+def main(channel_name, max_videos, incremental=False, concurrency=None, export_format="md", overwrite=False):
+    started_at = time.perf_counter()
+    timings = {}
+    summary = {
+        'channel_name': channel_name,
+        'succeeded': 0,
+        'failed': 0,
+        'skipped': 0,
+        'failed_videos': [],
+        'timings': timings
+    }
 
-# Main function to process videos
-def main(channel_name, max_videos):
-    channel_id = get_channel_id_from_name(channel_name)
+    with stage("channel lookup", timings):
+        channel_id = get_channel_id_from_name(channel_name)
     if not channel_id:
         print(f"Channel not found for name: {channel_name}")
-        return
+        return None
 
-    video_data = get_video_urls_and_dates_from_channel(channel_id, max_videos)
     config.ensure_output_dir()
+    pages = youtube_repository.iter_channel_video_pages(channel_id, max_videos)
+    if incremental:
+        repository = TranscriptRepository(config.output_dir, config.cache_dir)
+        pages = repository.iter_unarchived_pages(pages, channel_name)
+
+    futures = {}
+    completed = 0
+    expected_total = 0
+
+    def collect(future):
+        nonlocal completed
+        video_url = futures.pop(future)
+        completed += 1
+        try:
+            output_path, video_timings = future.result()
+            summary['succeeded'] += 1
+            for name, seconds in video_timings.items():
+                timings[name] = timings.get(name, 0.0) + seconds
+            print(f"[{completed}/{expected_total}] Transcript saved to {output_path}")
+        except Exception as e:
+            summary['failed'] += 1
+            summary['failed_videos'].append((video_url, str(e)))
+            print(f"[{completed}/{expected_total}] Failed {video_url}: {e}")
+
+    def extract(video_url, video_date, video_title):
+        video_timings = {}
+        output_path = extract_transcript(video_url, config.output_dir, channel_name, video_date,
+                                         video_title=video_title, export_format=export_format,
+                                         timings=video_timings)
+        return output_path, video_timings
 
-    # Use platform-agnostic Python executable
-    python_executable = sys.executable
+    with ThreadPoolExecutor(max_workers=concurrency or config.max_concurrent_videos) as executor:
+        page_iterator = iter(pages)
+        while True:
+            with stage("video listing", timings):
+                page = next(page_iterator, None)
+            if page is None:
+                break
+            video_data, page_total = page
 
-    for url, video_date in video_data:
-        subprocess.run([python_executable, "extract_transcript.py", url, channel_name, video_date])
+            pending = []
+            for url, video_date in video_data:
+                video_id = url.split('v=')[-1]
+                output_path = os.path.join(
+                    config.output_dir, transcript_filename(channel_name, video_date, video_id, export_format)
+                )
+                if not overwrite and os.path.exists(output_path):
+                    summary['skipped'] += 1
+                else:
+                    pending.append((url, video_date, video_id))
+
+            # Look up the page's titles in one call instead of once per video
+            with stage("titles", timings):
+                try:
+                    metadata = youtube_repository.get_videos_metadata([video_id for _, _, video_id in pending])
+                    titles = {video_id: video['title'] for video_id, video in metadata.items()}
+                except Exception as e:
+                    print(f"Could not fetch video metadata: {e}")
+                    titles = {}
+
+            for url, video_date, video_id in pending:
+                futures[executor.submit(extract, url, video_date, titles.get(video_id))] = url
+            expected_total = max(page_total - summary['skipped'], completed + len(futures))
+
+            # Report videos that finished while this page was being fetched
+            for future in [f for f in futures if f.done()]:
+                collect(future)
+
+        # The listing is done, so the remaining count is exact
+        expected_total = completed + len(futures)
+        for future in as_completed(list(futures)):
+            collect(future)
+
+    summary['wall_time'] = time.perf_counter() - started_at
+    print_summary(summary)
+    return summary
+
+# Command line options
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fetch a channel's most recent videos and save their transcripts"
+    )
+    parser.add_argument("channel_name", help="Channel name to search for")
+    parser.add_argument("max_videos", type=int, help="Number of most recent videos to process")
+    parser.add_argument("--concurrency", type=int, default=config.max_concurrent_videos,
+                        help="Transcripts fetched at once (default: MAX_CONCURRENT_VIDEOS, %(default)s)")
+    parser.add_argument("--format", dest="export_format", choices=EXPORT_FORMATS, default="md",
+                        help="Output format (default: %(default)s)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch uploads newer than the ones already archived")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Re-extract videos whose output file already exists")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python fetch_and_extract.py channelname max_videos")
-    else:
-        channel_name = sys.argv[1]
-        max_videos = int(sys.argv[2])
-        main(channel_name, max_videos)
+    args = parse_args()
+    summary = main(args.channel_name, args.max_videos, incremental=args.incremental,
+                   concurrency=max(1, args.concurrency), export_format=args.export_format,
+                   overwrite=args.overwrite)
+    sys.exit(0 if summary is not None and summary['failed'] == 0 else 1)
@@ -69,12 +69,12 @@ function App() {
     }
   };
 
-  const handleChannelExtract = async (channelName, maxVideos) => {
+  const handleChannelExtract = async (channelName, maxVideos, incremental) => {
     setIsLoading(true);
     
     try {
       // Start channel extraction job
-      const job = await transcriptAPI.fetchChannelVideos(channelName, maxVideos);
+      const job = await transcriptAPI.fetchChannelVideos(channelName, maxVideos, incremental);
       
       toast.loading(`Fetching videos from ${channelName}...`, { id: job.job_id });
 
@@ -102,13 +102,24 @@ function App() {
 
   const loadTranscripts = async () => {
     try {
-      const data = await transcriptAPI.listTranscripts(1, 20);
+      const data = await transcriptAPI.listTranscripts(1, 20, true);
       setTranscripts(data.transcripts);
     } catch (error) {
       console.error('Failed to load transcripts:', error);
     }
   };
 
+  const handleSelectTranscript = async (summary) => {
+    // The list only carries metadata, so fetch the transcript text on demand
+    try {
+      const blob = await transcriptAPI.downloadTranscript(summary.video_id, 'md');
+      const text = await blob.text();
+      setSelectedTranscript({ ...summary, transcript_text: text, format: 'md' });
+    } catch (error) {
+      toast.error(error.message || 'Failed to load transcript');
+    }
+  };
+
   useEffect(() => {
     loadTranscripts();
   }, []);
@@ -193,7 +204,7 @@ function App() {
         {showHistory && (
           <TranscriptList 
             transcripts={transcripts} 
-            onSelect={setSelectedTranscript} 
+            onSelect={handleSelectTranscript} 
           />
         )}
 
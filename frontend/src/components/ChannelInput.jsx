@@ -5,6 +5,7 @@ import toast from 'react-hot-toast';
 const ChannelInput = ({ onExtract, isLoading }) => {
   const [channelName, setChannelName] = useState('');
   const [maxVideos, setMaxVideos] = useState(10);
+  const [incremental, setIncremental] = useState(false);
 
   const handleSubmit = (e) => {
     e.preventDefault();
@@ -14,12 +15,12 @@ const ChannelInput = ({ onExtract, isLoading }) => {
       return;
     }
 
-    if (maxVideos < 1 || maxVideos > 50) {
-      toast.error('Max videos must be between 1 and 50');
+    if (maxVideos < 1 || maxVideos > 5000) {
+      toast.error('Max videos must be between 1 and 5000');
       return;
     }
 
-    onExtract(channelName, maxVideos);
+    onExtract(channelName, maxVideos, incremental);
   };
 
   return (
@@ -55,7 +56,7 @@ const ChannelInput = ({ onExtract, isLoading }) => {
           value={maxVideos}
           onChange={(e) => setMaxVideos(parseInt(e.target.value) || 10)}
           min="1"
-          max="50"
+          max="5000"
           className="block w-full px-3 py-2 border border-gray-300 dark:border-gray-600 rounded-md 
                    focus:ring-youtube-red focus:border-youtube-red dark:bg-gray-800 dark:text-white"
           disabled={isLoading}
@@ -65,6 +66,20 @@ const ChannelInput = ({ onExtract, isLoading }) => {
         </p>
       </div>
 
+      <div className="flex items-center">
+        <input
+          type="checkbox"
+          id="incremental"
+          checked={incremental}
+          onChange={(e) => setIncremental(e.target.checked)}
+          className="h-4 w-4 text-youtube-red border-gray-300 rounded focus:ring-youtube-red"
+          disabled={isLoading}
+        />
+        <label htmlFor="incremental" className="ml-2 text-sm text-gray-700 dark:text-gray-300">
+          Only new videos (skip videos already archived)
+        </label>
+      </div>
+
       <button
         type="submit"
         disabled={isLoading}
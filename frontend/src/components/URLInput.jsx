@@ -80,6 +80,7 @@ const URLInput = ({ onExtract, isLoading }) => {
             <option value="md">Markdown</option>
             <option value="txt">Plain Text</option>
             <option value="srt">SRT Subtitles</option>
+            <option value="vtt">WebVTT Subtitles</option>
             <option value="json">JSON</option>
           </select>
         </div>
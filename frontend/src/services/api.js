@@ -39,10 +39,11 @@ export const transcriptAPI = {
   },
 
   // Fetch videos from a channel
-  fetchChannelVideos: async (channelName, maxVideos = 10) => {
+  fetchChannelVideos: async (channelName, maxVideos = 10, incremental = false) => {
     const response = await api.post('/fetch-channel', {
       channel_name: channelName,
       max_videos: maxVideos,
+      incremental,
     });
     return response.data;
   },
@@ -53,10 +54,10 @@ export const transcriptAPI = {
     return response.data;
   },
 
-  // List all transcripts
-  listTranscripts: async (page = 1, perPage = 10) => {
+  // List all transcripts (summary mode returns metadata and sizes without transcript text)
+  listTranscripts: async (page = 1, perPage = 10, summary = false) => {
     const response = await api.get('/transcripts', {
-      params: { page, per_page: perPage },
+      params: { page, per_page: perPage, summary },
     });
     return response.data;
   },
@@ -65,13 +66,50 @@ export const transcriptAPI = {
   downloadTranscript: async (videoId, format = 'md') => {
     const response = await api.get(`/transcript/${videoId}`, {
       params: { format },
-      responseType: format === 'md' ? 'blob' : 'json',
+      responseType: 'blob',
     });
     return response.data;
   },
 
-  // Poll job status until completion
-  pollJobStatus: async (jobId, onProgress = null) => {
+  // Follow job progress until completion, pushed over Server-Sent Events
+  pollJobStatus: (jobId, onProgress = null) => {
+    if (typeof EventSource === 'undefined') {
+      return transcriptAPI.pollJobStatusByRequest(jobId, onProgress);
+    }
+
+    return new Promise((resolve, reject) => {
+      const source = new EventSource(`${API_BASE_URL}/jobs/${jobId}/events`);
+      let received = false;
+
+      const handleStatus = (event) => {
+        received = true;
+        const status = JSON.parse(event.data);
+        if (onProgress) {
+          onProgress(status);
+        }
+        return status;
+      };
+
+      source.addEventListener('progress', handleStatus);
+
+      source.addEventListener('done', (event) => {
+        source.close();
+        resolve(handleStatus(event));
+      });
+
+      source.onerror = () => {
+        // The browser reconnects on its own once the stream has started;
+        // if it never did, fall back to polling
+        if (!received) {
+          source.close();
+          transcriptAPI.pollJobStatusByRequest(jobId, onProgress).then(resolve, reject);
+        }
+      };
+    });
+  },
+
+  // Poll job status until completion, for clients without EventSource
+  pollJobStatusByRequest: async (jobId, onProgress = null) => {
     const maxAttempts = 60; // 60 seconds timeout
     let attempts = 0;
 
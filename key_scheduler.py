@@ -0,0 +1,218 @@
+"""Quota-aware scheduling of YouTube Data API calls across API keys"""
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, time as dt_time, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from googleapiclient.errors import HttpError
+
+from config import config
+from metrics import api_request_seconds, quota_units
+from youtube_client import YouTubeClientPool, client_pool as shared_client_pool
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except Exception:
+    # No tz database available; Pacific standard time is close enough
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+# Quota units charged per call, by resource (https://developers.google.com/youtube/v3/determine_quota_cost)
+QUOTA_COSTS = {
+    'search': 100,
+    'videos': 1,
+    'playlistItems': 1,
+    'channels': 1,
+}
+DEFAULT_QUOTA_COST = 1
+
+# Error reasons meaning a key has no quota left for today
+QUOTA_ERROR_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+
+
+class QuotaExhaustedError(Exception):
+    """Every configured API key is out of quota for today"""
+
+
+def error_reasons(error: HttpError) -> Set[str]:
+    """The ``reason`` codes in a YouTube API error response"""
+    try:
+        body = json.loads(error.content.decode('utf-8'))
+        return {item.get('reason') for item in body['error'].get('errors', []) if item.get('reason')}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return set()
+
+
+def is_quota_error(error: Exception) -> bool:
+    """Check whether an exception is YouTube refusing a call for lack of quota"""
+    return (
+        isinstance(error, HttpError)
+        and error.resp.status == 403
+        and bool(error_reasons(error) & QUOTA_ERROR_REASONS)
+    )
+
+
+class KeyScheduler:
+    """Spreads YouTube Data API calls across keys by estimated remaining quota
+
+    Every call is charged its quota cost against the key that made it, and
+    the next call goes to the key with the most estimated budget left. A key
+    YouTube reports as out of quota is skipped until the daily reset at
+    midnight Pacific time, and the call is retried on the next key.
+
+    Usage is kept in SQLite (WAL mode) so API workers and CLI runs sharing
+    the keys also share one estimate. Keys are stored as hashes, never in
+    the clear.
+    """
+
+    def __init__(
+        self,
+        api_keys: Iterable[str],
+        daily_quota: int = 10000,
+        path: Optional[str] = None,
+        client_pool: Optional[YouTubeClientPool] = None
+    ):
+        self.api_keys = list(dict.fromkeys(api_keys))
+        if not self.api_keys:
+            raise ValueError("KeyScheduler needs at least one API key")
+        self.daily_quota = daily_quota
+        self.path = path or os.path.join(config.cache_dir, 'quota.db')
+        self.client_pool = client_pool or shared_client_pool
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the schema on first use"""
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage ("
+                " key_id TEXT NOT NULL,"
+                " day TEXT NOT NULL,"
+                " used INTEGER NOT NULL DEFAULT 0,"
+                " exhausted INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (key_id, day))"
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    @staticmethod
+    def _key_id(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def _mask(api_key: str) -> str:
+        return f"...{api_key[-4:]}"
+
+    @staticmethod
+    def quota_day() -> str:
+        """The current quota day; YouTube resets quotas at midnight Pacific time"""
+        return datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+    @staticmethod
+    def next_reset() -> datetime:
+        """When the current quota day ends"""
+        now = datetime.now(QUOTA_TIMEZONE)
+        return datetime.combine(now.date() + timedelta(days=1), dt_time(0), tzinfo=QUOTA_TIMEZONE)
+
+    def _usage(self) -> Dict[str, Dict[str, int]]:
+        """Today's usage row per key ID"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT key_id, used, exhausted FROM usage WHERE day = ?", (self.quota_day(),)
+            ).fetchall()
+        finally:
+            conn.close()
+        return {key_id: {'used': used, 'exhausted': exhausted} for key_id, used, exhausted in rows}
+
+    def _record(self, api_key: str, cost: int = 0, exhausted: bool = False) -> None:
+        """Charge a call to a key and/or mark it out of quota for today"""
+        day = self.quota_day()
+        conn = self._connect()
+        try:
+            with conn:
+                created = conn.execute(
+                    "INSERT OR IGNORE INTO usage (key_id, day) VALUES (?, ?)",
+                    (self._key_id(api_key), day)
+                ).rowcount
+                conn.execute(
+                    "UPDATE usage SET used = used + ?, exhausted = MAX(exhausted, ?) "
+                    "WHERE key_id = ? AND day = ?",
+                    (cost, int(exhausted), self._key_id(api_key), day)
+                )
+                if created:
+                    # First call of a new quota day: earlier days no longer matter
+                    conn.execute("DELETE FROM usage WHERE day < ?", (day,))
+        finally:
+            conn.close()
+
+    def candidates(self) -> List[str]:
+        """Keys not known to be out of quota, most estimated budget first"""
+        usage = self._usage()
+        available = [
+            api_key for api_key in self.api_keys
+            if not usage.get(self._key_id(api_key), {}).get('exhausted')
+        ]
+        # sorted() is stable, so ties keep configuration order
+        return sorted(available, key=lambda api_key: usage.get(self._key_id(api_key), {}).get('used', 0))
+
+    def execute(self, resource: str, build_request: Callable):
+        """Build and execute a request on the best key, failing over on quota errors
+
+        ``build_request`` receives a YouTube client and returns the request
+        to execute, e.g. ``lambda youtube: youtube.videos().list(...)``.
+        ``resource`` selects the quota cost. Other errors are raised as-is.
+        """
+        cost = QUOTA_COSTS.get(resource, DEFAULT_QUOTA_COST)
+        for api_key in self.candidates():
+            request = build_request(self.client_pool.get(api_key))
+            self._record(api_key, cost)
+            quota_units.inc(cost, key=self._mask(api_key))
+            try:
+                with api_request_seconds.time(resource=resource):
+                    return request.execute()
+            except HttpError as e:
+                if not is_quota_error(e):
+                    raise
+                self._record(api_key, exhausted=True)
+                print(f"API key {self._mask(api_key)} is out of quota, trying the next key")
+
+        raise QuotaExhaustedError(
+            f"All {len(self.api_keys)} YouTube API key(s) are out of quota until "
+            f"{self.next_reset().isoformat()}"
+        )
+
+    def report(self) -> Dict:
+        """Estimated quota used and remaining per key for the current quota day"""
+        usage = self._usage()
+        keys = []
+        for api_key in self.api_keys:
+            row = usage.get(self._key_id(api_key), {'used': 0, 'exhausted': 0})
+            remaining = 0 if row['exhausted'] else max(self.daily_quota - row['used'], 0)
+            keys.append({
+                'key': self._mask(api_key),
+                'used': row['used'],
+                'remaining': remaining,
+                'exhausted': bool(row['exhausted'])
+            })
+        return {
+            'day': self.quota_day(),
+            'resets_at': self.next_reset().isoformat(),
+            'daily_quota': self.daily_quota,
+            'keys': keys,
+            'total_remaining': sum(key['remaining'] for key in keys)
+        }
+
+
+# Global key scheduler instance
+key_scheduler = KeyScheduler(
+    config.youtube_api_keys,
+    daily_quota=config.youtube_daily_quota,
+    path=config.quota_state_path
+)
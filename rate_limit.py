@@ -0,0 +1,153 @@
+"""Shared rate limiting, retry and adaptive concurrency for outbound requests"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+# Call outcomes; an error classifier reports THROTTLED, TRANSIENT or None
+OK = "ok"
+THROTTLED = "throttled"
+TRANSIENT = "transient"
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` requests per second with bursts up to ``capacity``"""
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0:
+            raise ValueError(f"Token bucket rate must be greater than 0 requests per second, got {rate}")
+        if capacity < 1:
+            raise ValueError(f"Token bucket capacity must be at least 1 request, got {capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until ``tokens`` are available and take them"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AIMDConcurrencyLimiter:
+    """Concurrency limit that grows while calls succeed and halves when they're throttled
+
+    Additive increase, multiplicative decrease: after ``limit`` successful
+    calls in a row the limit goes up by one, and every throttled call
+    multiplies it by ``decrease_factor``. Throttles from calls that started
+    before the last decrease are ignored so one burst of 429s only backs
+    off once.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 16,
+        decrease_factor: float = 0.5
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.decrease_factor = decrease_factor
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self._in_flight = 0
+        self._successes = 0
+        self._generation = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @contextmanager
+    def slot(self) -> Iterator[Dict]:
+        """Hold one unit of concurrency for the duration of a call
+
+        Yields a dict the caller sets ``outcome`` in (OK, THROTTLED or
+        anything else for neutral) before leaving the block.
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+            generation = self._generation
+
+        call = {'outcome': None}
+        try:
+            yield call
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                if call['outcome'] == THROTTLED:
+                    if generation == self._generation:
+                        self._limit = max(self.minimum, self._limit * self.decrease_factor)
+                        self._generation += 1
+                        self._successes = 0
+                elif call['outcome'] == OK:
+                    self._successes += 1
+                    if self._successes >= int(self._limit) and self._limit < self.maximum:
+                        self._limit = min(self.maximum, self._limit + 1)
+                        self._successes = 0
+                self._condition.notify_all()
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveRateLimiter:
+    """Token-bucket pacing, AIMD concurrency and jittered retries around a call
+
+    ``classify_error`` maps an exception to THROTTLED (back off and shrink
+    concurrency), TRANSIENT (back off and retry) or None (not retryable,
+    raised immediately).
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        max_concurrency: int,
+        classify_error: Callable[[Exception], Optional[str]],
+        max_attempts: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AIMDConcurrencyLimiter(
+            initial=max(1, max_concurrency // 2), maximum=max_concurrency
+        )
+        self.classify_error = classify_error
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Run ``func`` under the limits, retrying throttled and transient failures"""
+        for attempt in range(self.max_attempts):
+            self.bucket.acquire()
+            with self.concurrency.slot() as call:
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    kind = self.classify_error(e)
+                    call['outcome'] = kind
+                    if kind is None or attempt == self.max_attempts - 1:
+                        raise
+                else:
+                    call['outcome'] = OK
+                    return result
+
+            # Sleep without holding a concurrency slot
+            time.sleep(backoff_delay(attempt, self.base_delay, self.max_delay))
@@ -0,0 +1,17 @@
+import sys
+from config import config
+from backend.repositories.transcript_repository import TranscriptRepository
+
+
+# Rebuild the transcript metadata index from the files in the output directory
+def main():
+    transcript_repo = TranscriptRepository(config.output_dir, config.cache_dir)
+    count = transcript_repo.rebuild_index()
+    print(f"Indexed {count} transcripts from {config.output_dir}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 1:
+        print("Usage: python rebuild_index.py")
+    else:
+        main()
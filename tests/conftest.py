@@ -0,0 +1,12 @@
+"""Shared test setup: import the root modules and keep module-level state out of the repo"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# config.py requires an API key and the shared caches live under OUTPUT_DIR
+os.environ.setdefault('YOUTUBE_API_KEY', 'test-key')
+os.environ.setdefault('OUTPUT_DIR', tempfile.mkdtemp(prefix='youtube-utilities-tests-'))
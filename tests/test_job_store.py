@@ -0,0 +1,199 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from backend import job_store as job_store_module
+from backend.api_models import ExportFormat, JobResponse, JobStatus, TranscriptResponse
+from backend.job_events import JobEventBroker
+from backend.job_store import SQLiteJobStore
+
+
+class Clock:
+    """Stand-in for ``time.time`` inside the job store"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def transcript(video_id="abc"):
+    return TranscriptResponse(
+        video_id=video_id, video_url=f"https://www.youtube.com/watch?v={video_id}", channel_name="check",
+        video_date="2025-01-01", transcript_text="0.00s: hello", format=ExportFormat.MARKDOWN
+    )
+
+
+def pending(job_id):
+    return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
+
+
+def stored_results(store):
+    conn = sqlite3.connect(store.path)
+    try:
+        return [row[0] for row in conn.execute("SELECT job_id FROM job_results ORDER BY job_id")]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(job_store_module.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return SQLiteJobStore(str(tmp_path / 'jobs.db'), ttl_seconds=60, max_jobs=3)
+
+
+def test_create_and_get(store):
+    store.create(JobResponse(job_id="job1", status=JobStatus.PENDING, message="Starting", progress=0))
+
+    job = store.get("job1")
+
+    assert job == JobResponse(job_id="job1", status=JobStatus.PENDING, message="Starting", progress=0)
+
+
+def test_update_changes_only_the_given_fields(store):
+    store.create(JobResponse(job_id="job1", status=JobStatus.PENDING, message="Starting", progress=0))
+
+    store.update("job1", status=JobStatus.PROCESSING)
+    store.update("job1", progress=40)
+
+    job = store.get("job1")
+    assert job.status == JobStatus.PROCESSING
+    assert job.message == "Starting"
+    assert job.progress == 40
+
+
+def test_results_are_stored_apart_from_status(store):
+    result = transcript()
+    store.create(pending("job1"))
+
+    store.update("job1", status=JobStatus.COMPLETED, progress=100, result=result)
+
+    assert store.get("job1").result == result
+    assert store.get("job1", include_result=False).result is None
+    assert store.get("job1", include_result=False).status == JobStatus.COMPLETED
+
+
+def test_create_with_a_result(store):
+    store.create(JobResponse(job_id="job1", status=JobStatus.COMPLETED, progress=100, result=transcript()))
+
+    assert store.get("job1").result.video_id == "abc"
+
+
+def test_unknown_job_ids(store):
+    assert store.get("missing") is None
+
+    store.update("missing", status=JobStatus.COMPLETED, result=transcript())
+
+    assert store.get("missing") is None
+    assert stored_results(store) == []
+
+
+def test_jobs_expire_after_their_last_update(store, clock):
+    store.create(pending("job1"))
+    clock.now += 50
+    store.update("job1", progress=10)
+
+    clock.now += 50
+    assert store.get("job1").progress == 10
+
+    clock.now += 11
+    assert store.get("job1") is None
+    assert store.evict_expired() == 1
+
+
+def test_create_evicts_expired_jobs_and_their_results(store, clock):
+    store.create(pending("old"))
+    store.update("old", result=transcript())
+
+    clock.now += 61
+    store.create(pending("new"))
+
+    assert stored_results(store) == []
+    assert store.evict_expired() == 0
+
+
+def test_create_evicts_the_oldest_jobs_beyond_the_limit(store, clock):
+    for job_id in ("job1", "job2", "job3"):
+        store.create(pending(job_id))
+        store.update(job_id, result=transcript(job_id))
+        clock.now += 1
+
+    store.create(pending("job4"))
+
+    assert store.get("job1") is None
+    assert [job_id for job_id in ("job2", "job3", "job4") if store.get(job_id)] == ["job2", "job3", "job4"]
+    assert stored_results(store) == ["job2", "job3"]
+
+
+def test_listeners_hear_every_change(store):
+    changes = []
+    store.add_listener(changes.append)
+
+    store.create(pending("job1"))
+    store.update("job1", progress=50)
+
+    assert changes == ["job1", "job1"]
+
+
+def events(broker, job_id, during=None):
+    """Collect a job's SSE messages, running ``during`` on another thread once the stream is open"""
+    async def collect():
+        messages = []
+        async for message in broker.stream(job_id):
+            messages.append(message)
+            if during is not None and len(messages) == 1:
+                threading.Thread(target=during).start()
+        return messages
+    return asyncio.run(asyncio.wait_for(collect(), 10))
+
+
+def event_names(messages):
+    return [message.split("\n", 1)[0] for message in messages]
+
+
+def test_stream_ends_when_the_job_finishes(store):
+    broker = JobEventBroker(store)
+    store.create(pending("job1"))
+
+    def run_job():
+        store.update("job1", status=JobStatus.PROCESSING, progress=50)
+        store.update("job1", status=JobStatus.COMPLETED, progress=100, result=transcript())
+
+    messages = events(broker, "job1", run_job)
+
+    assert event_names(messages)[0] == "event: progress"
+    assert event_names(messages)[-1] == "event: done"
+    assert '"status":"completed"' in messages[-1]
+    assert '"transcript_text":"0.00s: hello"' in messages[-1]
+
+
+def test_stream_ends_when_the_job_fails(store):
+    broker = JobEventBroker(store)
+    store.create(pending("job1"))
+
+    messages = events(broker, "job1", lambda: store.update("job1", status=JobStatus.FAILED, message="boom"))
+
+    assert event_names(messages)[-1] == "event: done"
+    assert '"message":"boom"' in messages[-1]
+
+
+def test_stream_of_a_finished_job_is_a_single_done_event(store):
+    broker = JobEventBroker(store)
+    store.create(JobResponse(job_id="job1", status=JobStatus.COMPLETED, progress=100))
+
+    assert event_names(events(broker, "job1")) == ["event: done"]
+
+
+def test_stream_of_an_unknown_job(store):
+    broker = JobEventBroker(store)
+
+    assert event_names(events(broker, "missing")) == ["event: error"]
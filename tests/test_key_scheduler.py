@@ -0,0 +1,85 @@
+import pytest
+from googleapiclient.errors import HttpError
+
+from fake_youtube import FakeYouTube, FakeYouTubeServer, InjectionSettings
+from key_scheduler import KeyScheduler, QuotaExhaustedError
+from youtube_client import YouTubeClientPool
+
+VIDEO = {'id': "video01", 'channel_id': "UCcheck", 'title': "Check", 'published_at': "2025-01-01T12:00:00Z"}
+
+
+@pytest.fixture
+def standin():
+    """Local Data API stand-in where ``key1`` is out of quota"""
+    server = FakeYouTubeServer(FakeYouTube(
+        {'channels': [], 'videos': [VIDEO]}, InjectionSettings(exhausted_keys=["key1"])
+    ))
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def scheduler(standin, tmp_path, *api_keys):
+    return KeyScheduler(
+        api_keys, path=str(tmp_path / 'quota.db'), client_pool=YouTubeClientPool(api_endpoint=standin.base_url)
+    )
+
+
+def list_video(youtube):
+    return youtube.videos().list(part="snippet", id=VIDEO['id'])
+
+
+def keys_by_mask(report):
+    return {key['key']: key for key in report['keys']}
+
+
+def test_quota_exceeded_moves_to_the_next_key(standin, tmp_path):
+    keys = scheduler(standin, tmp_path, "key1", "key2")
+
+    response = keys.execute("videos", list_video)
+
+    assert [item['id'] for item in response['items']] == [VIDEO['id']]
+    report = keys_by_mask(keys.report())
+    assert report["...key1"]['exhausted'] and report["...key1"]['remaining'] == 0
+    assert not report["...key2"]['exhausted'] and report["...key2"]['used'] == 1
+
+
+def test_exhausted_key_is_skipped_for_the_rest_of_the_day(standin, tmp_path):
+    keys = scheduler(standin, tmp_path, "key1", "key2")
+    keys.execute("videos", list_video)
+
+    assert keys.candidates() == ["key2"]
+    keys.execute("videos", list_video)
+    assert keys_by_mask(keys.report())["...key1"]['used'] == 1
+
+
+def test_exhausted_keys_are_shared_through_the_quota_database(standin, tmp_path):
+    scheduler(standin, tmp_path, "key1", "key2").execute("videos", list_video)
+
+    assert scheduler(standin, tmp_path, "key1", "key2").candidates() == ["key2"]
+
+
+def test_all_keys_out_of_quota(standin, tmp_path):
+    keys = scheduler(standin, tmp_path, "key1")
+
+    with pytest.raises(QuotaExhaustedError):
+        keys.execute("videos", list_video)
+
+
+def test_other_errors_are_raised_without_failover(standin, tmp_path):
+    keys = scheduler(standin, tmp_path, "key2", "key3")
+    standin.app.settings.error_rate = 1.0
+
+    with pytest.raises(HttpError):
+        keys.execute("videos", list_video)
+
+    assert keys.candidates() == ["key3", "key2"]
+
+
+def test_most_remaining_budget_goes_first(standin, tmp_path):
+    keys = scheduler(standin, tmp_path, "key2", "key3")
+
+    keys.execute("search", lambda youtube: youtube.search().list(part="snippet", q="check", type="channel"))
+
+    assert keys.candidates() == ["key3", "key2"]
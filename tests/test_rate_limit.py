@@ -0,0 +1,153 @@
+from contextlib import ExitStack
+
+import pytest
+
+from rate_limit import OK, THROTTLED, TRANSIENT, AdaptiveRateLimiter, AIMDConcurrencyLimiter, TokenBucket
+
+
+class Flaky:
+    """Callable raising the given errors in turn, then returning ``"done"``"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "done"
+
+
+class Throttled(Exception):
+    pass
+
+
+class Transient(Exception):
+    pass
+
+
+def classify(error):
+    if isinstance(error, Throttled):
+        return THROTTLED
+    if isinstance(error, Transient):
+        return TRANSIENT
+    return None
+
+
+def limiter(max_attempts=3):
+    # No pacing or backoff delays to speak of
+    return AdaptiveRateLimiter(1000.0, 100.0, 8, classify, max_attempts=max_attempts, base_delay=0.0)
+
+
+def run(concurrency, *outcomes):
+    """Hold one slot per outcome at the same time, then release them all with those outcomes"""
+    with ExitStack() as stack:
+        calls = [stack.enter_context(concurrency.slot()) for _ in outcomes]
+        for call, outcome in zip(calls, outcomes):
+            call['outcome'] = outcome
+
+
+def test_throttle_halves_the_limit_once_per_generation():
+    concurrency = AIMDConcurrencyLimiter(initial=8, maximum=16)
+
+    # Both calls started before the decrease, so the burst only backs off once
+    run(concurrency, THROTTLED, THROTTLED)
+    assert concurrency.limit == 4
+
+    run(concurrency, THROTTLED)
+    assert concurrency.limit == 2
+
+
+def test_throttle_never_goes_below_the_minimum():
+    concurrency = AIMDConcurrencyLimiter(initial=2, minimum=1, maximum=16)
+
+    for _ in range(3):
+        run(concurrency, THROTTLED)
+
+    assert concurrency.limit == 1
+
+
+def test_limit_grows_by_one_after_limit_successes():
+    concurrency = AIMDConcurrencyLimiter(initial=4, maximum=6)
+
+    for _ in range(3):
+        run(concurrency, OK)
+    assert concurrency.limit == 4
+    run(concurrency, OK)
+    assert concurrency.limit == 5
+
+    for _ in range(5):
+        run(concurrency, OK)
+    assert concurrency.limit == 6
+
+    for _ in range(12):
+        run(concurrency, OK)
+    assert concurrency.limit == 6
+
+
+def test_throttle_resets_the_success_streak():
+    concurrency = AIMDConcurrencyLimiter(initial=4, maximum=16)
+
+    for _ in range(3):
+        run(concurrency, OK)
+    run(concurrency, THROTTLED)
+    run(concurrency, OK)
+
+    assert concurrency.limit == 2
+
+
+def test_neutral_outcomes_leave_the_limit_alone():
+    concurrency = AIMDConcurrencyLimiter(initial=4, maximum=16)
+
+    for _ in range(8):
+        run(concurrency, None)
+
+    assert concurrency.limit == 4
+
+
+def test_call_raises_non_retryable_errors_immediately():
+    func = Flaky(ValueError("no transcript"))
+
+    with pytest.raises(ValueError):
+        limiter().call(func)
+
+    assert func.calls == 1
+
+
+def test_call_retries_throttled_and_transient_errors():
+    rate_limiter = limiter()
+    func = Flaky(Throttled(), Transient())
+
+    assert rate_limiter.call(func) == "done"
+    assert func.calls == 3
+    assert rate_limiter.concurrency.limit == 2
+
+
+def test_call_gives_up_after_max_attempts():
+    func = Flaky(Transient(), Transient(), Transient())
+
+    with pytest.raises(Transient):
+        limiter(max_attempts=2).call(func)
+
+    assert func.calls == 2
+
+
+@pytest.mark.parametrize("rate", [0, -1.5])
+def test_token_bucket_rejects_non_positive_rates(rate):
+    with pytest.raises(ValueError, match="rate"):
+        TokenBucket(rate, 5)
+
+
+def test_token_bucket_rejects_capacity_below_one():
+    with pytest.raises(ValueError, match="capacity"):
+        TokenBucket(2, 0.5)
+
+
+def test_token_bucket_allows_a_burst_up_to_capacity():
+    bucket = TokenBucket(1000.0, 3)
+
+    for _ in range(3):
+        bucket.acquire()
+
+    assert bucket._tokens < 1
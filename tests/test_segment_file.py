@@ -0,0 +1,120 @@
+import pytest
+
+from backend.repositories.segment_file import SegmentFile, iter_closing, write_segment_file
+from backend.repositories.transcript_repository import TranscriptRepository
+
+SEGMENTS = [
+    {'text': "first", 'start': 0.0, 'duration': 2.0},
+    {'text': "naïve café – ünïcode", 'start': 2.0, 'duration': 2.5},
+    {'text': "", 'start': 4.5, 'duration': 0.0},
+    {'text': "last", 'start': 6.0, 'duration': 1.25},
+]
+
+
+def segment_file(tmp_path, segments):
+    path = tmp_path / 'segments.seg'
+    write_segment_file(path, segments)
+    return SegmentFile(path)
+
+
+def ranges(segments, start=None, end=None):
+    """Texts of the segments ``find_range`` picks"""
+    return [segment['text'] for segment in segments.iter_range(*segments.find_range(start, end))]
+
+
+@pytest.fixture
+def timeline(tmp_path):
+    segments = segment_file(tmp_path, [
+        {'text': str(start), 'start': float(start), 'duration': 2.0} for start in range(0, 10, 2)
+    ])
+    yield segments
+    segments.close()
+
+
+def test_save_segments_round_trip(tmp_path):
+    repository = TranscriptRepository(str(tmp_path / 'output'))
+    repository.save_segments("abc", "en", SEGMENTS, {'title': "Title"})
+
+    with repository.open_segments("abc", "en") as segments:
+        assert len(segments) == len(SEGMENTS)
+        assert list(segments) == SEGMENTS
+        assert segments[1] == SEGMENTS[1]
+        assert segments[-1] == SEGMENTS[-1]
+        with pytest.raises(IndexError):
+            segments[len(SEGMENTS)]
+
+    record = repository.load_segments("abc", "en")
+    assert record['segments'] == SEGMENTS
+    assert record['metadata'] == {'title': "Title"}
+    assert record['segment_count'] == len(SEGMENTS)
+
+
+def test_open_segments_without_cache(tmp_path):
+    repository = TranscriptRepository(str(tmp_path / 'output'))
+
+    assert repository.open_segments("missing", "en") is None
+    assert repository.load_segments("missing", "en") is None
+
+
+def test_rejects_files_that_are_not_segment_files(tmp_path):
+    path = tmp_path / 'other.seg'
+    path.write_bytes(b"not a segment file at all")
+
+    with pytest.raises(ValueError):
+        SegmentFile(path)
+
+
+def test_empty_segment_file(tmp_path):
+    with segment_file(tmp_path, []) as segments:
+        assert len(segments) == 0
+        assert list(segments) == []
+        assert segments.find_range() == (0, 0)
+        assert segments.find_range(5.0, 10.0) == (0, 0)
+
+
+def test_find_range_without_bounds(timeline):
+    assert timeline.find_range() == (0, 5)
+
+
+def test_find_range_open_ended_start(timeline):
+    assert ranges(timeline, end=4.0) == ["0", "2"]
+    assert ranges(timeline, end=4.5) == ["0", "2", "4"]
+
+
+def test_find_range_open_ended_end(timeline):
+    assert ranges(timeline, start=4.0) == ["4", "6", "8"]
+    # The segment starting at 4 is still running at 5
+    assert ranges(timeline, start=5.0) == ["4", "6", "8"]
+
+
+def test_find_range_outside_the_transcript(timeline):
+    assert ranges(timeline, start=100.0) == []
+    assert ranges(timeline, end=0.0) == []
+
+
+def test_find_range_end_before_start(timeline):
+    first, last = timeline.find_range(6.0, 2.0)
+
+    assert first == last
+
+
+def test_find_range_overlapping_long_segments(tmp_path):
+    with segment_file(tmp_path, [
+        {'text': "long", 'start': 0.0, 'duration': 10.0},
+        {'text': "short", 'start': 1.0, 'duration': 1.0},
+        {'text': "overlapping", 'start': 3.0, 'duration': 4.0},
+        {'text': "later", 'start': 8.0, 'duration': 1.0},
+    ]) as segments:
+        # Still inside "long", behind "short", which ended already
+        assert ranges(segments, start=6.0) == ["long", "short", "overlapping", "later"]
+        assert ranges(segments, start=9.5) == ["long", "short", "overlapping", "later"]
+        assert ranges(segments, start=10.0) == []
+        assert ranges(segments, start=2.0, end=3.0) == ["long", "short"]
+
+
+def test_iter_closing_closes_the_file(tmp_path):
+    segments = segment_file(tmp_path, SEGMENTS)
+
+    assert [segment['text'] for segment in iter_closing(segments, 1, 3)] == [SEGMENTS[1]['text'], ""]
+    with pytest.raises(ValueError):
+        segments.starts[0]
@@ -0,0 +1,67 @@
+import shutil
+from pathlib import Path
+
+from transcript_formats import SEGMENT_LINE_PATTERN, iter_markdown_file, iter_markdown_segments
+from backend.repositories.transcript_repository import TranscriptRepository
+
+# Archived before transcripts had a header block: no ``---`` separator
+LEGACY_TRANSCRIPT = Path(__file__).resolve().parent.parent / 'output' / 'unknown_channel-2025-03-19-opB25teOxYQ.md'
+
+
+def legacy_segment_count():
+    with open(LEGACY_TRANSCRIPT, 'r', encoding='utf-8') as f:
+        return sum(1 for line in f if SEGMENT_LINE_PATTERN.match(line.rstrip('\n')))
+
+
+def test_segments_follow_the_separator():
+    lines = ["# Title\n", "URL: https://www.youtube.com/watch?v=abc\n", "\n", "---\n", "\n",
+             "0.00s: first\n", "2.50s: second\n"]
+
+    segments = list(iter_markdown_segments(lines))
+
+    assert segments == [
+        {'text': "first", 'start': 0.0, 'duration': 2.5},
+        {'text': "second", 'start': 2.5, 'duration': segments[-1]['duration']},
+    ]
+
+
+def test_segment_like_header_lines_are_ignored():
+    lines = ["# Title\n", "1.00s: not a segment\n", "---\n", "3.00s: segment\n"]
+
+    assert [segment['text'] for segment in iter_markdown_segments(lines)] == ["segment"]
+
+
+def test_file_without_separator_is_read_from_the_top():
+    with open(LEGACY_TRANSCRIPT, 'r', encoding='utf-8') as f:
+        segments = list(iter_markdown_segments(f))
+
+    assert len(segments) == legacy_segment_count() > 0
+    assert segments[0]['start'] == 0.08
+    assert segments[0]['text'] == "today in this video I'm going to show"
+    assert segments[0]['duration'] == 1.76 - 0.08
+
+
+def test_file_without_separator_converts_to_text():
+    text = b"".join(iter_markdown_file(LEGACY_TRANSCRIPT, "txt")).decode('utf-8')
+
+    assert text.startswith("today in this video I'm going to show")
+
+
+def test_file_without_separator_is_indexed_and_searchable(tmp_path):
+    output_dir = tmp_path / 'output'
+    output_dir.mkdir()
+    shutil.copy(LEGACY_TRANSCRIPT, output_dir)
+    repository = TranscriptRepository(str(output_dir))
+
+    summaries, total = repository.list_transcript_summaries(1, 10)
+    hits, hit_count = repository.search_segments("directory")
+    segment_file = repository.open_transcript_segments("opB25teOxYQ", "en")
+
+    assert total == 1
+    assert summaries[0]['segment_count'] == legacy_segment_count()
+    assert hit_count > 0
+    assert hits[0]['video_id'] == "opB25teOxYQ"
+    with segment_file:
+        assert len(segment_file) == legacy_segment_count()
+        first, last = segment_file.find_range(0, 10)
+        assert last > first
@@ -0,0 +1,176 @@
+import os
+import sqlite3
+
+import pytest
+
+from config import config
+from extract_transcript import extract_transcript
+from fake_youtube import FakeYouTube, FakeYouTubeServer
+from backend.repositories.transcript_index import SCHEMA_VERSION
+from backend.repositories.transcript_repository import TranscriptRepository
+
+
+def write_markdown(directory, video_id, *texts, date="2025-01-01"):
+    """Write a transcript in the stored markdown layout with one segment per text"""
+    path = directory / f"check-{date}-{video_id}.md"
+    segments = "".join(f"{i * 2:.2f}s: {text}\n" for i, text in enumerate(texts))
+    path.write_text(f"# {video_id}\n\nURL: https://www.youtube.com/watch?v={video_id}\n\n---\n\n{segments}",
+                    encoding='utf-8')
+    return path
+
+
+def touch(path):
+    """Move a path's mtime forward, so changes land on a different timestamp than the last sync"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def summaries(repository):
+    return {row['video_id']: row for row in repository.list_transcript_summaries(1, 100)[0]}
+
+
+def hit_count(repository, query):
+    return repository.search_segments(query)[1]
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    directory = tmp_path / 'output'
+    directory.mkdir()
+    return directory
+
+
+@pytest.fixture
+def repository(output_dir):
+    return TranscriptRepository(str(output_dir))
+
+
+@pytest.fixture
+def youtube_standin(monkeypatch):
+    """Local YouTube stand-in serving one video, with the transcript fetcher pointed at it"""
+    video = {
+        'id': "overwrite01", 'channel_id': "UCcheck", 'title': "Check", 'published_at': "2025-01-01T12:00:00Z",
+        'transcripts': {'en': [{'text': "hello", 'start': 0.0, 'duration': 2.0}]}
+    }
+    server = FakeYouTubeServer(FakeYouTube({'channels': [], 'videos': [video]}))
+    server.start()
+    monkeypatch.setattr(config, 'youtube_standin_url', server.base_url)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_sync_indexes_new_files(output_dir, repository):
+    write_markdown(output_dir, "first", "hello there")
+    assert set(summaries(repository)) == {"first"}
+
+    write_markdown(output_dir, "second", "general kenobi", "hello again")
+    touch(output_dir)
+
+    rows = summaries(repository)
+    assert set(rows) == {"first", "second"}
+    assert rows["second"]['segment_count'] == 2
+    assert hit_count(repository, "kenobi") == 1
+    assert hit_count(repository, "hello") == 2
+
+
+def test_sync_reindexes_files_changed_in_place(output_dir, repository):
+    path = write_markdown(output_dir, "changed", "hello")
+    summaries(repository)
+
+    # Rewriting a file doesn't touch the directory; adding another file does
+    write_markdown(output_dir, "changed", "farewell", "for now")
+    touch(path)
+    write_markdown(output_dir, "other", "unrelated")
+    touch(output_dir)
+
+    row = summaries(repository)["changed"]
+    assert row['size'] == os.path.getsize(path)
+    assert row['segment_count'] == 2
+    assert hit_count(repository, "hello") == 0
+    assert hit_count(repository, "farewell") == 1
+
+
+def test_sync_drops_deleted_files(output_dir, repository):
+    path = write_markdown(output_dir, "deleted", "goodbye")
+    write_markdown(output_dir, "kept", "hello")
+    summaries(repository)
+
+    path.unlink()
+    touch(output_dir)
+
+    assert set(summaries(repository)) == {"kept"}
+    assert hit_count(repository, "goodbye") == 0
+    assert repository.get_transcript_by_video_id("deleted") is None
+
+
+def test_sync_skips_unchanged_directory(output_dir, repository):
+    write_markdown(output_dir, "first", "hello")
+    # The first sync creates the index under output/.cache, which changes the directory once more
+    summaries(repository)
+    summaries(repository)
+
+    repository.index.remove_paths(["check-2025-01-01-first.md"])
+
+    assert summaries(repository) == {}
+
+
+def test_save_transcript_updates_index_on_overwrite(output_dir, repository):
+    repository.save_transcript("# Saved\n\n---\n\n0.00s: hello\n", "check", "2025-01-01", "saved")
+    summaries(repository)
+
+    path = repository.save_transcript(
+        "# Saved\n\n---\n\n0.00s: goodbye\n2.00s: goodbye again\n", "check", "2025-01-01", "saved"
+    )
+
+    row = summaries(repository)["saved"]
+    assert row['size'] == os.path.getsize(path)
+    assert row['segment_count'] == 2
+    assert hit_count(repository, "hello") == 0
+    assert hit_count(repository, "goodbye") == 2
+
+
+def test_extract_transcript_overwrite_is_reindexed(output_dir, repository, youtube_standin):
+    url = "https://www.youtube.com/watch?v=overwrite01"
+    path = extract_transcript(url, str(output_dir), "check", "2025-01-01", include_metadata=False)
+    assert summaries(repository)["overwrite01"]['segment_count'] == 1
+
+    youtube_standin.app.videos["overwrite01"]['transcripts']['en'] = [
+        {'text': "goodbye", 'start': 0.0, 'duration': 2.0},
+        {'text': "goodbye again", 'start': 2.0, 'duration': 2.0}
+    ]
+    extract_transcript(url, str(output_dir), "check", "2025-01-01", include_metadata=False)
+
+    row = summaries(repository)["overwrite01"]
+    assert row['size'] == os.path.getsize(path)
+    assert row['segment_count'] == 2
+    assert hit_count(repository, "hello") == 0
+    assert hit_count(repository, "goodbye") == 2
+
+
+def test_older_schema_is_rebuilt(output_dir, repository):
+    path = write_markdown(output_dir, "current", "hello")
+    summaries(repository)
+    summaries(repository)
+
+    # A row an older version parsed differently, still matching the file's size and mtime
+    stat = path.stat()
+    repository.index.upsert({
+        'video_id': "current", 'channel_name': "check", 'video_date': "2025-01-01", 'video_title': None,
+        'path': path.name, 'size': stat.st_size, 'mtime': stat.st_mtime, 'segment_count': 0,
+        'segments': [(0.0, "outdated")]
+    })
+    assert summaries(repository)["current"]['segment_count'] == 0
+    conn = sqlite3.connect(str(repository.index.db_path))
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION - 1}")
+    conn.commit()
+    conn.close()
+
+    reopened = TranscriptRepository(str(output_dir))
+
+    assert summaries(reopened)["current"]['segment_count'] == 1
+    assert hit_count(reopened, "outdated") == 0
+    assert hit_count(reopened, "hello") == 1
+    conn = sqlite3.connect(str(reopened.index.db_path))
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    conn.close()
@@ -0,0 +1,116 @@
+"""Rate-limited transcript fetching shared by the CLI tools and the API"""
+import html
+import re
+import threading
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api import _errors as transcript_errors
+
+from config import config
+from rate_limit import THROTTLED, TRANSIENT, AdaptiveRateLimiter
+
+# Errors that mean YouTube is throttling or blocking us; names differ between library versions
+THROTTLE_ERRORS = tuple(
+    getattr(transcript_errors, name)
+    for name in ('TooManyRequests', 'RequestBlocked', 'IpBlocked')
+    if hasattr(transcript_errors, name)
+)
+
+# The HTTP status at the start of a YouTubeRequestFailed reason, e.g. "429 Client Error: ..."
+STATUS_PATTERN = re.compile(r'^(\d{3})\b')
+
+_local = threading.local()
+
+
+def classify_transcript_error(error: Exception) -> Optional[str]:
+    """Whether a failed fetch was throttled, transient or final"""
+    if THROTTLE_ERRORS and isinstance(error, THROTTLE_ERRORS):
+        return THROTTLED
+    if isinstance(error, transcript_errors.YouTubeRequestFailed):
+        match = STATUS_PATTERN.match(getattr(error, 'reason', '') or '')
+        status = int(match.group(1)) if match else 0
+        if status == 429:
+            return THROTTLED
+        if status >= 500 or status == 0:
+            return TRANSIENT
+        return None
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        if status == 429:
+            return THROTTLED
+        if status >= 500:
+            return TRANSIENT
+        return None
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return TRANSIENT
+    return None
+
+
+def _fetch_timedtext(video_id: str, languages: List[str]) -> List[Dict]:
+    """Fetch transcript segments from the timedtext endpoint of a local stand-in server
+
+    Languages are tried in order; a 404 moves on to the next one and any
+    other error status is raised for the rate limiter to classify.
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = requests.Session()
+
+    response = None
+    for language in languages:
+        response = session.get(
+            f"{config.youtube_standin_url}/api/timedtext",
+            params={'v': video_id, 'lang': language},
+            timeout=config.api_timeout
+        )
+        if response.status_code != 404:
+            break
+    response.raise_for_status()
+
+    root = ElementTree.fromstring(response.content)
+    return [
+        {
+            'text': html.unescape(element.text or ''),
+            'start': float(element.get('start', 0)),
+            'duration': float(element.get('dur', 0))
+        }
+        for element in root.iter('text')
+    ]
+
+
+def _fetch_raw(video_id: str, languages: List[str]) -> List[Dict]:
+    """Fetch transcript segments as dicts with whichever API the installed library has"""
+    if config.youtube_standin_url:
+        return _fetch_timedtext(video_id, languages)
+
+    if hasattr(YouTubeTranscriptApi, 'get_transcript'):
+        return YouTubeTranscriptApi.get_transcript(video_id, languages=languages)
+
+    # youtube-transcript-api 1.x: instance API; one per thread since it holds a requests session
+    api = getattr(_local, 'api', None)
+    if api is None:
+        api = _local.api = YouTubeTranscriptApi()
+    return api.fetch(video_id, languages=languages).to_raw_data()
+
+
+def fetch_transcript(video_id: str, languages: Optional[Iterable[str]] = None) -> List[Dict]:
+    """Fetch a video's transcript segments through the shared rate limiter
+
+    Throttled and transient failures are retried with jittered exponential
+    backoff; other errors (no transcript, video unavailable) are raised
+    straight away.
+    """
+    return transcript_limiter.call(_fetch_raw, video_id, list(languages or [config.transcript_language]))
+
+
+# Global limiter shared by every transcript fetch in the process
+transcript_limiter = AdaptiveRateLimiter(
+    rate=config.transcript_rate,
+    burst=config.transcript_burst,
+    max_concurrency=config.transcript_max_concurrency,
+    classify_error=classify_transcript_error,
+    max_attempts=config.transcript_max_attempts
+)
@@ -0,0 +1,299 @@
+"""Transcript parsing and format conversion shared by the CLI tools and the API"""
+import json
+import re
+from pathlib import Path
+from itertools import count, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    # Optional: timestamps are computed one at a time without it
+    np = None
+
+# Transcript lines in stored markdown look like "12.34s: text"
+SEGMENT_LINE_PATTERN = re.compile(r'^(?P<start>\d+(?:\.\d+)?)s: (?P<text>.*)$')
+
+# Markdown doesn't store durations; the last segment is assumed to last this long
+LAST_SEGMENT_DURATION = 2.0
+
+# Streamed output is grouped into chunks of roughly this many bytes
+CHUNK_SIZE = 64 * 1024
+
+# Segments are formatted this many at a time: big enough that each block is
+# one cheap join, small enough that streaming keeps memory flat
+BLOCK_SIZE = 1024
+
+# How formatted blocks are put together for each export format:
+# (before the first block, between blocks, after the last block, output when empty)
+BLOCK_FRAMING = {
+    "md": ("", "\n", "", ""),
+    "txt": ("", " ", "", ""),
+    "srt": ("", "\n", "", ""),
+    "vtt": ("WEBVTT\n\n", "\n", "", "WEBVTT\n"),
+    "json": ("[\n", ",\n", "\n]", "[]"),
+}
+
+MEDIA_TYPES = {
+    "md": "text/markdown",
+    "txt": "text/plain",
+    "srt": "application/x-subrip",
+    "vtt": "text/vtt",
+    "json": "application/json",
+}
+
+# Below this many times, NumPy's array setup costs more than it saves
+VECTORIZE_MIN_TIMES = 32
+
+# Zero-padded digits, looked up instead of formatting every timestamp field
+TWO_DIGITS = [f"{i:02d}" for i in range(100)]
+THREE_DIGITS = [f"{i:03d}" for i in range(1000)]
+
+# Characters WebVTT cue text must escape
+VTT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+
+def iter_markdown_segments(lines: Iterable[str]) -> Iterator[Dict]:
+    """Parse stored markdown line by line into segments
+
+    Yields ``{'text', 'start', 'duration'}`` for every transcript line (see
+    ``iter_segment_lines``). Each segment is taken to last until the next one
+    starts, so only one segment is held at a time.
+    """
+    previous = None
+
+    for start, text in iter_segment_lines(lines):
+        if previous is not None:
+            previous['duration'] = max(start - previous['start'], 0.0)
+            yield previous
+        previous = {'text': text, 'start': start, 'duration': LAST_SEGMENT_DURATION}
+
+    if previous is not None:
+        yield previous
+
+
+def iter_segment_lines(lines: Iterable[str]) -> Iterator[Tuple[float, str]]:
+    """``(start, text)`` of each transcript line in stored markdown
+
+    Transcript lines follow the ``---`` separator. Older files have no
+    header block or separator, so segment lines seen before a separator are
+    held back and only yielded if the file turns out not to have one.
+    """
+    before_separator = []
+    in_transcript = False
+
+    for line in lines:
+        if not in_transcript and line.strip() == '---':
+            # Anything segment-like above the separator was header text
+            in_transcript = True
+            before_separator = []
+            continue
+
+        match = SEGMENT_LINE_PATTERN.match(line.rstrip('\n'))
+        if not match:
+            continue
+
+        segment = (float(match.group('start')), match.group('text'))
+        if in_transcript:
+            yield segment
+        else:
+            before_separator.append(segment)
+
+    yield from before_separator
+
+
+def render_block(segments: List[Dict], format_type: str, first_number: int = 1) -> str:
+    """Render a list of segments in an export format with one join
+
+    ``first_number`` is the SRT cue number of the first segment. JSON
+    blocks are the list items without the surrounding brackets.
+    """
+    if format_type == "md":
+        return "\n".join([f"{entry['start']:.2f}s: {entry['text']}" for entry in segments])
+    if format_type == "txt":
+        return " ".join([entry['text'] for entry in segments])
+    if format_type == "srt":
+        starts, ends = cue_timestamps(segments, ",")
+        return "\n".join([
+            f"{number}\n{start} --> {end}\n{entry['text']}\n"
+            for number, entry, start, end in zip(count(first_number), segments, starts, ends)
+        ])
+    if format_type == "vtt":
+        starts, ends = cue_timestamps(segments, ".")
+        texts = [entry['text'] for entry in segments]
+        joined = "\n".join(texts)
+        if "&" in joined or "<" in joined or ">" in joined:
+            texts = [text.translate(VTT_ESCAPES) for text in texts]
+        return "\n".join([f"{start} --> {end}\n{text}\n" for text, start, end in zip(texts, starts, ends)])
+    if format_type == "json":
+        # Strip the "[\n" and "\n]" around the items
+        return json.dumps(segments, indent=2)[2:-2]
+    return ""
+
+
+def iter_blocks(segments: Iterable[Dict], block_size: int = BLOCK_SIZE) -> Iterator[List[Dict]]:
+    """Group segments into lists of up to ``block_size``"""
+    if isinstance(segments, list):
+        # Already in memory: a list that fits in one block is used as-is
+        if len(segments) <= block_size:
+            if segments:
+                yield segments
+            return
+        for start in range(0, len(segments), block_size):
+            yield segments[start:start + block_size]
+        return
+
+    iterator = iter(segments)
+    while True:
+        block = list(islice(iterator, block_size))
+        if not block:
+            return
+        yield block
+
+
+def iter_format(segments: Iterable[Dict], format_type: str, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """Render segments in an export format a block at a time
+
+    Concatenating the pieces gives the same text as formatting the whole
+    list at once, while only ``block_size`` segments are held at a time.
+    """
+    if format_type not in BLOCK_FRAMING:
+        return
+    prefix, separator, suffix, empty = BLOCK_FRAMING[format_type]
+
+    number = 1
+    for block in iter_blocks(segments, block_size):
+        rendered = render_block(block, format_type, number)
+        yield (separator if number > 1 else prefix) + rendered
+        number += len(block)
+
+    yield suffix if number > 1 else empty
+
+
+def format_transcript(segments: Iterable[Dict], format_type: str) -> str:
+    """Render segments in an export format in a single pass
+
+    A list is rendered as one block, so the output is built by a single
+    join at its final size instead of being grown by repeated concatenation.
+    """
+    if isinstance(segments, list):
+        return ''.join(iter_format(segments, format_type, max(len(segments), 1)))
+    return ''.join(iter_format(segments, format_type))
+
+
+def write_transcript(file: TextIO, segments: Iterable[Dict], format_type: str) -> None:
+    """Render segments in an export format straight into an open text file, a block at a time"""
+    file.writelines(iter_format(segments, format_type))
+
+
+def markdown_header(
+    url: str,
+    title: Optional[str] = None,
+    channel_name: Optional[str] = None,
+    video_date: Optional[str] = None
+) -> str:
+    """Metadata block stored above the segments of a markdown transcript"""
+    lines = [f"# {title}\n"] if title else []
+    lines.append(f"URL: {url}")
+    if title:
+        lines.append(f"Title: {title}")
+    if channel_name:
+        lines.append(f"Channel: {channel_name}")
+    if video_date:
+        lines.append(f"Date: {video_date}")
+    lines.append("\n---\n\n")
+    return "\n".join(lines)
+
+
+def iter_markdown_document(
+    segments: Iterable[Dict],
+    url: str,
+    title: Optional[str] = None,
+    channel_name: Optional[str] = None,
+    video_date: Optional[str] = None
+) -> Iterator[str]:
+    """Render a complete stored markdown transcript: metadata, separator and segments"""
+    yield markdown_header(url, title, channel_name, video_date)
+    yield from iter_format(segments, "md")
+    yield "\n"
+
+
+def split_millis(millis: int) -> Tuple[int, int, int, int]:
+    """Split whole milliseconds into hours, minutes, seconds and milliseconds"""
+    seconds, millis = divmod(millis, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return hours, minutes, seconds, millis
+
+
+def format_timestamps(times: Sequence[float], decimal_mark: str = ",") -> List[str]:
+    """Format times in seconds as ``HH:MM:SS,mmm`` (SRT) or ``HH:MM:SS.mmm`` (WebVTT)
+
+    Times are rounded to whole milliseconds first, so a cue never shows 60
+    seconds. With NumPy installed the rounding and splitting is done for
+    all times at once; either way each field is a table lookup rather than
+    a float format.
+    """
+    if np is not None and len(times) >= VECTORIZE_MIN_TIMES:
+        millis = np.rint(np.asarray(times, dtype=np.float64) * 1000).astype(np.int64)
+        seconds, millis = np.divmod(millis, 1000)
+        minutes, seconds = np.divmod(seconds, 60)
+        hours, minutes = np.divmod(minutes, 60)
+        fields = zip(hours.tolist(), minutes.tolist(), seconds.tolist(), millis.tolist())
+    else:
+        fields = (split_millis(round(time * 1000)) for time in times)
+
+    return [
+        f"{hours:02d}:{TWO_DIGITS[minutes]}:{TWO_DIGITS[seconds]}{decimal_mark}{THREE_DIGITS[millis]}"
+        for hours, minutes, seconds, millis in fields
+    ]
+
+
+def cue_timestamps(segments: Sequence[Dict], decimal_mark: str = ",") -> Tuple[List[str], List[str]]:
+    """Formatted start and end timestamps of every segment, computed together"""
+    starts = [entry['start'] for entry in segments]
+    ends = [entry.get('duration', 0) + entry['start'] for entry in segments]
+    timestamps = format_timestamps(starts + ends, decimal_mark)
+    return timestamps[:len(segments)], timestamps[len(segments):]
+
+
+def format_srt_time(seconds: float) -> str:
+    """Format seconds to SRT timestamp"""
+    return format_timestamps([seconds])[0]
+
+
+def iter_chunks(pieces: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Group small text pieces into UTF-8 chunks of about ``chunk_size`` bytes"""
+    buffer = []
+    buffered = 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= chunk_size:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def iter_markdown_file(
+    filepath: Path,
+    format_type: str,
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Stream a stored markdown transcript converted to another format
+
+    The file is read line by line, so memory use doesn't grow with the
+    transcript length. Markdown itself is streamed back unchanged.
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        if format_type == "md":
+            yield from iter_chunks(f, chunk_size)
+        else:
+            yield from iter_chunks(iter_format(iter_markdown_segments(f), format_type), chunk_size)
+
+
+def download_headers(video_id: str, format_type: str) -> Dict[str, str]:
+    """Headers that make a streamed transcript download as a file"""
+    return {"Content-Disposition": f'attachment; filename="{video_id}.{format_type}"'}
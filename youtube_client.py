@@ -0,0 +1,78 @@
+"""Shared YouTube Data API client pool"""
+import json
+import threading
+from typing import Dict, Iterable, Optional
+
+import googleapiclient.discovery
+from googleapiclient.discovery_cache import get_static_doc
+
+from config import config
+
+API_SERVICE_NAME = "youtube"
+API_VERSION = "v3"
+
+
+class YouTubeClientPool:
+    """Process-wide pool of YouTube Data API clients keyed by API key.
+
+    The discovery document is loaded and parsed once, either from the copy
+    bundled with google-api-python-client or from a local override, so building
+    a client never touches the network. httplib2 connections are not
+    thread-safe, so each thread keeps its own client per API key. With
+    ``api_endpoint`` set, clients send their requests to that base URL
+    instead, e.g. a local stand-in server.
+    """
+
+    def __init__(self, discovery_doc_path: Optional[str] = None, api_endpoint: Optional[str] = None):
+        self.discovery_doc_path = discovery_doc_path
+        self.api_endpoint = api_endpoint
+        self._document: Optional[dict] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def document(self) -> dict:
+        """Parsed discovery document, loaded on first use"""
+        if self._document is None:
+            with self._lock:
+                if self._document is None:
+                    self._document = self._load_document()
+        return self._document
+
+    def _load_document(self) -> dict:
+        """Read the discovery document from the override path or the bundled copy"""
+        if self.discovery_doc_path:
+            with open(self.discovery_doc_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        document = get_static_doc(API_SERVICE_NAME, API_VERSION)
+        if document is None:
+            raise RuntimeError(
+                f"No bundled discovery document for {API_SERVICE_NAME} {API_VERSION}. "
+                "Set YOUTUBE_DISCOVERY_DOC to a local copy."
+            )
+        return json.loads(document)
+
+    def get(self, api_key: str):
+        """Get the calling thread's client for an API key, building it if needed"""
+        clients: Optional[Dict[str, object]] = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+
+        client = clients.get(api_key)
+        if client is None:
+            client_options = {'api_endpoint': self.api_endpoint} if self.api_endpoint else None
+            client = googleapiclient.discovery.build_from_document(
+                self.document, developerKey=api_key, client_options=client_options
+            )
+            clients[api_key] = client
+        return client
+
+    def warm_up(self, api_keys: Iterable[str]) -> None:
+        """Load the discovery document and build clients ahead of the first request"""
+        for api_key in api_keys:
+            self.get(api_key)
+
+
+# Global client pool instance
+client_pool = YouTubeClientPool(config.youtube_discovery_doc, config.youtube_standin_url)